@@ -0,0 +1,269 @@
+"""devflow-mcp 性能基准（手动或在 CI 中运行，不属于 MCP 工具）。
+
+用法：
+    python -m devflow_mcp.benchmarks importtime [--repeat 3] [--budget-ms 1500]
+    python -m devflow_mcp.benchmarks plugins [--repeat 3] [--set tasks,jira ...]
+    python -m devflow_mcp.benchmarks tickets [--repo PATH | --branches-file FILE] [--min-branches 5000]
+
+importtime 通过 `python -X importtime` 在子进程中冷启动导入 devflow_mcp.server，
+输出耗时最多的模块，并检查按需导入的重依赖没有在启动时被加载；
+超过预算（--budget-ms 或 DEVFLOW_IMPORT_BUDGET_MS）或出现违规导入时返回非零退出码。
+
+plugins 对每组 DEVFLOW_TOOLS 取值在子进程中启动服务（导入并注册工具，不进入 stdio 循环），
+输出启动耗时、进程峰值 RSS 与注册的工具数；默认测量 none、各单个插件与 all。
+
+tickets 用仓库的全部分支名（git for-each-ref，含远程分支）对比旧的逐模式匹配与预编译正则的工单号提取耗时，
+分支数不足 --min-branches 时用生成的分支名补足；同时测量从最近提交信息中提取多个工单号的耗时。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PACKAGE_PARENT = Path(__file__).resolve().parent.parent
+
+# 这些依赖应在对应子系统首次使用时才导入
+LAZY_MODULES = ("requests", "urllib3", "pymysql", "yaml", "frontmatter")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+DEFAULT_PLUGIN_SETS = ("none", "tasks", "jira", "mysql", "wiki", "prd", "all")
+
+# 在子进程中执行：ru_maxrss 在 Linux 上以 KB 为单位，macOS 上以字节为单位
+_STARTUP_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import devflow_mcp.server as server
+elapsed_ms = (time.perf_counter() - started) * 1000
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "startupMs": elapsed_ms,
+    "maxRssKb": max_rss / 1024 if sys.platform == "darwin" else max_rss,
+    "plugins": list(server.LOADED_PLUGINS),
+    "tools": sum(len(names) for names in server.LOADED_PLUGINS.values()),
+}))
+"""
+
+
+def _subprocess_env(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PACKAGE_PARENT), env.get("PYTHONPATH")]))
+    env.update(extra or {})
+    return env
+
+
+def measure_import(module: str = "devflow_mcp.server", extra_env: Optional[Dict[str, str]] = None) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """冷启动导入 module，返回 (子进程墙钟毫秒, [(模块, 自身微秒, 累计微秒, 嵌套深度)])"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=str(PACKAGE_PARENT),
+        env=_subprocess_env(extra_env),
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    entries: List[Tuple[str, int, int, int]] = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return wall_ms, entries
+
+
+def run_importtime(repeat: int, budget_ms: float, top: int) -> int:
+    best: Optional[Tuple[float, List[Tuple[str, int, int, int]]]] = None
+    for _ in range(max(1, repeat)):
+        wall_ms, entries = measure_import()
+        if best is None or wall_ms < best[0]:
+            best = (wall_ms, entries)
+    assert best is not None
+    wall_ms, entries = best
+
+    cumulative = {name: cumulative_us for name, _, cumulative_us, _ in entries}
+    server_ms = cumulative.get("devflow_mcp.server", 0) / 1000
+    print(f"cold start wall time (best of {repeat}): {wall_ms:.1f} ms")
+    print(f"import devflow_mcp.server (cumulative):  {server_ms:.1f} ms")
+    print(f"\ntop {top} modules by self time:")
+    for name, self_us, cumulative_us, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    failures = []
+    eager = sorted({name.split(".")[0] for name, *_ in entries} & set(LAZY_MODULES))
+    if eager:
+        failures.append(f"heavy modules imported at startup: {', '.join(eager)}")
+    if budget_ms and server_ms > budget_ms:
+        failures.append(f"import time {server_ms:.1f} ms exceeds budget {budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+def measure_startup(plugin_set: str) -> Dict[str, object]:
+    """以 DEVFLOW_TOOLS=plugin_set 冷启动导入 devflow_mcp.server，返回启动耗时/峰值 RSS/工具数"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE],
+        capture_output=True,
+        text=True,
+        cwd=str(PACKAGE_PARENT),
+        env=_subprocess_env({"DEVFLOW_TOOLS": plugin_set}),
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"DEVFLOW_TOOLS={plugin_set} failed to start:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wallMs"] = wall_ms
+    return result
+
+
+def run_plugins(repeat: int, plugin_sets: List[str]) -> int:
+    rows = []
+    for plugin_set in plugin_sets:
+        runs = [measure_startup(plugin_set) for _ in range(max(1, repeat))]
+        best = min(runs, key=lambda r: r["startupMs"])
+        rows.append((plugin_set, best, min(r["maxRssKb"] for r in runs)))
+
+    baseline_rss = next((rss for plugin_set, _, rss in rows if plugin_set == "none"), None)
+    print(f"startup per DEVFLOW_TOOLS set (best of {repeat}):")
+    print(f"  {'DEVFLOW_TOOLS':<16} {'tools':>5} {'import ms':>10} {'wall ms':>9} {'max RSS MiB':>12} {'vs none':>9}")
+    for plugin_set, best, rss in rows:
+        delta = f"{(rss - baseline_rss) / 1024:+8.1f}" if baseline_rss is not None else ""
+        print(f"  {plugin_set:<16} {best['tools']:>5} {best['startupMs']:>10.1f} {best['wallMs']:>9.1f} "
+              f"{rss / 1024:>12.1f} {delta:>9}")
+    return 0
+
+
+def _legacy_extract_ticket(branch_name: str) -> Optional[str]:
+    """拆分前 _extract_ticket_from_branch 的实现，作为对照基线"""
+    if not branch_name:
+        return None
+    patterns = [
+        r'^feature/([A-Z]+-\d+)',
+        r'^bugfix/([A-Z]+-\d+)',
+        r'^hotfix/([A-Z]+-\d+)',
+        r'^([A-Z]+-\d+)-.*',
+        r'^([A-Z]+-\d+)$',
+        r'([A-Z]+-\d+)',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, branch_name, re.IGNORECASE)
+        if match:
+            return match.group(1).upper()
+    return None
+
+
+def _git_lines(repo: Path, *args: str) -> List[str]:
+    proc = subprocess.run(["git", "-C", str(repo), *args], capture_output=True, text=True)
+    return [line for line in proc.stdout.splitlines() if line.strip()] if proc.returncode == 0 else []
+
+
+def _synthetic_branches(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    prefixes = ["feature/", "bugfix/", "hotfix/", "release/", "chore/", "", "users/dev/"]
+    projects = ["DTS", "ABC", "PAY", "OPS", "CORE2"]
+    words = ["login", "retry", "cache", "refactor", "upgrade", "fix-npe", "api-v2", "perf"]
+    branches = []
+    for _ in range(count):
+        prefix = rng.choice(prefixes)
+        if rng.random() < 0.8:
+            ticket = f"{rng.choice(projects)}-{rng.randint(1, 99999)}"
+            ticket = ticket.lower() if rng.random() < 0.2 else ticket
+            branches.append(f"{prefix}{ticket}-{rng.choice(words)}")
+        else:
+            branches.append(f"{prefix}{rng.choice(words)}-{rng.randint(2019, 2026)}")
+    return branches
+
+
+def _time_per_item(fn, items: List[str]) -> float:
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - started) / max(1, len(items)) * 1e6
+
+
+def run_tickets(repo: Path, branches_file: Optional[str], min_branches: int, commits: int) -> int:
+    from devflow_mcp import common
+
+    if branches_file:
+        branches = [line.strip() for line in Path(branches_file).read_text(encoding="utf-8").splitlines() if line.strip()]
+        source = branches_file
+    else:
+        branches = _git_lines(repo, "for-each-ref", "--format=%(refname:short)", "refs/heads", "refs/remotes")
+        source = str(repo)
+    real = len(branches)
+    if real < min_branches:
+        branches += _synthetic_branches(min_branches - real)
+    print(f"branches: {real} from {source}, {len(branches) - real} synthetic")
+
+    project_keys = common._jira_project_keys()
+    legacy_us = _time_per_item(_legacy_extract_ticket, branches)
+    common._extract_ticket_keys_cached.cache_clear()
+    common._ticket_key_regex.cache_clear()
+    cold_us = _time_per_item(lambda b: common._extract_ticket_keys(b, project_keys), branches)
+    warm_us = _time_per_item(lambda b: common._extract_ticket_keys(b, project_keys), branches)
+    print(f"  legacy 6-pattern loop:       {legacy_us:8.2f} us/branch")
+    print(f"  compiled regex (cold):       {cold_us:8.2f} us/branch")
+    print(f"  memoized (same branch again):{warm_us:8.2f} us/branch")
+
+    if not project_keys:
+        differing = [b for b in branches if _legacy_extract_ticket(b) != common._extract_ticket_from_branch(b)]
+        print(f"  first-key differences vs legacy: {len(differing)}" + (f" e.g. {differing[:5]}" if differing else ""))
+    else:
+        print(f"  JIRA_PROJECT_KEYS allowlist: {', '.join(project_keys)}")
+
+    messages = _git_lines(repo, "log", f"--max-count={commits}", "--pretty=format:%s") if commits > 0 else []
+    if messages:
+        common._extract_ticket_keys_cached.cache_clear()
+        message_us = _time_per_item(lambda m: common._extract_ticket_keys(m, project_keys), messages)
+        found = sum(len(common._extract_ticket_keys(m, project_keys)) for m in messages)
+        print(f"commit messages: {len(messages)}, {found} ticket keys, {message_us:.2f} us/message")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m devflow_mcp.benchmarks", description="devflow-mcp 性能基准")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    importtime = subparsers.add_parser("importtime", help="测量 devflow_mcp.server 的冷启动导入耗时")
+    importtime.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次")
+    importtime.add_argument("--budget-ms", type=float, default=float(os.getenv("DEVFLOW_IMPORT_BUDGET_MS", "1500")),
+                            help="导入耗时预算（毫秒），0 表示不检查")
+    importtime.add_argument("--top", type=int, default=15, help="输出自身耗时最多的模块数")
+
+    plugins = subparsers.add_parser("plugins", help="按 DEVFLOW_TOOLS 插件组合测量启动耗时与内存占用")
+    plugins.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次")
+    plugins.add_argument("--set", dest="sets", action="append",
+                         help=f"DEVFLOW_TOOLS 取值，可重复指定（默认: {' '.join(DEFAULT_PLUGIN_SETS)}）")
+
+    tickets = subparsers.add_parser("tickets", help="测量从分支名/提交信息中提取 Jira 工单号的耗时")
+    tickets.add_argument("--repo", default=".", help="读取分支与提交信息的 Git 仓库（默认当前目录）")
+    tickets.add_argument("--branches-file", help="每行一个分支名的文件，指定后不读取仓库分支")
+    tickets.add_argument("--min-branches", type=int, default=5000, help="分支数不足时用生成的分支名补足到该数量")
+    tickets.add_argument("--commits", type=int, default=2000, help="扫描的最近提交数，0 表示跳过")
+
+    args = parser.parse_args(argv)
+    if args.command == "importtime":
+        return run_importtime(args.repeat, args.budget_ms, args.top)
+    if args.command == "plugins":
+        return run_plugins(args.repeat, args.sets or list(DEFAULT_PLUGIN_SETS))
+    if args.command == "tickets":
+        return run_tickets(Path(args.repo), args.branches_file, args.min_branches, args.commits)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,979 @@
+"""各插件共享的基础设施：文档目录定位、Front Matter 读写、任务状态与索引、Git 上下文、HTTP 连接池与工具注册。"""
+
+from __future__ import annotations
+
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+from pathlib import Path
+import os
+import sys
+import json
+from datetime import datetime
+import re
+import copy
+import functools
+import inspect
+import subprocess
+import threading
+import time
+import anyio
+import anyio.to_thread
+from urllib.parse import urlparse
+from collections import OrderedDict
+
+if TYPE_CHECKING:
+    # requests / pymysql / yaml / frontmatter 在各子系统首次使用时才导入，缩短 MCP 冷启动时间
+    import frontmatter
+    from mcp.server.fastmcp import FastMCP
+    from requests import Session
+
+# 文档根目录定位：优先使用环境变量 DOCS_PROJECT_ROOT，其次使用进程启动时的工作目录
+# 这样可将输出写入“调用方项目”的 Docs 目录，而不是 MCP 自身仓库
+PROJECT_ROOT = Path(os.getenv("DOCS_PROJECT_ROOT") or os.getcwd()).resolve()
+DOCS_ROOT = PROJECT_ROOT / "Docs"
+TASKS_DIR = DOCS_ROOT / ".tasks"
+PROCESS_DIR = DOCS_ROOT / "ProcessDocuments"
+
+# ---------- 工具注册 ----------
+# 插件模块（devflow_mcp/tools/*）用 @tool() 标记 MCP 工具，导入模块本身不会注册任何工具：
+# server 只对 DEVFLOW_TOOLS 选中的插件调用 register_tools，插件之间可以直接导入彼此的函数。
+# FastMCP 在事件循环线程中直接调用同步工具，一个慢速的 Jira/Wiki/MySQL 请求会阻塞其它所有工具调用。
+# 访问网络或数据库的工具以 @tool(threaded=True) 标记：对外暴露的是在工作线程中执行的异步包装，
+# 模块内仍是原同步函数，工具之间的直接调用不受影响。
+
+_TOOL_THREADS = max(1, int(os.getenv("DEVFLOW_TOOL_THREADS", "8")))
+_TOOL_THREAD_LIMITER: Optional[anyio.CapacityLimiter] = None
+
+
+def _tool_thread_limiter() -> anyio.CapacityLimiter:
+    """限制同时在线程中执行的工具数（需在事件循环内创建）"""
+    global _TOOL_THREAD_LIMITER
+    if _TOOL_THREAD_LIMITER is None:
+        _TOOL_THREAD_LIMITER = anyio.CapacityLimiter(_TOOL_THREADS)
+    return _TOOL_THREAD_LIMITER
+
+
+def tool(threaded: bool = False, **tool_kwargs):
+    """标记 MCP 工具，参数与 app.tool() 相同；threaded=True 时工具在线程池中执行，多个调用可以并行"""
+    def decorator(fn):
+        fn.__devflow_tool__ = (threaded, tool_kwargs)
+        return fn
+    return decorator
+
+
+def _run_in_thread(fn):
+    @functools.wraps(fn)
+    async def _threaded(*args, **kwargs):
+        return await anyio.to_thread.run_sync(
+            functools.partial(fn, *args, **kwargs), limiter=_tool_thread_limiter()
+        )
+    # 包装函数的 __globals__ 属于本模块，FastMCP 无法据此解析插件中的字符串注解，这里预先求值
+    _threaded.__signature__ = inspect.signature(fn, eval_str=True)
+    return _threaded
+
+
+def register_tools(app: FastMCP, module_name: str) -> List[str]:
+    """把模块中以 @tool() 标记的函数注册到 app，返回按定义顺序排列的工具名"""
+    registered: List[str] = []
+    for fn in list(vars(sys.modules[module_name]).values()):
+        marker = getattr(fn, "__devflow_tool__", None)
+        if marker is None or getattr(fn, "__module__", None) != module_name:
+            continue  # 从其它插件导入的工具由所属插件注册
+        threaded, tool_kwargs = marker
+        app.add_tool(_run_in_thread(fn) if threaded else fn, **tool_kwargs)
+        registered.append(tool_kwargs.get("name") or fn.__name__)
+    return registered
+
+# ---------- Git 上下文 ----------
+# 当前分支与 HEAD 提交直接从 .git/HEAD、refs 与 packed-refs 读取（支持 worktree 的 gitdir 文件），
+# 常见情况下不启动 git 子进程；结果按这些文件的 (mtime_ns, size, inode) 缓存。
+# 最近提交仍通过 git log 计算，但按 (仓库, HEAD 提交) 缓存，只有 HEAD 移动后才会重新执行。
+# 所有查询都以调用方的 projectRoot 为准，而不是 MCP 进程的工作目录。
+
+_GIT_LOG_CACHE_SIZE = 32
+_GIT_CONTEXT_LOCK = threading.Lock()
+_GIT_DIR_CACHE: Dict[str, Tuple[Path, Path]] = {}
+_GIT_HEAD_CACHE: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Optional[str]]]] = {}
+_GIT_LOG_CACHE: "OrderedDict[Tuple[str, str, int], List[Dict[str, Any]]]" = OrderedDict()
+_GIT_CONTEXT_STATS = {"headHits": 0, "headReads": 0, "logHits": 0, "logRuns": 0, "subprocessFallbacks": 0}
+
+
+def _find_git_dir(project_root: Path) -> Optional[Tuple[Path, Path]]:
+    """定位 (git_dir, common_dir)；worktree 中 .git 是指向 gitdir 的文件，refs 位于 common_dir"""
+    key = str(project_root)
+    with _GIT_CONTEXT_LOCK:
+        cached = _GIT_DIR_CACHE.get(key)
+    if cached and (cached[0] / "HEAD").exists():
+        return cached
+
+    for directory in (project_root, *project_root.parents):
+        dot_git = directory / ".git"
+        try:
+            if dot_git.is_dir():
+                git_dir = dot_git
+            elif dot_git.is_file():
+                content = dot_git.read_text(encoding="utf-8").strip()
+                if not content.startswith("gitdir:"):
+                    return None
+                git_dir = (directory / content[len("gitdir:"):].strip()).resolve()
+            else:
+                continue
+            common_dir = git_dir
+            commondir_file = git_dir / "commondir"
+            if commondir_file.is_file():
+                common_dir = (git_dir / commondir_file.read_text(encoding="utf-8").strip()).resolve()
+        except OSError:
+            return None
+        with _GIT_CONTEXT_LOCK:
+            _GIT_DIR_CACHE[key] = (git_dir, common_dir)
+        return git_dir, common_dir
+    return None
+
+
+def _git_stat_key(*paths: Optional[Path]) -> Tuple[Any, ...]:
+    key = []
+    for path in paths:
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+        key.append((stat.st_mtime_ns, stat.st_size, stat.st_ino) if stat else None)
+    return tuple(key)
+
+
+def _resolve_git_ref(common_dir: Path, ref: str) -> Optional[str]:
+    """解析分支引用：优先读取松散 ref 文件，其次查找 packed-refs"""
+    try:
+        return (common_dir / ref).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        pass
+    try:
+        with open(common_dir / "packed-refs", encoding="utf-8") as packed:
+            for line in packed:
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.rstrip("\n").partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return None
+
+
+def _git_subprocess(project_root: Path, *args: str) -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "-C", str(project_root), *args], capture_output=True, text=True, check=True)
+        return result.stdout
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+        return None
+
+
+def _read_git_head(project_root: Optional[Path] = None) -> Optional[Dict[str, Optional[str]]]:
+    """返回 {"branch": 分支名（游离 HEAD 时为 None）, "commit": HEAD 提交哈希}；不在 Git 仓库中时返回 None"""
+    root = project_root or _resolve_project_root(None)
+    located = _find_git_dir(root)
+    if located is None:
+        return None
+    git_dir, common_dir = located
+    cache_key = str(git_dir)
+
+    with _GIT_CONTEXT_LOCK:
+        cached = _GIT_HEAD_CACHE.get(cache_key)
+    if cached:
+        stat_key, head = cached
+        ref_path = common_dir / f"refs/heads/{head['branch']}" if head["branch"] else None
+        if stat_key == _git_stat_key(git_dir / "HEAD", common_dir / "packed-refs", ref_path, common_dir / "reftable" / "tables.list"):
+            with _GIT_CONTEXT_LOCK:
+                _GIT_CONTEXT_STATS["headHits"] += 1
+            return dict(head)
+
+    try:
+        content = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    branch: Optional[str] = None
+    commit: Optional[str] = None
+    if content.startswith("ref:"):
+        ref = content[len("ref:"):].strip()
+        if ref.startswith("refs/heads/"):
+            branch = ref[len("refs/heads/"):]
+        commit = _resolve_git_ref(common_dir, ref)
+    else:
+        commit = content or None
+
+    if commit is None and (branch is None or (common_dir / "reftable").exists()):
+        # 无法直接解析（如 reftable 格式的仓库），退回 git 子进程；尚无提交的新分支则保留分支名
+        with _GIT_CONTEXT_LOCK:
+            _GIT_CONTEXT_STATS["subprocessFallbacks"] += 1
+        branch = (_git_subprocess(root, "branch", "--show-current") or "").strip() or None
+        commit = (_git_subprocess(root, "rev-parse", "HEAD") or "").strip() or None
+
+    head = {"branch": branch, "commit": commit}
+    ref_path = common_dir / f"refs/heads/{branch}" if branch else None
+    with _GIT_CONTEXT_LOCK:
+        _GIT_CONTEXT_STATS["headReads"] += 1
+        _GIT_HEAD_CACHE[cache_key] = (_git_stat_key(git_dir / "HEAD", common_dir / "packed-refs", ref_path, common_dir / "reftable" / "tables.list"), dict(head))
+    return head
+
+
+def _format_relative_time(timestamp: int) -> str:
+    """与 git 的 %ar 格式一致（"3 hours ago"），在读取时计算，缓存的提交记录不会显示过期的相对时间"""
+    seconds = max(0, int(time.time()) - timestamp)
+    for unit, size in (("year", 365 * 86400), ("month", 30 * 86400), ("week", 7 * 86400),
+                       ("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size * (2 if unit in ("year", "month") else 1):
+            count = seconds // size
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return f"{seconds} seconds ago"
+
+
+def _get_recent_git_commits(limit: int = 5, project_root: Optional[Path] = None) -> List[Dict[str, str]]:
+    """获取最近的Git提交记录（按 HEAD 提交缓存）"""
+    root = project_root or _resolve_project_root(None)
+    head = _read_git_head(root)
+    if not head or not head["commit"]:
+        return []
+
+    cache_key = (str(_find_git_dir(root)[0]), head["commit"], limit)
+    with _GIT_CONTEXT_LOCK:
+        cached = _GIT_LOG_CACHE.get(cache_key)
+        if cached is not None:
+            _GIT_LOG_CACHE.move_to_end(cache_key)
+            _GIT_CONTEXT_STATS["logHits"] += 1
+    if cached is None:
+        output = _git_subprocess(root, "log", f"--max-count={limit}", "--pretty=format:%h%x1f%s%x1f%an%x1f%at", head["commit"])
+        if output is None:
+            return []
+        cached = []
+        for line in output.strip().split('\n'):
+            parts = line.split('\x1f')
+            if len(parts) >= 4:
+                cached.append({"hash": parts[0], "message": parts[1], "author": parts[2], "timestamp": int(parts[3])})
+        with _GIT_CONTEXT_LOCK:
+            _GIT_CONTEXT_STATS["logRuns"] += 1
+            _GIT_LOG_CACHE[cache_key] = cached
+            while len(_GIT_LOG_CACHE) > _GIT_LOG_CACHE_SIZE:
+                _GIT_LOG_CACHE.popitem(last=False)
+
+    return [
+        {"hash": c["hash"], "message": c["message"], "author": c["author"], "time": _format_relative_time(c["timestamp"])}
+        for c in cached
+    ]
+
+def _get_current_git_branch(project_root: Optional[Path] = None) -> str:
+    """获取当前Git分支名称（游离 HEAD 时为空字符串）"""
+    head = _read_git_head(project_root)
+    if head is None:
+        return "main"  # 默认分支
+    return head["branch"] or ""
+
+
+def _git_context_stats() -> Dict[str, Any]:
+    with _GIT_CONTEXT_LOCK:
+        stats: Dict[str, Any] = dict(_GIT_CONTEXT_STATS)
+        stats["repositories"] = len(_GIT_HEAD_CACHE)
+        stats["logEntries"] = len(_GIT_LOG_CACHE)
+    return stats
+
+# ---------- Jira 工单号提取 ----------
+# 所有命名习惯（feature/DTS-7442、DTS-7442-desc、hotfix/dts-7442 ...）都归结为“字母项目Key-数字”，
+# 用一个预编译正则按出现顺序提取，不再逐个尝试多个模式、也不占用 re 模块的全局缓存。
+# 配置 JIRA_PROJECT_KEYS（逗号分隔）后正则只匹配这些项目Key 的交替分支，可排除 release-2024 之类的误判。
+# 提取结果按 (文本, 项目Key 列表) 记忆化：同一分支名在进程内只解析一次。
+
+_TICKET_COMMIT_SCAN_LIMIT = 20
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_project_keys(raw: str) -> Tuple[str, ...]:
+    return tuple(sorted({key.strip().upper() for key in raw.split(",") if key.strip()}))
+
+
+def _jira_project_keys() -> Tuple[str, ...]:
+    """JIRA_PROJECT_KEYS 允许的项目Key；为空表示接受任意项目Key"""
+    return _parse_project_keys(os.getenv("JIRA_PROJECT_KEYS", ""))
+
+
+@functools.lru_cache(maxsize=16)
+def _ticket_key_regex(project_keys: Tuple[str, ...]) -> "re.Pattern[str]":
+    if not project_keys:
+        # 与拆分前的逐个模式尝试保持一致：只接受纯字母前缀，v2-2019、sha256-1 之类不会被当成工单号
+        return re.compile(r"([A-Z]+-\d+)", re.IGNORECASE)
+    # 长Key 在前，避免 AB 抢先匹配 ABC-1 中的前缀；白名单内的 Key 可以带数字（CORE2-1）
+    alternation = "|".join(re.escape(key) for key in sorted(project_keys, key=len, reverse=True))
+    return re.compile(rf"(?<![A-Z0-9])((?:{alternation})-\d+)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_ticket_keys_cached(text: str, project_keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    keys: Dict[str, None] = {}
+    for match in _ticket_key_regex(project_keys).finditer(text):
+        keys.setdefault(match.group(1).upper())
+    return tuple(keys)
+
+
+def _extract_ticket_keys(text: Optional[str], project_keys: Optional[Tuple[str, ...]] = None) -> List[str]:
+    """按出现顺序提取文本中的全部工单号（去重、大写）"""
+    if not text:
+        return []
+    return list(_extract_ticket_keys_cached(text, _jira_project_keys() if project_keys is None else project_keys))
+
+
+def _extract_ticket_from_branch(branch_name: str) -> Optional[str]:
+    """从分支名称中提取ticket号码（取第一个）"""
+    keys = _extract_ticket_keys(branch_name)
+    return keys[0] if keys else None
+
+
+def _collect_ticket_keys(project_root: Optional[Path] = None, branch_name: Optional[str] = None,
+                         commit_limit: int = _TICKET_COMMIT_SCAN_LIMIT) -> List[str]:
+    """汇总分支名与最近提交信息中的工单号：分支名中的在前，其余按提交从新到旧排列"""
+    if branch_name is None:
+        branch_name = _get_current_git_branch(project_root)
+    keys: Dict[str, None] = dict.fromkeys(_extract_ticket_keys(branch_name))
+    if commit_limit > 0:
+        for commit in _get_recent_git_commits(commit_limit, project_root):
+            for key in _extract_ticket_keys(commit["message"]):
+                keys.setdefault(key)
+    return list(keys)
+
+
+_PROJECT_KEY_PATTERN = re.compile(r"^([A-Z][A-Z0-9]*)-\d+")
+
+
+def _get_project_key_from_ticket(ticket_key: str) -> Optional[str]:
+    """从ticket号码中提取项目key"""
+    if not ticket_key:
+        return None
+    
+    # 提取项目前缀，例如 DTS-7442 -> DTS
+    match = _PROJECT_KEY_PATTERN.match(ticket_key)
+    if match:
+        return match.group(1)
+    
+    return None
+
+def _auto_detect_jira_context(project_root: Optional[Path] = None, include_commits: bool = False) -> Dict[str, Any]:
+    """自动检测当前上下文的Jira相关信息（以 project_root 所在仓库为准）
+
+    include_commits=True 时同时扫描最近提交信息：ticket_keys 包含所有关联工单，
+    分支名中没有工单号时 ticket_key 取最近一次提到的工单。
+    """
+    branch_name = _get_current_git_branch(project_root)
+    if include_commits:
+        ticket_keys = _collect_ticket_keys(project_root, branch_name)
+    else:
+        ticket_keys = _extract_ticket_keys(branch_name)
+    ticket_key = ticket_keys[0] if ticket_keys else None
+    project_key = _get_project_key_from_ticket(ticket_key) if ticket_key else None
+    
+    return {
+        "branch_name": branch_name,
+        "ticket_key": ticket_key,
+        "ticket_keys": ticket_keys,
+        "project_key": project_key
+    }
+
+# ---------- Utils ----------
+
+def _ensure_dirs_for(project_root: Optional[Path], task_key: Optional[str] = None) -> Dict[str, Path]:
+    base = (project_root or PROJECT_ROOT)
+    docs_root = base / "Docs"
+    tasks_dir = docs_root / ".tasks"
+    process_dir = docs_root / "ProcessDocuments"
+    if task_key:
+        process_dir = process_dir / f"task-{task_key}"
+    tasks_dir.mkdir(parents=True, exist_ok=True)
+    process_dir.mkdir(parents=True, exist_ok=True)
+    return {"docs_root": docs_root, "tasks_dir": tasks_dir, "process_dir": process_dir}
+
+
+def _timestamp() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _resolve_project_root(explicit: Optional[str]) -> Path:
+    if explicit:
+        return Path(explicit).resolve()
+    env = os.getenv("DOCS_PROJECT_ROOT")
+    if env:
+        return Path(env).resolve()
+    return Path(os.getcwd()).resolve()
+
+
+def _relpath(path: Path, root: Path) -> str:
+    try:
+        return str(path.resolve().relative_to(root.resolve()))
+    except Exception:
+        return str(path)
+
+
+# ---------- Front Matter 解析缓存 ----------
+
+# 进程级 LRU：键为解析后的绝对路径，命中还需 (mtime_ns, size) 一致
+_FRONTMATTER_CACHE_SIZE = int(os.getenv("DEVFLOW_FRONTMATTER_CACHE_SIZE", "256"))
+_FRONTMATTER_CACHE: "OrderedDict[str, Tuple[Tuple[int, int], frontmatter.Post]]" = OrderedDict()
+_FRONTMATTER_CACHE_LOCK = threading.Lock()
+_FRONTMATTER_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def _load_frontmatter(path: Path, mutable: bool = False) -> frontmatter.Post:
+    """读取 Front Matter 文档（带缓存）。
+
+    返回的对象在缓存中共享，调用方不得修改；需要修改时传 mutable=True 获取深拷贝。
+    """
+    resolved = str(Path(path).resolve())
+    stat = os.stat(resolved)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    with _FRONTMATTER_CACHE_LOCK:
+        cached = _FRONTMATTER_CACHE.get(resolved)
+        if cached and cached[0] == key:
+            _FRONTMATTER_CACHE.move_to_end(resolved)
+            _FRONTMATTER_CACHE_STATS["hits"] += 1
+            post = cached[1]
+            return copy.deepcopy(post) if mutable else post
+
+    import frontmatter
+
+    post = frontmatter.load(resolved)
+
+    with _FRONTMATTER_CACHE_LOCK:
+        _FRONTMATTER_CACHE_STATS["misses"] += 1
+        _FRONTMATTER_CACHE[resolved] = (key, post)
+        _FRONTMATTER_CACHE.move_to_end(resolved)
+        while len(_FRONTMATTER_CACHE) > max(1, _FRONTMATTER_CACHE_SIZE):
+            _FRONTMATTER_CACHE.popitem(last=False)
+            _FRONTMATTER_CACHE_STATS["evictions"] += 1
+    return copy.deepcopy(post) if mutable else post
+
+
+def _invalidate_frontmatter(path: Path) -> None:
+    resolved = str(Path(path).resolve())
+    with _FRONTMATTER_CACHE_LOCK:
+        if _FRONTMATTER_CACHE.pop(resolved, None) is not None:
+            _FRONTMATTER_CACHE_STATS["invalidations"] += 1
+
+
+def _frontmatter_cache_stats() -> Dict[str, Any]:
+    with _FRONTMATTER_CACHE_LOCK:
+        stats: Dict[str, Any] = dict(_FRONTMATTER_CACHE_STATS)
+        stats["size"] = len(_FRONTMATTER_CACHE)
+    stats["maxSize"] = _FRONTMATTER_CACHE_SIZE
+    lookups = stats["hits"] + stats["misses"]
+    stats["hitRate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def _fsync_dir(directory: Path) -> None:
+    """把目录项（rename 的结果）刷到磁盘；不支持对目录 fsync 的平台直接跳过"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_doc(path: Path, content: str, sync_dir: bool = True) -> None:
+    """原子写入文档（临时文件 + fsync + rename）并使对应的 Front Matter 缓存失效。
+
+    读者只会看到完整的旧内容或新内容。批量写入同一目录时传 sync_dir=False，
+    由调用方在全部写完后调用一次 _fsync_dir。
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(content)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass  # 新文件沿用默认权限
+        os.replace(tmp_path, path)
+        if sync_dir:
+            _fsync_dir(path.parent)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+    finally:
+        _invalidate_frontmatter(path)
+
+
+def _read_task_status(project_root: Path, task_key: str) -> str:
+    main_doc = (project_root / "Docs" / ".tasks" / f"{task_key}.md")
+    if not main_doc.exists():
+        return "DRAFT"
+    try:
+        post = _load_frontmatter(main_doc)
+        status = str(post.metadata.get("status", "DRAFT")).strip().upper()
+        return status or "DRAFT"
+    except Exception:
+        return "DRAFT"
+
+
+# 状态定义和转换规则
+_STATUS_ORDER = {"DRAFT": 1, "PENDING_REVIEW": 2, "CHANGES_REQUESTED": 2, "APPROVED": 3, "PUBLISHED": 4}
+
+# 合法的状态转换路径
+_STATUS_TRANSITIONS = {
+    "DRAFT": ["PENDING_REVIEW"],
+    "PENDING_REVIEW": ["APPROVED", "CHANGES_REQUESTED"],
+    "CHANGES_REQUESTED": ["PENDING_REVIEW", "DRAFT"], 
+    "APPROVED": ["PUBLISHED", "CHANGES_REQUESTED"],
+    "PUBLISHED": []  # 终态，不允许转换
+}
+
+def _validate_status_transition(from_status: str, to_status: str) -> bool:
+    """验证状态转换是否合法"""
+    if from_status not in _STATUS_TRANSITIONS:
+        return False
+    return to_status in _STATUS_TRANSITIONS[from_status]
+
+def _require_min_status(project_root: Path, task_key: str, min_status: str) -> None:
+    current = _read_task_status(project_root, task_key)
+    if _STATUS_ORDER.get(current, 0) < _STATUS_ORDER.get(min_status, 0):
+        raise ValueError(f"Action not allowed: require >= {min_status}, current={current}")
+
+class StatusValidationError(Exception):
+    """状态验证错误"""
+    pass
+
+def _get_task_metadata(project_root: Path, task_key: str) -> Dict[str, Any]:
+    """获取任务的元数据"""
+    main_doc = (project_root / "Docs" / ".tasks" / f"{task_key}.md")
+    if not main_doc.exists():
+        return {}
+    try:
+        post = _load_frontmatter(main_doc)
+        return copy.deepcopy(post.metadata) if post.metadata else {}
+    except Exception:
+        return {}
+
+# ---------- 任务索引（Docs/.tasks/.index.json） ----------
+
+# 索引按文件名记录 mtime/size 与状态报告所需的元数据摘要，
+# 只有 stat 变化的文件才会重新解析 Front Matter
+_TASK_INDEX_FILE = ".index.json"
+_TASK_INDEX_VERSION = 1
+_TASK_INDEX_LOCK = threading.Lock()
+
+
+def _json_safe(value: Any) -> Any:
+    """将 Front Matter 中的 datetime/date 等值转换为可 JSON 序列化的形式"""
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _build_task_index_entry(task_file: Path, stat: os.stat_result) -> Dict[str, Any]:
+    """解析单个任务文件，生成索引条目"""
+    entry: Dict[str, Any] = {"mtimeNs": stat.st_mtime_ns, "size": stat.st_size}
+    try:
+        post = _load_frontmatter(task_file)
+    except Exception:
+        entry["error"] = True
+        return entry
+
+    metadata = post.metadata or {}
+    reviews = metadata.get("reviews", []) or []
+    latest_review = None
+    if reviews:
+        try:
+            latest_review = max(reviews, key=lambda x: x.get("time", ""))
+        except Exception:
+            latest_review = reviews[-1]
+
+    entry.update(_json_safe({
+        "status": metadata.get("status", "DRAFT"),
+        "owner": metadata.get("owner", ""),
+        "reviewers": list(metadata.get("reviewers", []) or []),
+        "updatedAt": metadata.get("updatedAt", ""),
+        "statusStats": metadata.get("statusStats", {}) or {},
+        "reviewCount": len(reviews),
+        "latestReview": latest_review,
+    }))
+    return entry
+
+
+def _load_task_index(tasks_dir: Path) -> Dict[str, Dict[str, Any]]:
+    index_path = tasks_dir / _TASK_INDEX_FILE
+    try:
+        data = json.loads(index_path.read_text(encoding="utf-8"))
+        if data.get("version") == _TASK_INDEX_VERSION and isinstance(data.get("entries"), dict):
+            return data["entries"]
+    except Exception:
+        pass
+    return {}
+
+
+def _save_task_index(tasks_dir: Path, entries: Dict[str, Dict[str, Any]]) -> None:
+    index_path = tasks_dir / _TASK_INDEX_FILE
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(
+            json.dumps({"version": _TASK_INDEX_VERSION, "entries": entries}, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, index_path)
+    except Exception:
+        # 索引只是加速手段，写入失败不影响主流程
+        try:
+            tmp_path.unlink()
+        except Exception:
+            pass
+
+
+def _refresh_task_index(project_root: Path) -> Dict[str, Dict[str, Any]]:
+    """返回 {任务Key: 索引条目}，仅重新解析 mtime/size 变化的任务文件"""
+    tasks_dir = project_root / "Docs" / ".tasks"
+    if not tasks_dir.exists():
+        return {}
+
+    with _TASK_INDEX_LOCK:
+        entries = _load_task_index(tasks_dir)
+        refreshed: Dict[str, Dict[str, Any]] = {}
+        changed = False
+        with os.scandir(tasks_dir) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith(".md") or not dir_entry.is_file():
+                    continue
+                task_key = dir_entry.name[:-3]
+                stat = dir_entry.stat()
+                cached = entries.get(task_key)
+                if cached and cached.get("mtimeNs") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+                    refreshed[task_key] = cached
+                else:
+                    refreshed[task_key] = _build_task_index_entry(Path(dir_entry.path), stat)
+                    changed = True
+        if changed or len(refreshed) != len(entries):
+            _save_task_index(tasks_dir, refreshed)
+        return refreshed
+
+
+def _update_task_index(project_root: Path, *task_keys: str) -> None:
+    """写入任务主文档后增量更新索引中的对应条目（批量写入时一次更新多个）"""
+    tasks_dir = project_root / "Docs" / ".tasks"
+    with _TASK_INDEX_LOCK:
+        entries = _load_task_index(tasks_dir)
+        for task_key in task_keys:
+            task_file = tasks_dir / f"{task_key}.md"
+            try:
+                entries[task_key] = _build_task_index_entry(task_file, task_file.stat())
+            except FileNotFoundError:
+                entries.pop(task_key, None)
+        _save_task_index(tasks_dir, entries)
+
+def _generate_task_progress_report(project_root: Path, task_key: str, include_status: bool = True, include_changes: bool = True, include_next_steps: bool = True) -> Dict[str, Any]:
+    """生成任务进展报告"""
+    report = {
+        "taskKey": task_key,
+        "timestamp": _timestamp(),
+        "status": None,
+        "recentChanges": [],
+        "nextSteps": [],
+        "processDocuments": []
+    }
+    
+    # 1. 获取任务状态信息
+    if include_status:
+        try:
+            task_metadata = _get_task_metadata(project_root, task_key)
+            current_status = _read_task_status(project_root, task_key)
+            
+            report["status"] = {
+                "current": current_status,
+                "title": task_metadata.get("title", ""),
+                "owner": task_metadata.get("owner", ""),
+                "reviewers": task_metadata.get("reviewers", []),
+                "updatedAt": task_metadata.get("updatedAt", ""),
+                "reviews": task_metadata.get("reviews", [])[-3:]  # 最近3次审核记录
+            }
+        except Exception:
+            report["status"] = {"current": "UNKNOWN", "error": "无法读取任务状态"}
+    
+    # 2. 获取最近的Git改动
+    if include_changes:
+        report["recentChanges"] = _get_recent_git_commits(5, project_root)
+    
+    # 3. 扫描过程文档状态
+    try:
+        process_dir = project_root / "Docs" / "ProcessDocuments" / f"task-{task_key}"
+        if process_dir.exists():
+            docs_info = []
+            doc_names = [
+                ("01-Context.md", "背景与目标"),
+                ("02-Design.md", "设计方案"),
+                ("03-CodePlan.md", "代码计划"),
+                ("04-TestCurls.md", "测试用例"),
+                ("05-MySQLVerificationPlan.md", "MySQL验证"),
+                ("06-Integration.md", "集成文档"),
+                ("07-JiraPublishPlan.md", "Jira发布")
+            ]
+            
+            for doc_file, doc_title in doc_names:
+                doc_path = process_dir / f"{task_key}_{doc_file}"
+                if doc_path.exists():
+                    try:
+                        # 读取文档状态
+                        post = _load_frontmatter(doc_path)
+                        doc_status = post.metadata.get("status", "UNKNOWN")
+                        updated_at = post.metadata.get("updatedAt", "")
+                        
+                        docs_info.append({
+                            "name": doc_title,
+                            "file": doc_file,
+                            "status": doc_status,
+                            "updatedAt": updated_at,
+                            "exists": True
+                        })
+                    except Exception:
+                        docs_info.append({
+                            "name": doc_title,
+                            "file": doc_file,
+                            "status": "ERROR",
+                            "exists": True
+                        })
+                else:
+                    docs_info.append({
+                        "name": doc_title,
+                        "file": doc_file,
+                        "status": "MISSING",
+                        "exists": False
+                    })
+            
+            report["processDocuments"] = docs_info
+    except Exception:
+        report["processDocuments"] = []
+    
+    # 4. 生成下一步建议
+    if include_next_steps:
+        next_steps = []
+        current_status = report.get("status", {}).get("current", "UNKNOWN")
+        
+        if current_status == "DRAFT":
+            next_steps.append("完善任务文档内容，准备提交审核")
+            next_steps.append("确保所有必要的过程文档已创建")
+        elif current_status == "PENDING_REVIEW":
+            next_steps.append("等待审核人员审核")
+            next_steps.append("准备根据审核意见进行修改")
+        elif current_status == "APPROVED":
+            next_steps.append("开始执行开发任务")
+            next_steps.append("生成测试用例和验证计划")
+        elif current_status == "CHANGES_REQUESTED":
+            next_steps.append("根据审核意见修改文档")
+            next_steps.append("重新提交审核")
+        elif current_status == "PUBLISHED":
+            next_steps.append("任务已完成，进行后续维护")
+            next_steps.append("收集使用反馈")
+        
+        # 基于文档状态添加建议
+        for doc in report.get("processDocuments", []):
+            if not doc["exists"]:
+                next_steps.append(f"创建缺失的文档：{doc['name']}")
+            elif doc["status"] == "DRAFT":
+                next_steps.append(f"完善文档内容：{doc['name']}")
+        
+        report["nextSteps"] = next_steps[:5]  # 限制建议数量
+    
+    return report
+
+
+# ---------- HTTP 连接池 ----------
+
+# 对这些状态码按指数退避重试（429/503 会遵循 Retry-After）
+_HTTP_RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+class _HostRateLimiter:
+    """按主机划分的匀速限流器：同一主机相邻两次请求至少间隔 1/rate 秒"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# 延迟直方图的桶上界（毫秒），最后一个桶收集超过上界的请求
+_HTTP_LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _HttpMetrics:
+    """单个 HTTP 客户端的请求计数、状态码分布、重试次数与延迟直方图（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.retries = 0
+            self.by_method: Dict[str, int] = {}
+            self.by_status: Dict[str, int] = {}
+            self.buckets = [0] * (len(_HTTP_LATENCY_BUCKETS_MS) + 1)
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+
+    def record(self, method: str, status: Optional[int], elapsed_ms: float, retries: int = 0) -> None:
+        bucket = next((i for i, bound in enumerate(_HTTP_LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(_HTTP_LATENCY_BUCKETS_MS))
+        status_key = str(status) if status is not None else "error"
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            if status is None or status >= 400:
+                self.errors += 1
+            self.by_method[method] = self.by_method.get(method, 0) + 1
+            self.by_status[status_key] = self.by_status.get(status_key, 0) + 1
+            self.buckets[bucket] += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        """按直方图估算分位数（返回所在桶的上界）"""
+        target = self.requests * fraction
+        seen = 0
+        for bound, count in zip(_HTTP_LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if count and seen >= target:
+                return float(bound)
+        return round(self.max_ms, 2) if self.requests else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histogram = {f"<={bound}": count for bound, count in zip(_HTTP_LATENCY_BUCKETS_MS, self.buckets)}
+            histogram[f">{_HTTP_LATENCY_BUCKETS_MS[-1]}"] = self.buckets[-1]
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "byMethod": dict(self.by_method),
+                "byStatus": dict(self.by_status),
+                "avgMs": round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+                "maxMs": round(self.max_ms, 2),
+                "p50Ms": self._percentile(0.5),
+                "p95Ms": self._percentile(0.95),
+                "latencyHistogramMs": histogram,
+            }
+
+
+_HTTP_METRICS: Dict[str, _HttpMetrics] = {}
+_HTTP_METRICS_LOCK = threading.Lock()
+
+
+def _http_client_metrics(name: str) -> _HttpMetrics:
+    """按客户端名（环境变量前缀，如 JIRA/WIKI）取得统计对象；会话重建后仍累计到同一对象"""
+    with _HTTP_METRICS_LOCK:
+        metrics = _HTTP_METRICS.get(name)
+        if metrics is None:
+            metrics = _HTTP_METRICS[name] = _HttpMetrics()
+        return metrics
+
+
+def _http_metrics_stats(reset: bool = False) -> Dict[str, Dict[str, Any]]:
+    with _HTTP_METRICS_LOCK:
+        clients = dict(_HTTP_METRICS)
+    stats = {name: metrics.snapshot() for name, metrics in sorted(clients.items())}
+    if reset:
+        for metrics in clients.values():
+            metrics.reset()
+    return stats
+
+
+_POOLED_SESSION_CLASS: Optional[type] = None
+
+
+def _pooled_session_class() -> type:
+    """首次使用时定义 _PooledSession（requests 按需导入）"""
+    global _POOLED_SESSION_CLASS
+    if _POOLED_SESSION_CLASS is None:
+        from requests import Session
+
+        class _PooledSession(Session):
+            """长连接复用的 Session：挂载带重试的连接池，为未指定超时的请求补上默认超时，并记录请求统计"""
+
+            def __init__(self, default_timeout: float, rate_limiter: Optional[_HostRateLimiter] = None,
+                         metrics: Optional[_HttpMetrics] = None):
+                super().__init__()
+                self.default_timeout = default_timeout
+                self.rate_limiter = rate_limiter
+                self.metrics = metrics
+
+            def request(self, method, url, **kwargs):
+                if kwargs.get("timeout") is None:
+                    kwargs["timeout"] = self.default_timeout
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(urlparse(url).netloc)
+                if self.metrics is None:
+                    return super().request(method, url, **kwargs)
+
+                started = time.perf_counter()
+                try:
+                    response = super().request(method, url, **kwargs)
+                except Exception:
+                    self.metrics.record(method.upper(), None, (time.perf_counter() - started) * 1000)
+                    raise
+                # urllib3 在连接池内完成的重试记录在 response.raw.retries.history 中
+                retry_state = getattr(response.raw, "retries", None)
+                retries = len(getattr(retry_state, "history", None) or ())
+                self.metrics.record(method.upper(), response.status_code, (time.perf_counter() - started) * 1000, retries)
+                return response
+
+        _POOLED_SESSION_CLASS = _PooledSession
+    return _POOLED_SESSION_CLASS
+
+
+def _build_pooled_session(env_prefix: str) -> Session:
+    """按 {PREFIX}_POOL_SIZE / _MAX_RETRIES / _BACKOFF_FACTOR / _TIMEOUT / _RATE_LIMIT 环境变量构建连接池会话，
+    请求统计累计到名为 PREFIX 的 _HttpMetrics（见 runtime_stats 的 httpClients）"""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    pool_size = max(1, int(os.getenv(f"{env_prefix}_POOL_SIZE", "10")))
+    max_retries = max(0, int(os.getenv(f"{env_prefix}_MAX_RETRIES", "3")))
+    backoff_factor = float(os.getenv(f"{env_prefix}_BACKOFF_FACTOR", "0.5"))
+    timeout = float(os.getenv(f"{env_prefix}_TIMEOUT", "30"))
+    rate_limit = float(os.getenv(f"{env_prefix}_RATE_LIMIT", "0"))  # 次/秒，0 表示不限速
+
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=_HTTP_RETRY_STATUS_CODES,
+        respect_retry_after_header=True,
+        raise_on_status=False,  # 重试耗尽后返回最后一次响应，由调用方按状态码处理
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = _pooled_session_class()(
+        default_timeout=timeout,
+        rate_limiter=_HostRateLimiter(rate_limit) if rate_limit > 0 else None,
+        metrics=_http_client_metrics(env_prefix),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,2227 @@
+"""Jira 工具：创建/更新/评论/流转 Issue、附件上传下载、需求抓取与测试覆盖分析。"""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Dict, Any, Optional, Set, Tuple, TYPE_CHECKING
+from pathlib import Path
+import os
+import json
+import re
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from devflow_mcp.common import (
+    PROJECT_ROOT,
+    _auto_detect_jira_context,
+    _build_pooled_session,
+    _collect_ticket_keys,
+    _ensure_dirs_for,
+    _fsync_dir,
+    _generate_task_progress_report,
+    _get_project_key_from_ticket,
+    _jira_project_keys,
+    _load_frontmatter,
+    _relpath,
+    _require_min_status,
+    _resolve_project_root,
+    _timestamp,
+    _update_task_index,
+    _write_doc,
+    tool,
+)
+from devflow_mcp.tools.tasks import PrepareDocsInput, task_prepare_docs
+
+if TYPE_CHECKING:
+    from requests import Session
+
+class JiraPublishInput(BaseModel):
+    """生成 Jira 提交计划的输入参数"""
+    model_config = ConfigDict(title="JiraPublishInput", description="生成 Jira 提交计划的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    projectKey: Optional[str] = Field(None, description="Jira 项目 Key（可选，为空时自动从Git分支解析）")
+    issueType: str = Field(..., description="工单类型，如 Task/Story/Documentation")
+    summary: str = Field(..., description="工单标题")
+    description: str = Field(..., description="工单描述")
+    labels: List[str] = Field(default_factory=list, description="标签列表（可选）")
+    attachments: List[str] = Field(default_factory=list, description="要上传的附件路径列表（可选）")
+    links: List[Dict[str, str]] = Field(default_factory=list, description="要关联的工单列表（可选）")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录，用于解析附件相对路径")
+    autoDetectFromBranch: bool = Field(True, description="是否自动从Git分支检测项目信息（默认启用）")
+
+class JiraCreateIssueOutput(BaseModel):
+    issueKey: Optional[str] = None
+    url: Optional[str] = None
+    hint: str
+
+class JiraAttachFilesOutput(BaseModel):
+    attached: List[str]
+    failed: List[Dict[str, Any]]
+    skipped: List[str] = Field(default_factory=list)
+    results: List[Dict[str, Any]] = Field(default_factory=list)  # 按输入顺序的逐文件结果：path/filename/bytes/status/httpStatus/reason
+    hint: str
+
+class JiraPublishOutput(BaseModel):
+    jiraPlanDoc: str
+    jiraPlanDocRelative: Optional[str] = None
+    jiraPayload: Dict[str, Any]
+    createdIssue: Optional[JiraCreateIssueOutput] = None
+    attachmentResults: Optional[JiraAttachFilesOutput] = None
+    executed: bool = False
+
+# ---------- Jira分析与测试对比相关模型 ----------
+
+class JiraFetchInput(BaseModel):
+    """Jira工单获取的输入参数"""
+    model_config = ConfigDict(title="JiraFetchInput", description="Jira工单获取的输入参数")
+    issueKey: str = Field(..., description="Jira工单Key，如 PROJ-123")
+    includeSubtasks: bool = Field(True, description="是否包含子任务")
+    includeAttachments: bool = Field(True, description="是否下载附件")
+    includeHistory: bool = Field(False, description="是否包含变更历史")
+    attachmentPath: Optional[str] = Field(None, description="附件下载路径（相对于项目根目录）")
+    attachmentConcurrency: int = Field(4, ge=1, le=16, description="并发下载附件的最大线程数")
+    maxAttachmentBytes: Optional[int] = Field(None, ge=0, description="单个附件大小上限（字节），超过则跳过；默认取 JIRA_ATTACHMENT_MAX_FILE_BYTES")
+    attachmentBudgetBytes: Optional[int] = Field(None, ge=0, description="本次调用下载附件的总字节预算，超出后不再下载；默认取 JIRA_ATTACHMENT_BUDGET_BYTES")
+    
+class JiraIssueInfo(BaseModel):
+    """Jira工单信息"""
+    key: str
+    summary: str
+    description: str
+    status: str
+    issueType: str
+    priority: str
+    assignee: Optional[str] = None
+    reporter: Optional[str] = None
+    created: str
+    updated: str
+    customFields: Dict[str, Any] = Field(default_factory=dict)
+    
+class JiraSubtask(BaseModel):
+    """Jira子任务信息"""
+    key: str
+    summary: str
+    description: str
+    status: str
+    assignee: Optional[str] = None
+    
+class JiraAttachment(BaseModel):
+    """Jira附件信息"""
+    id: str
+    filename: str
+    size: int
+    mimeType: str
+    author: str
+    created: str
+    downloadUrl: str
+    localPath: Optional[str] = None  # 下载后的本地路径
+    skippedReason: Optional[str] = None  # 未下载的原因（超过单文件上限/总预算、下载失败）
+    fromCache: bool = False  # 是否来自本地附件缓存
+    bytesPerSecond: Optional[float] = None  # 网络下载吞吐（字节/秒）
+    downloadRetries: int = 0  # 连接中断后的续传次数
+    
+class JiraFetchOutput(BaseModel):
+    issueInfo: JiraIssueInfo
+    subtasks: List[JiraSubtask] = Field(default_factory=list)
+    attachments: List[JiraAttachment] = Field(default_factory=list)
+    downloadedFiles: List[str] = Field(default_factory=list)
+    
+class TestAnalysisInput(BaseModel):
+    """测试分析的输入参数"""
+    model_config = ConfigDict(title="TestAnalysisInput", description="测试分析的输入参数")
+    taskKey: str = Field(..., description="DevFlow任务Key")
+    jiraIssueKey: str = Field(..., description="关联的Jira工单Key")
+    analysisType: str = Field("coverage", description="分析类型：coverage/gap/recommendation")
+    includeAttachments: bool = Field(True, description="是否分析附件内容")
+    projectRoot: Optional[str] = Field(None, description="项目根目录")
+    
+class RequirementItem(BaseModel):
+    """需求条目"""
+    id: str
+    title: str
+    description: str
+    priority: str = "Medium"
+    category: str = "功能性"
+    source: str  # 来源：description/subtask/attachment
+    
+class TestCaseMatch(BaseModel):
+    """测试用例匹配信息"""
+    requirementId: str
+    testCases: List[str] = Field(default_factory=list)
+    coverage: float  # 0-1之间的覆盖度
+    gaps: List[str] = Field(default_factory=list)
+    
+class TestAnalysisOutput(BaseModel):
+    taskKey: str
+    jiraIssueKey: str
+    requirements: List[RequirementItem]
+    testMatches: List[TestCaseMatch] 
+    overallCoverage: float
+    missingTests: List[str]
+    recommendedTests: List[str]
+    analysisReport: str  # 详细的分析报告路径
+    
+class RequirementSyncInput(BaseModel):
+    """需求同步的输入参数"""
+    model_config = ConfigDict(title="RequirementSyncInput", description="需求同步的输入参数")
+    jiraIssueKey: str = Field(..., description="Jira工单Key")
+    targetTaskKey: Optional[str] = Field(None, description="目标DevFlow任务Key，为空则自动创建")
+    syncMode: str = Field("update", description="同步模式：create/update/merge")
+    autoGenerateTests: bool = Field(False, description="是否自动生成测试用例")
+    projectRoot: Optional[str] = Field(None, description="项目根目录")
+    
+class RequirementSyncOutput(BaseModel):
+    taskKey: str
+    jiraIssueKey: str
+    createdFiles: List[str]
+    updatedFiles: List[str]
+    generatedTests: List[str]
+    syncReport: str
+
+# ---------- Jira与测试分析辅助函数 ----------
+
+# ---------- 附件内容缓存 ----------
+# 附件按 (来源, 实例, 附件ID, size, created) 索引，内容以 sha256 寻址存放在 objects/ 下；
+# 命中时直接硬链接到目标目录（跨文件系统时退回复制），不再访问网络。
+# 缓存总大小超过上限时按最近访问时间淘汰；已链接到各工单目录的文件不受影响。
+# 命中只更新内存中的访问时间，索引在写入新内容（及随之淘汰）时才落盘；链接/复制文件不持有锁。
+
+_ATTACHMENT_CACHE_DIR = Path(os.getenv("DEVFLOW_ATTACHMENT_CACHE_DIR", str(Path.home() / ".cache" / "devflow-mcp" / "attachments")))
+_ATTACHMENT_CACHE_MAX_BYTES = int(os.getenv("DEVFLOW_ATTACHMENT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+_ATTACHMENT_CACHE_INDEX_FILE = "index.json"
+_ATTACHMENT_CACHE_LOCK = threading.Lock()
+_ATTACHMENT_CACHE_ENTRIES: Optional[Dict[str, Dict[str, Any]]] = None
+_ATTACHMENT_CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytesSaved": 0}
+
+
+def _attachment_cache_key(source: str, attachment_id: str, size: Any, created: Any) -> str:
+    """附件缓存键；size/created 变化（附件被替换）即视为新内容"""
+    base_url = os.getenv(f"{source.upper()}_BASE_URL", "").rstrip("/")
+    return f"{source}|{base_url}|{attachment_id}|{size}|{created}"
+
+
+def _attachment_blob_path(digest: str) -> Path:
+    return _ATTACHMENT_CACHE_DIR / "objects" / digest[:2] / digest
+
+
+def _attachment_cache_entries() -> Dict[str, Dict[str, Any]]:
+    """加载缓存索引（调用方需持有 _ATTACHMENT_CACHE_LOCK）"""
+    global _ATTACHMENT_CACHE_ENTRIES
+    if _ATTACHMENT_CACHE_ENTRIES is None:
+        entries: Dict[str, Dict[str, Any]] = {}
+        index_file = _ATTACHMENT_CACHE_DIR / _ATTACHMENT_CACHE_INDEX_FILE
+        try:
+            data = json.loads(index_file.read_text(encoding="utf-8"))
+            if isinstance(data, dict) and isinstance(data.get("entries"), dict):
+                entries = data["entries"]
+        except Exception:
+            pass  # 索引缺失或损坏时从空缓存开始
+        _ATTACHMENT_CACHE_ENTRIES = entries
+    return _ATTACHMENT_CACHE_ENTRIES
+
+
+def _save_attachment_cache_index() -> None:
+    """原子写入缓存索引（调用方需持有 _ATTACHMENT_CACHE_LOCK）"""
+    index_file = _ATTACHMENT_CACHE_DIR / _ATTACHMENT_CACHE_INDEX_FILE
+    try:
+        _ATTACHMENT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = index_file.with_name(f"{index_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps({"entries": _attachment_cache_entries()}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_file, index_file)
+    except Exception:
+        pass  # 索引写入失败只影响下次进程的命中率
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """将 src 硬链接到 dest（已存在则替换）；无法硬链接时复制"""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        try:
+            if os.path.samefile(src, dest):
+                return
+        except OSError:
+            pass
+        dest.unlink()
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def _attachment_cache_contains(cache_key: str) -> bool:
+    """仅判断是否已缓存（不计入统计、不更新访问时间）"""
+    with _ATTACHMENT_CACHE_LOCK:
+        entry = _attachment_cache_entries().get(cache_key)
+        return bool(entry) and _attachment_blob_path(entry["sha256"]).exists()
+
+
+def _attachment_cache_fetch(cache_key: str, dest: Path) -> bool:
+    """缓存命中时把内容放到 dest 并返回 True"""
+    with _ATTACHMENT_CACHE_LOCK:
+        entries = _attachment_cache_entries()
+        entry = entries.get(cache_key)
+        blob = _attachment_blob_path(entry["sha256"]) if entry else None
+        if entry is None or blob is None or not blob.exists():
+            entries.pop(cache_key, None)  # 内容已丢失的条目随下次落盘一并清除
+            _ATTACHMENT_CACHE_STATS["misses"] += 1
+            return False
+        entry["lastAccess"] = time.time()
+
+    try:
+        _link_or_copy(blob, dest)
+    except OSError:
+        with _ATTACHMENT_CACHE_LOCK:
+            _ATTACHMENT_CACHE_STATS["misses"] += 1  # 内容恰好被淘汰或目标不可写
+        return False
+    with _ATTACHMENT_CACHE_LOCK:
+        _ATTACHMENT_CACHE_STATS["hits"] += 1
+        _ATTACHMENT_CACHE_STATS["bytesSaved"] += int(entry.get("size", 0))
+    return True
+
+
+def _attachment_cache_store(cache_key: str, src: Path) -> None:
+    """把已下载的文件登记到缓存（按 sha256 去重），随后按 LRU 淘汰超出上限的内容"""
+    if _ATTACHMENT_CACHE_MAX_BYTES <= 0:
+        return
+    digest = hashlib.sha256()
+    with open(src, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+    size = src.stat().st_size
+    if size > _ATTACHMENT_CACHE_MAX_BYTES:
+        return
+
+    # 先链接/复制到临时名再原子改名，同一内容的并发写入互不影响，且不持有锁
+    blob = _attachment_blob_path(sha256)
+    if not blob.exists():
+        tmp_blob = blob.with_name(f"{sha256}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            _link_or_copy(src, tmp_blob)
+            os.replace(tmp_blob, blob)
+        except OSError:
+            tmp_blob.unlink(missing_ok=True)
+            return
+
+    with _ATTACHMENT_CACHE_LOCK:
+        if not blob.exists():
+            return  # 写入期间被淘汰
+        entries = _attachment_cache_entries()
+        entries[cache_key] = {"sha256": sha256, "size": size, "lastAccess": time.time()}
+        _ATTACHMENT_CACHE_STATS["stores"] += 1
+        _evict_attachment_cache(entries)
+        _save_attachment_cache_index()
+
+
+def _evict_attachment_cache(entries: Dict[str, Dict[str, Any]]) -> None:
+    """按最近访问时间淘汰，直到内容总大小不超过上限（调用方需持有 _ATTACHMENT_CACHE_LOCK）"""
+    blob_sizes: Dict[str, int] = {}
+    blob_access: Dict[str, float] = {}
+    for entry in entries.values():
+        sha256 = entry["sha256"]
+        blob_sizes[sha256] = int(entry.get("size", 0))
+        blob_access[sha256] = max(blob_access.get(sha256, 0.0), float(entry.get("lastAccess", 0)))
+
+    total = sum(blob_sizes.values())
+    for sha256 in sorted(blob_access, key=blob_access.get):
+        if total <= _ATTACHMENT_CACHE_MAX_BYTES:
+            break
+        for key in [k for k, e in entries.items() if e["sha256"] == sha256]:
+            del entries[key]
+        _attachment_blob_path(sha256).unlink(missing_ok=True)
+        total -= blob_sizes[sha256]
+        _ATTACHMENT_CACHE_STATS["evictions"] += 1
+
+
+def _attachment_cache_stats() -> Dict[str, Any]:
+    with _ATTACHMENT_CACHE_LOCK:
+        entries = _attachment_cache_entries()
+        stats: Dict[str, Any] = dict(_ATTACHMENT_CACHE_STATS)
+        stats["entries"] = len(entries)
+        stats["bytes"] = sum(int(e.get("size", 0)) for e in {e["sha256"]: e for e in entries.values()}.values())
+    stats["maxBytes"] = _ATTACHMENT_CACHE_MAX_BYTES
+    stats["directory"] = str(_ATTACHMENT_CACHE_DIR)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hitRate"] = (stats["hits"] / lookups) if lookups else 0.0
+    return stats
+
+
+_JIRA_ATTACHMENT_MAX_FILE_BYTES = int(os.getenv("JIRA_ATTACHMENT_MAX_FILE_BYTES", str(50 * 1024 * 1024)))
+_JIRA_ATTACHMENT_BUDGET_BYTES = int(os.getenv("JIRA_ATTACHMENT_BUDGET_BYTES", str(200 * 1024 * 1024)))
+
+
+class _AttachmentBudget:
+    """一次调用内所有附件下载共享的字节预算（线程安全）。
+
+    每个附件按声明大小预留额度；实际流式写入超出预留的部分（声明为 0/缺失或与实际不符）从剩余额度中扣除，
+    额度用尽时中止该下载。
+    """
+
+    def __init__(self, total: int):
+        self.remaining = total
+        self._lock = threading.Lock()
+
+    def take(self, size: int) -> bool:
+        """原子地扣除 size 字节；剩余额度不足时不扣除并返回 False。"""
+        with self._lock:
+            if size > self.remaining:
+                return False
+            self.remaining -= size
+            return True
+
+
+class _AttachmentBudgetExceeded(ValueError):
+    pass
+
+
+_JIRA_DOWNLOAD_CHUNK_SIZE = int(os.getenv("JIRA_DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+_JIRA_DOWNLOAD_MAX_RESUMES = int(os.getenv("JIRA_DOWNLOAD_MAX_RESUMES", "3"))
+
+
+def _attachment_filenames(attachment_list: List[Dict[str, Any]]) -> Dict[str, str]:
+    """为附件分配本地文件名：同一工单内重名的附件（如多个 image.png）加上附件ID前缀，避免并发下载互相覆盖"""
+    counts: Dict[str, int] = {}
+    for attachment_info in attachment_list:
+        name = attachment_info.get("filename") or ""
+        counts[name] = counts.get(name, 0) + 1
+    filenames: Dict[str, str] = {}
+    for attachment_info in attachment_list:
+        att_id = str(attachment_info.get("id", ""))
+        name = attachment_info.get("filename") or ""
+        if not name:
+            filenames[att_id] = f"attachment_{att_id or 'unknown'}"
+        else:
+            filenames[att_id] = f"{att_id}_{name}" if counts[name] > 1 else name
+    return filenames
+
+
+def _download_jira_attachment(session: Session, attachment_info: Dict[str, Any], download_dir: Path,
+                              max_bytes: Optional[int] = None,
+                              stats: Optional[Dict[str, Any]] = None,
+                              filename: Optional[str] = None,
+                              budget: Optional[_AttachmentBudget] = None, reserved: int = 0) -> Optional[str]:
+    """下载Jira附件到指定目录；命中附件缓存时不访问网络。
+
+    内容先写入同目录下以附件ID命名的唯一 .part 临时文件，完整后原子重命名为目标文件，失败时不会留下截断的文件；
+    连接中断时用 Range 请求从已写入的位置续传（最多 JIRA_DOWNLOAD_MAX_RESUMES 次）。
+    实际大小超过 max_bytes 时中止；实际字节数与声明大小不一致时不写入附件缓存。
+    filename 为本地文件名（默认取附件的 filename），stats 不为空时写入 bytes / seconds / retries / cached，
+    因预算用尽中止时写入 budgetExhausted。budget 为共享下载预算，reserved 为本附件已预留的字节数。
+    """
+    import requests
+
+    resumable_errors = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.Timeout,
+    )
+    part_path: Optional[Path] = None
+    try:
+        download_url = attachment_info.get("content", "")
+        att_id = str(attachment_info.get("id", "") or "unknown")
+        filename = filename or attachment_info.get("filename") or f"attachment_{att_id}"
+        
+        if not download_url:
+            return None
+
+        cache_key = _attachment_cache_key(
+            "jira", str(attachment_info.get("id", "")), attachment_info.get("size"), attachment_info.get("created")
+        )
+        if _attachment_cache_fetch(cache_key, download_dir / filename):
+            if stats is not None:
+                stats.update(bytes=0, seconds=0.0, retries=0, cached=True)
+            return str(download_dir / filename)
+
+        download_dir.mkdir(parents=True, exist_ok=True)
+        file_path = download_dir / filename
+        fd, part_name = tempfile.mkstemp(prefix=f".{att_id}.", suffix=".part", dir=download_dir)
+        os.close(fd)
+        part_path = Path(part_name)
+
+        expected_size = attachment_info.get("size") or 0
+        written = 0
+        retries = 0
+        started = time.perf_counter()
+        while True:
+            headers = {"Range": f"bytes={written}-"} if written else None
+            try:
+                with session.get(download_url, stream=True, timeout=60, headers=headers) as response:
+                    if response.status_code >= 400:
+                        return None
+                    if written and response.status_code != 206:
+                        written = 0  # 服务端不支持 Range，从头下载
+
+                    with open(part_path, 'ab' if written else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=_JIRA_DOWNLOAD_CHUNK_SIZE):
+                            if chunk:
+                                if max_bytes is not None and written + len(chunk) > max_bytes:
+                                    raise ValueError(f"attachment exceeds {max_bytes} bytes")
+                                overflow = written + len(chunk) - max(written, reserved)
+                                if budget is not None and overflow > 0 and not budget.take(overflow):
+                                    raise _AttachmentBudgetExceeded("download budget exhausted")
+                                f.write(chunk)
+                                written += len(chunk)
+
+                if expected_size and written < expected_size:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"connection closed after {written} of {expected_size} bytes"
+                    )
+                break
+            except resumable_errors:
+                retries += 1
+                if retries > _JIRA_DOWNLOAD_MAX_RESUMES:
+                    raise
+                time.sleep(min(0.5 * retries, 5.0))
+
+        os.replace(part_path, file_path)
+        elapsed = time.perf_counter() - started
+        if stats is not None:
+            stats.update(bytes=written, seconds=elapsed, retries=retries, cached=False)
+
+        if not expected_size or written == expected_size:
+            try:
+                _attachment_cache_store(cache_key, file_path)
+            except OSError:
+                pass  # 缓存写入失败不影响本次下载结果
+        return str(file_path)
+        
+    except Exception as e:
+        if part_path is not None:
+            part_path.unlink(missing_ok=True)
+        if stats is not None and isinstance(e, _AttachmentBudgetExceeded):
+            stats["budgetExhausted"] = True
+        return None
+
+
+_JIRA_SEARCH_CHUNK_SIZE = 100
+_JIRA_SUBTASK_FIELDS = ["summary", "description", "status", "assignee"]
+
+
+def _build_jira_subtask(issue_data: Dict[str, Any], fallback_key: str = "") -> JiraSubtask:
+    subtask_fields = issue_data.get("fields", {}) or {}
+    return JiraSubtask(
+        key=issue_data.get("key", fallback_key),
+        summary=subtask_fields.get("summary", "") or "",
+        description=subtask_fields.get("description", "") or "",
+        status=(subtask_fields.get("status") or {}).get("name", "Unknown"),
+        assignee=subtask_fields.get("assignee", {}).get("displayName") if subtask_fields.get("assignee") else None
+    )
+
+
+def _fetch_jira_subtasks(session: Session, subtask_keys: List[str]) -> List[JiraSubtask]:
+    """通过 JQL `key in (...)` 分批拉取子任务（仅取需要的字段），按输入顺序返回。
+
+    搜索请求失败的批次退回到逐个 GET，单个子任务获取失败则跳过。
+    """
+    found: Dict[str, JiraSubtask] = {}
+    search_url = _jira_api_url("search")
+    for start in range(0, len(subtask_keys), _JIRA_SEARCH_CHUNK_SIZE):
+        chunk = subtask_keys[start:start + _JIRA_SEARCH_CHUNK_SIZE]
+        payload = {
+            "jql": f"key in ({', '.join(chunk)})",
+            "fields": _JIRA_SUBTASK_FIELDS,
+            "maxResults": len(chunk),
+            "validateQuery": False,
+        }
+        try:
+            search_resp = session.post(search_url, json=payload)
+            if search_resp.status_code < 400:
+                for issue_data in search_resp.json().get("issues", []):
+                    subtask = _build_jira_subtask(issue_data)
+                    found[subtask.key] = subtask
+                continue
+        except Exception:
+            pass
+
+        for subtask_key in chunk:
+            try:
+                subtask_resp = session.get(
+                    _jira_api_url(f"issue/{subtask_key}"),
+                    params={"fields": ",".join(_JIRA_SUBTASK_FIELDS)}
+                )
+                if subtask_resp.status_code < 400:
+                    found[subtask_key] = _build_jira_subtask(subtask_resp.json(), subtask_key)
+            except Exception:
+                continue  # 跳过获取失败的子任务
+
+    return [found[key] for key in subtask_keys if key in found]
+
+def _parse_requirements_from_text(text: str, source: str = "description") -> List[RequirementItem]:
+    """从文本中解析需求条目"""
+    requirements = []
+    
+    if not text or not text.strip():
+        return requirements
+    
+    # 简单的需求识别算法
+    lines = text.split('\n')
+    current_req = None
+    req_id = 1
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+            
+        # 识别需求标识（如：需求1、Feature、功能等）
+        req_patterns = [
+            r'^(\d+[\.\)]\s*)',  # 1. 或 1) 开头
+            r'^([需求功能特性]\d*[\.\:：]\s*)',  # 需求1. 或 功能:
+            r'^(.*应该|.*必须|.*需要)',  # 需求性语言
+            r'^(User Story|Feature|需求)[\s\:：]',  # 明确标识
+        ]
+        
+        is_requirement = False
+        for pattern in req_patterns:
+            if re.search(pattern, line):
+                is_requirement = True
+                break
+        
+        if is_requirement or len(line) > 20:  # 长句子可能是需求描述
+            # 确定优先级
+            priority = "Medium"
+            if "重要" in line or "关键" in line or "高优先级" in line:
+                priority = "High"
+            elif "可选" in line or "低优先级" in line:
+                priority = "Low"
+            
+            # 确定类别
+            category = "功能性"
+            if "性能" in line or "响应时间" in line:
+                category = "性能"
+            elif "安全" in line or "权限" in line:
+                category = "安全性"
+            elif "界面" in line or "UI" in line or "用户体验" in line:
+                category = "界面"
+            
+            requirements.append(RequirementItem(
+                id=f"REQ-{source}-{req_id:03d}",
+                title=line[:50] + ("..." if len(line) > 50 else ""),
+                description=line,
+                priority=priority,
+                category=category,
+                source=source
+            ))
+            req_id += 1
+    
+    return requirements
+
+def _extract_test_cases_from_file(file_path: Path) -> List[str]:
+    """从测试文件中提取测试用例"""
+    test_cases = []
+    
+    if not file_path.exists():
+        return test_cases
+        
+    try:
+        content = file_path.read_text(encoding="utf-8")
+        
+        # 查找curl命令
+        curl_pattern = r'curl\s+.*'
+        curl_matches = re.findall(curl_pattern, content, re.MULTILINE)
+        test_cases.extend([f"API测试: {match[:80]}..." for match in curl_matches])
+        
+        # 查找测试描述
+        test_patterns = [
+            r'###?\s*测试用例\s*\d*[\:\s]+(.*)',
+            r'###?\s*Test Case\s*\d*[\:\s]+(.*)',
+            r'###?\s*用例\s*\d*[\:\s]+(.*)',
+            r'-\s*测试[：:]\s*(.*)',
+        ]
+        
+        for pattern in test_patterns:
+            matches = re.findall(pattern, content, re.IGNORECASE)
+            test_cases.extend(matches)
+    
+    except Exception:
+        pass
+        
+    return test_cases
+
+def _calculate_coverage(requirements: List[RequirementItem], test_cases: List[str]) -> List[TestCaseMatch]:
+    """计算需求覆盖度"""
+    matches = []
+    
+    for req in requirements:
+        matched_tests = []
+        coverage = 0.0
+        gaps = []
+        
+        # 简单的关键词匹配算法
+        req_keywords = set(re.findall(r'\w+', req.description.lower()))
+        
+        for test_case in test_cases:
+            test_keywords = set(re.findall(r'\w+', test_case.lower()))
+            
+            # 计算关键词重叠度
+            overlap = len(req_keywords.intersection(test_keywords))
+            if overlap > 0:
+                matched_tests.append(test_case)
+                coverage += min(overlap / len(req_keywords), 1.0)
+        
+        coverage = min(coverage, 1.0)
+        
+        if coverage < 0.5:
+            gaps.append("缺少足够的测试用例覆盖")
+        if coverage == 0:
+            gaps.append("完全没有相关测试用例")
+            
+        matches.append(TestCaseMatch(
+            requirementId=req.id,
+            testCases=matched_tests,
+            coverage=coverage,
+            gaps=gaps
+        ))
+    
+    return matches
+
+def _generate_test_recommendations(requirements: List[RequirementItem], test_matches: List[TestCaseMatch]) -> List[str]:
+    """生成测试用例推荐"""
+    recommendations = []
+    
+    for req, match in zip(requirements, test_matches):
+        if match.coverage < 0.8:  # 覆盖度低于80%
+            # 基于需求类别生成推荐
+            if req.category == "功能性":
+                recommendations.append(f"为需求 {req.id} 添加功能测试：验证{req.title}")
+                recommendations.append(f"为需求 {req.id} 添加边界测试：异常输入处理")
+            elif req.category == "性能":
+                recommendations.append(f"为需求 {req.id} 添加性能测试：响应时间验证")
+                recommendations.append(f"为需求 {req.id} 添加负载测试：并发处理能力")
+            elif req.category == "安全性":
+                recommendations.append(f"为需求 {req.id} 添加安全测试：权限验证")
+                recommendations.append(f"为需求 {req.id} 添加安全测试：输入验证")
+            elif req.category == "界面":
+                recommendations.append(f"为需求 {req.id} 添加UI测试：界面元素验证")
+                recommendations.append(f"为需求 {req.id} 添加UX测试：用户交互流程")
+    
+    return recommendations[:10]  # 限制推荐数量
+
+
+@tool(threaded=True)
+def jira_publish_integration_doc(input: JiraPublishInput) -> JiraPublishOutput:
+    """直接创建 Jira 工单并上传附件，返回完整的执行结果。
+    
+    ⚠️ 前置条件：任务状态必须 >= APPROVED 且相关文档已生成。
+    👤 AI 提醒：调用前请先确认：
+    1. 任务的状态是否已通过人工审核(APPROVED)
+    2. 对接文档等附件是否已生成完成
+    如条件不满足，请主动与用户确认后续步骤。
+    
+    🔄 自动检测：支持从当前Git分支自动检测项目Key和相关ticket信息
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    # 门禁：要求所有检查通过且状态 APPROVED
+    _require_min_status(project_root, input.taskKey, "APPROVED")
+    dirs = _ensure_dirs_for(project_root, input.taskKey)
+    doc_path = dirs["process_dir"] / f"{input.taskKey}_07-JiraPublishPlan.md"
+    
+    # 自动检测Git分支信息
+    git_context = _auto_detect_jira_context(project_root)
+    detected_project_key = input.projectKey
+    
+    if input.autoDetectFromBranch and not detected_project_key:
+        detected_project_key = git_context.get("project_key")
+        if not detected_project_key:
+            raise ValueError(f"无法从当前分支 '{git_context.get('branch_name', 'unknown')}' 自动检测项目Key，请手动指定 projectKey 参数")
+    
+    if not detected_project_key:
+        raise ValueError("必须指定 projectKey 或启用 autoDetectFromBranch 自动检测")
+    
+    payload = {
+        "fields": {
+            "project": {"key": detected_project_key},
+            "issuetype": {"name": input.issueType},
+            "summary": input.summary,
+            "description": input.description,
+            "labels": input.labels,
+        },
+        "attachments": input.attachments,
+        "links": input.links,
+        "git_context": git_context,  # 记录检测到的Git上下文
+    }
+    
+    # 直接执行Jira工单创建
+    created_issue = None
+    attachment_results = None
+    executed = False
+    
+    try:
+        # 1. 创建Jira工单
+        created_issue = jira_create_issue(JiraCreateIssueInput(
+            projectKey=detected_project_key,
+            issueType=input.issueType,
+            summary=input.summary,
+            description=input.description,
+            labels=input.labels,
+            fields={}
+        ))
+        
+        if created_issue and created_issue.issueKey:
+            executed = True
+            
+            # 2. 上传附件（如果有）
+            if input.attachments:
+                attachment_results = jira_attach_files(JiraAttachFilesInput(
+                    issueKey=created_issue.issueKey,
+                    filePaths=input.attachments,
+                    skipExisting=False  # 新建工单没有已有附件
+                ))
+            
+            # 3. 关联工单（如果有）
+            if input.links:
+                for link in input.links:
+                    if isinstance(link, dict) and 'issueKey' in link and 'linkType' in link:
+                        jira_link_issues(JiraLinkIssuesInput(
+                            inwardIssue=created_issue.issueKey,
+                            outwardIssue=link['issueKey'],
+                            linkType=link.get('linkType', 'relates to')
+                        ))
+                        
+    except Exception as e:
+        # 如果执行失败，记录错误但继续生成文档
+        executed = False
+        created_issue = JiraCreateIssueOutput(
+            issueKey=None,
+            url=None,
+            hint=f"Failed to create issue: {str(e)}"
+        )
+    
+    # 生成执行计划文档
+    doc_content = f"""---
+status: {"PUBLISHED" if executed else "DRAFT"}
+updatedAt: {_timestamp()}
+executed: {executed}
+---
+
+# Jira 发布计划 - {input.taskKey}
+
+## 执行状态
+{'✅ 已执行' if executed else '❌ 执行失败'}
+
+## 工单信息
+- **项目**: {detected_project_key}
+- **类型**: {input.issueType}  
+- **标题**: {input.summary}
+- **创建结果**: {'成功 - ' + (created_issue.issueKey or 'N/A') if created_issue and created_issue.issueKey else '失败'}
+- **工单链接**: {created_issue.url if created_issue and created_issue.url else '无'}
+
+## Git上下文信息
+- **当前分支**: {git_context.get('branch_name', 'unknown')}
+- **检测到的Ticket**: {git_context.get('ticket_key', '无')}
+- **自动检测项目Key**: {git_context.get('project_key', '无')}
+- **检测模式**: {'启用' if input.autoDetectFromBranch else '禁用'}
+
+## 附件上传
+{f'- 成功: {len(attachment_results.attached if attachment_results else [])} 个文件' if attachment_results else '- 无附件'}
+{f'- 失败: {len(attachment_results.failed if attachment_results else [])} 个文件' if attachment_results else ''}
+
+## 原始 Payload
+```json
+{json.dumps(payload, indent=2, ensure_ascii=False)}
+```
+
+## 执行日志
+- 工单创建: {'✅' if created_issue and created_issue.issueKey else '❌'}
+- 附件上传: {'✅' if attachment_results and not attachment_results.failed else '❌' if attachment_results else 'N/A'}
+- 工单关联: {'✅' if input.links else 'N/A'}
+
+## 后续步骤
+{f'1. 访问工单: {created_issue.url}' if created_issue and created_issue.url else '1. 工单创建失败，请检查配置'}
+2. 通知相关人员
+3. 跟踪工单进度
+"""
+    
+    _write_doc(doc_path, doc_content)
+    
+    return JiraPublishOutput(
+        jiraPlanDoc=str(doc_path),
+        jiraPlanDocRelative=_relpath(doc_path, project_root),
+        jiraPayload=payload,
+        createdIssue=created_issue,
+        attachmentResults=attachment_results,
+        executed=executed
+    )
+
+
+# Jira MCP parity: create issue, attach files, link issues
+class JiraCreateIssueInput(BaseModel):
+    """在 Jira 中创建工单的输入参数"""
+    model_config = ConfigDict(title="JiraCreateIssueInput", description="在 Jira 中创建工单的输入参数")
+    projectKey: Optional[str] = Field(None, description="Jira 项目 Key（可选，为空时自动从Git分支解析）")
+    issueType: str = Field(..., description="工单类型，如 Task/Story/Documentation")
+    summary: str = Field(..., description="工单标题")
+    description: str = Field(..., description="工单描述")
+    labels: List[str] = Field(default_factory=list, description="标签列表（可选）")
+    fields: Dict[str, Any] = Field(default_factory=dict, description="额外自定义字段（可选）")
+    autoDetectFromBranch: bool = Field(True, description="是否自动从Git分支检测项目信息（默认启用）")
+    projectRoot: Optional[str] = Field(None, description="检测Git分支所用的项目根目录（可选，默认 DOCS_PROJECT_ROOT 或当前目录）")
+
+
+# ---------- Jira 客户端 ----------
+
+_JIRA_SESSION: Optional[Session] = None
+_JIRA_SESSION_KEY: Optional[Tuple[Optional[str], ...]] = None
+_JIRA_SESSION_LOCK = threading.Lock()
+
+
+def _get_jira_session() -> Session:
+    """返回进程级共享的 Jira 会话（线程安全）；认证相关环境变量变化时自动重建"""
+    global _JIRA_SESSION, _JIRA_SESSION_KEY
+    base_url = os.getenv("JIRA_BASE_URL")
+    user = os.getenv("JIRA_USER")
+    password = os.getenv("JIRA_USER_PASSWORD")
+    token = os.getenv("JIRA_API_TOKEN")  # 兼容旧配置
+    bearer = os.getenv("JIRA_BEARER_TOKEN")
+    if not base_url:
+        raise ValueError("Missing env: JIRA_BASE_URL")
+    if not ((user and password) or bearer or (user and token)):
+        raise ValueError("Missing Jira auth: set JIRA_USER + JIRA_USER_PASSWORD (preferred), or JIRA_BEARER_TOKEN, or JIRA_USER + JIRA_API_TOKEN")
+
+    session_key = (base_url, user, password, token, bearer)
+    with _JIRA_SESSION_LOCK:
+        if _JIRA_SESSION is not None and _JIRA_SESSION_KEY == session_key:
+            return _JIRA_SESSION
+
+        session = _build_pooled_session("JIRA")
+        session.headers.update({"Accept": "application/json"})
+        # 优先顺序：用户+密码 > Bearer > 用户+API Token（兼容）
+        if user and password:
+            session.auth = (user, password)
+        elif bearer:
+            session.headers.update({"Authorization": f"Bearer {bearer}"})
+        else:
+            session.auth = (user, token)
+
+        if _JIRA_SESSION is not None:
+            _JIRA_SESSION.close()
+        _JIRA_SESSION = session
+        _JIRA_SESSION_KEY = session_key
+        return session
+
+
+def _jira_api_url(path: str) -> str:
+    base_url = os.getenv("JIRA_BASE_URL", "").rstrip("/")
+    # 支持 context path，例如 /jira，参考 Jira Server 7.x REST 结构
+    context_path = os.getenv("JIRA_CONTEXT_PATH", "").strip()
+    if context_path and not context_path.startswith("/"):
+        context_path = "/" + context_path
+    # Jira Server 7.x 默认使用 REST v2。可通过环境变量覆盖。
+    api_version = os.getenv("JIRA_API_VERSION", "2")
+    return f"{base_url}{context_path}/rest/api/{api_version}/{path.lstrip('/')}"
+
+
+# ---------- Jira 状态转换缓存 ----------
+# 同一 (项目, 工单类型, 当前状态) 下的可用转换由工作流决定，短时间内基本不变；
+# 缓存 {目标状态名(小写) -> 转换ID}，命中时可省去 GET transitions，
+# 若调用方同时提供 currentStatus/issueType 提示，则只需一次 POST。
+
+_JIRA_TRANSITION_CACHE_TTL = float(os.getenv("JIRA_TRANSITION_CACHE_TTL", "600"))
+_JIRA_TRANSITION_CACHE: Dict[Tuple[str, str, str, str], Tuple[float, Dict[str, str]]] = {}
+_JIRA_TRANSITION_CACHE_LOCK = threading.Lock()
+_JIRA_TRANSITION_CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0, "fastPath": 0}
+
+
+def _transition_cache_key(project_key: str, issue_type: str, status: str) -> Tuple[str, str, str, str]:
+    base_url = os.getenv("JIRA_BASE_URL", "").rstrip("/")
+    return (base_url, project_key.upper(), issue_type.lower(), status.lower())
+
+
+def _get_cached_transitions(cache_key: Tuple[str, str, str, str]) -> Optional[Dict[str, str]]:
+    """读取未过期的转换映射；TTL <= 0 时禁用缓存"""
+    if _JIRA_TRANSITION_CACHE_TTL <= 0:
+        return None
+    with _JIRA_TRANSITION_CACHE_LOCK:
+        entry = _JIRA_TRANSITION_CACHE.get(cache_key)
+        if entry and time.monotonic() - entry[0] < _JIRA_TRANSITION_CACHE_TTL:
+            _JIRA_TRANSITION_CACHE_STATS["hits"] += 1
+            return entry[1]
+        if entry:
+            del _JIRA_TRANSITION_CACHE[cache_key]
+        _JIRA_TRANSITION_CACHE_STATS["misses"] += 1
+        return None
+
+
+def _store_transitions(cache_key: Tuple[str, str, str, str], transitions: List[Dict[str, Any]]) -> None:
+    if _JIRA_TRANSITION_CACHE_TTL <= 0:
+        return
+    mapping = {}
+    for transition in transitions:
+        to_name = transition.get("to", {}).get("name", "")
+        if to_name and transition.get("id"):
+            mapping.setdefault(to_name.lower(), str(transition["id"]))
+    with _JIRA_TRANSITION_CACHE_LOCK:
+        _JIRA_TRANSITION_CACHE[cache_key] = (time.monotonic(), mapping)
+
+
+def _invalidate_transitions(cache_key: Tuple[str, str, str, str]) -> None:
+    with _JIRA_TRANSITION_CACHE_LOCK:
+        if _JIRA_TRANSITION_CACHE.pop(cache_key, None) is not None:
+            _JIRA_TRANSITION_CACHE_STATS["invalidations"] += 1
+
+
+def _transition_cache_stats() -> Dict[str, Any]:
+    with _JIRA_TRANSITION_CACHE_LOCK:
+        stats: Dict[str, Any] = dict(_JIRA_TRANSITION_CACHE_STATS)
+        stats["size"] = len(_JIRA_TRANSITION_CACHE)
+    stats["ttlSeconds"] = _JIRA_TRANSITION_CACHE_TTL
+    lookups = stats["hits"] + stats["misses"]
+    stats["hitRate"] = (stats["hits"] / lookups) if lookups else 0.0
+    return stats
+
+
+@tool(threaded=True)
+def jira_create_issue(input: JiraCreateIssueInput) -> JiraCreateIssueOutput:
+    """在 Jira 中创建工单（REST v3，支持自定义字段）。认证优先 JIRA_USER/JIRA_USER_PASSWORD。支持从Git分支自动检测项目Key。"""
+    try:
+        # 自动检测Git分支信息
+        detected_project_key = input.projectKey
+        if input.autoDetectFromBranch and not detected_project_key:
+            git_context = _auto_detect_jira_context(_resolve_project_root(input.projectRoot))
+            detected_project_key = git_context.get("project_key")
+            if not detected_project_key:
+                return JiraCreateIssueOutput(
+                    issueKey=None, 
+                    url=None, 
+                    hint=f"无法从当前分支 '{git_context.get('branch_name', 'unknown')}' 自动检测项目Key，请手动指定 projectKey 参数"
+                )
+        
+        if not detected_project_key:
+            return JiraCreateIssueOutput(
+                issueKey=None, 
+                url=None, 
+                hint="必须指定 projectKey 或启用 autoDetectFromBranch 自动检测"
+            )
+        
+        session = _get_jira_session()
+        payload = {"fields": {"project": {"key": detected_project_key}, "issuetype": {"name": input.issueType}, "summary": input.summary, "description": input.description, "labels": input.labels}}
+        # 合并自定义字段
+        payload["fields"].update(input.fields or {})
+        url = _jira_api_url("issue")
+        resp = session.post(url, json=payload)
+        if resp.status_code >= 400:
+            return JiraCreateIssueOutput(issueKey=None, url=None, hint=f"Jira create failed: {resp.status_code} {resp.text}")
+        data = resp.json()
+        issue_key = data.get("key")
+        browse_base = os.getenv("JIRA_BROWSE_BASE", os.getenv("JIRA_BASE_URL", "").rstrip("/"))
+        issue_url = f"{browse_base}/browse/{issue_key}" if issue_key else None
+        return JiraCreateIssueOutput(issueKey=issue_key, url=issue_url, hint=f"Created via Jira REST API (project: {detected_project_key})")
+    except Exception as exc:  # pragma: no cover
+        return JiraCreateIssueOutput(issueKey=None, url=None, hint=f"Jira error: {exc}")
+
+
+class JiraAttachFilesInput(BaseModel):
+    """Jira 上传附件的输入参数"""
+    model_config = ConfigDict(title="JiraAttachFilesInput", description="Jira 上传附件的输入参数")
+    issueKey: str = Field(..., description="目标工单 Key")
+    filePaths: List[str] = Field(..., description="要上传的文件路径列表")
+    maxConcurrency: int = Field(4, ge=1, le=16, description="并发上传的最大请求数（1 为串行）")
+    batchSize: int = Field(1, ge=1, le=50, description="单个 multipart 请求携带的文件数；>1 时合并上传，服务端以 400/415 拒绝多文件请求时自动退回逐个上传（跳过已落库的文件）")
+    skipExisting: bool = Field(True, description="工单上已存在同名且大小相同的附件时跳过上传")
+
+
+@tool(threaded=True)
+def jira_attach_files(input: JiraAttachFilesInput) -> JiraAttachFilesOutput:
+    """向指定工单上传附件（需 X-Atlassian-Token:no-check）。支持多文件批量上传，并返回失败原因。
+
+    - 上传前一次性拉取工单已有附件，同名且大小相同的文件跳过（skipExisting）
+    - batchSize > 1 时多个文件合并到一个 multipart 请求；maxConcurrency 控制并发请求数
+    """
+    try:
+        session = _get_jira_session()
+        url = _jira_api_url(f"issue/{input.issueKey}/attachments")
+        # 共享会话不可修改全局请求头，逐请求携带
+        upload_headers = {"X-Atlassian-Token": "no-check"}
+
+        def _existing_attachments() -> set:
+            found: set = set()
+            try:
+                issue_resp = session.get(_jira_api_url(f"issue/{input.issueKey}"), params={"fields": "attachment"})
+                if issue_resp.status_code < 400:
+                    for item in issue_resp.json().get("fields", {}).get("attachment", []) or []:
+                        found.add((item.get("filename"), item.get("size")))
+            except Exception:
+                pass  # 拉取失败时不做去重，照常上传
+            return found
+
+        existing: set = _existing_attachments() if input.skipExisting else set()
+
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[Dict[str, Any], Path]] = []
+        for original_path in input.filePaths:
+            p = Path(original_path)
+            if not p.is_absolute():
+                p = (PROJECT_ROOT / p).resolve()
+            result: Dict[str, Any] = {"path": str(p), "filename": p.name}
+            results.append(result)
+            if not p.is_file():
+                result.update(status="failed", reason="file not found")
+                continue
+            result["bytes"] = p.stat().st_size
+            if (p.name, result["bytes"]) in existing:
+                result.update(status="skipped", reason="attachment with same filename and size already exists")
+                continue
+            pending.append((result, p))
+
+        def _upload(batch: List[Tuple[Dict[str, Any], Path]]) -> None:
+            try:
+                with ExitStack() as stack:
+                    files = [("file", (p.name, stack.enter_context(open(p, "rb")))) for _, p in batch]
+                    resp = session.post(url, files=files, headers=upload_headers, timeout=60 * len(batch))
+            except Exception as file_exc:  # pragma: no cover
+                for result, _ in batch:
+                    result.update(status="failed", reason=str(file_exc))
+                return
+            if resp.status_code < 400:
+                for result, _ in batch:
+                    result.update(status="uploaded", httpStatus=resp.status_code)
+            elif len(batch) > 1 and resp.status_code in (400, 415):
+                # 服务端不接受多文件请求时逐个重试；请求可能已部分落库，先重新拉取附件列表，同名同大小的视为已上传
+                stored = _existing_attachments()
+                for item in batch:
+                    result, p = item
+                    if (p.name, result["bytes"]) in stored:
+                        result.update(status="uploaded")
+                    else:
+                        _upload([item])
+            else:
+                for result, _ in batch:
+                    result.update(status="failed", httpStatus=resp.status_code, reason=resp.text[:500])
+
+        batches = [pending[i:i + input.batchSize] for i in range(0, len(pending), input.batchSize)]
+        workers = min(input.maxConcurrency, len(batches))
+        if workers <= 1:
+            for batch in batches:
+                _upload(batch)
+        elif batches:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-upload") as executor:
+                list(executor.map(_upload, batches))
+
+        attached = [r["path"] for r in results if r.get("status") == "uploaded"]
+        skipped = [r["path"] for r in results if r.get("status") == "skipped"]
+        failed = [
+            {k: r[k] for k in ("path", "httpStatus", "reason") if k in r}
+            for r in results if r.get("status") == "failed"
+        ]
+        for entry in failed:
+            if "httpStatus" in entry:
+                entry["status"] = entry.pop("httpStatus")
+        uploaded_bytes = sum(r.get("bytes", 0) for r in results if r.get("status") == "uploaded")
+        hint = (
+            f"Uploaded {len(attached)} file(s) ({uploaded_bytes} bytes), skipped {len(skipped)}, "
+            f"failed {len(failed)} via Jira REST API"
+        )
+        return JiraAttachFilesOutput(attached=attached, failed=failed, skipped=skipped, results=results, hint=hint)
+    except Exception as exc:  # pragma: no cover
+        return JiraAttachFilesOutput(attached=[], failed=[{"error": str(exc)}], hint=f"Jira attach error")
+
+
+class JiraLinkIssuesInput(BaseModel):
+    """Jira 关联工单的输入参数"""
+    model_config = ConfigDict(title="JiraLinkIssuesInput", description="Jira 关联工单的输入参数")
+    inwardIssue: str = Field(..., description="关联方向的内向工单 Key")
+    outwardIssue: str = Field(..., description="关联方向的外向工单 Key")
+    linkType: str = Field("relates to", description="关联类型：Relates/Blocks/Duplicate 等")
+
+
+class JiraLinkIssuesOutput(BaseModel):
+    ok: bool
+    hint: str
+
+
+class JiraAddCommentInput(BaseModel):
+    """Jira 添加评论的输入参数"""
+    model_config = ConfigDict(title="JiraAddCommentInput", description="Jira 添加评论的输入参数")
+    issueKey: str = Field(..., description="目标工单 Key")
+    comment: str = Field(..., description="评论内容，支持 Jira 标记语法")
+    visibility: Optional[str] = Field(None, description="评论可见性：public/internal 或指定用户组")
+    mentionUsers: List[str] = Field(default_factory=list, description="要@提及的用户列表（用户名或邮箱）")
+
+
+class JiraAddCommentOutput(BaseModel):
+    commentId: Optional[str] = None
+    url: Optional[str] = None
+    hint: str
+
+
+class JiraUpdateStatusInput(BaseModel):
+    """Jira 更新状态的输入参数"""
+    model_config = ConfigDict(title="JiraUpdateStatusInput", description="Jira 更新状态的输入参数")
+    issueKey: str = Field(..., description="目标工单 Key")
+    newStatus: str = Field(..., description="新状态名称")
+    transitionComment: Optional[str] = Field(None, description="状态转换时添加的评论")
+    validateTransition: bool = Field(True, description="是否验证状态转换的合法性")
+    fields: Dict[str, Any] = Field(default_factory=dict, description="状态转换时需要更新的字段")
+    currentStatus: Optional[str] = Field(None, description="（可选）工单当前状态提示；与 issueType 同时提供且转换缓存命中时跳过查询工单，直接提交转换")
+    issueType: Optional[str] = Field(None, description="（可选）工单类型提示，配合 currentStatus 使用")
+    useTransitionCache: bool = Field(True, description="是否使用转换ID缓存（按 项目/工单类型/当前状态 缓存，TTL 由 JIRA_TRANSITION_CACHE_TTL 控制）")
+
+
+class JiraUpdateStatusOutput(BaseModel):
+    success: bool
+    oldStatus: Optional[str] = None
+    newStatus: Optional[str] = None
+    transitionId: Optional[str] = None
+    hint: str
+
+
+class JiraBatchUpdateInput(BaseModel):
+    """Jira 批量状态更新的输入参数"""
+    model_config = ConfigDict(title="JiraBatchUpdateInput", description="Jira 批量状态更新的输入参数")
+    updates: List[Dict[str, Any]] = Field(..., description="批量更新操作列表，每项包含 issueKey, newStatus 等；可附带 currentStatus/issueType 以命中转换缓存")
+    continueOnError: bool = Field(True, description="遇到错误时是否继续执行后续操作")
+    addComment: bool = Field(True, description="是否为每个状态转换添加评论")
+    maxConcurrency: int = Field(1, ge=1, le=32, description="并发处理的最大工单数（1 为串行）；建议不超过 JIRA_POOL_SIZE，主机限速见 JIRA_RATE_LIMIT")
+
+
+class JiraBatchUpdateOutput(BaseModel):
+    successful: List[Dict[str, Any]]
+    failed: List[Dict[str, Any]]
+    summary: Dict[str, int]
+
+
+class JiraMarkProgressInput(BaseModel):
+    """Jira 进展标记的输入参数"""
+    model_config = ConfigDict(title="JiraMarkProgressInput", description="Jira 进展标记的输入参数")
+    taskKey: str = Field(..., description="DevFlow 任务唯一标识")
+    jiraIssueKey: Optional[str] = Field(None, description="关联的 Jira 工单 Key，为空时自动从Git分支检测")
+    markType: str = Field("progress", description="标记类型：progress/milestone/completion/issue/solution")
+    title: str = Field(..., description="进展标记的标题")
+    description: Optional[str] = Field(None, description="详细描述（可选）")
+    includeTaskStatus: bool = Field(True, description="是否包含当前任务状态信息")
+    includeChanges: bool = Field(True, description="是否包含最近的改动信息")
+    includeNextSteps: bool = Field(True, description="是否包含下一步计划")
+    mentionUsers: List[str] = Field(default_factory=list, description="要@提及的用户列表")
+    visibility: Optional[str] = Field("public", description="评论可见性：public/internal")
+    autoDetectFromBranch: bool = Field(True, description="是否自动从Git分支检测Jira信息；配置了 JIRA_PROJECT_KEYS 时分支名中没有工单号会再查最近提交信息")
+    projectRoot: Optional[str] = Field(None, description="项目根目录（可选，用于读取任务文档和检测Git分支）")
+
+
+class JiraMarkProgressOutput(BaseModel):
+    taskKey: str
+    jiraIssueKey: Optional[str] = None
+    commentId: Optional[str] = None
+    commentUrl: Optional[str] = None
+    markContent: str
+    timestamp: str
+    success: bool
+    candidateIssueKeys: List[str] = Field(default_factory=list, description="未配置 JIRA_PROJECT_KEYS 时从最近提交信息中找到的候选工单，需调用方确认后通过 jiraIssueKey 指定")
+    hint: str
+
+
+@tool(threaded=True)
+def jira_link_issues(input: JiraLinkIssuesInput) -> JiraLinkIssuesOutput:
+    """关联两个工单（linkType: Relates/Blocks/Duplicate 等）。"""
+    try:
+        session = _get_jira_session()
+        url = _jira_api_url("issueLink")
+        payload = {"type": {"name": input.linkType}, "inwardIssue": {"key": input.inwardIssue}, "outwardIssue": {"key": input.outwardIssue}}
+        resp = session.post(url, json=payload)
+        if resp.status_code >= 400:
+            return JiraLinkIssuesOutput(ok=False, hint=f"Jira link failed: {resp.status_code} {resp.text}")
+        return JiraLinkIssuesOutput(ok=True, hint="Linked via Jira REST API")
+    except Exception as exc:  # pragma: no cover
+        return JiraLinkIssuesOutput(ok=False, hint=f"Jira link error: {exc}")
+
+
+@tool(threaded=True)
+def jira_add_comment(input: JiraAddCommentInput) -> JiraAddCommentOutput:
+    """向 Jira 工单添加评论，支持富文本、用户提及和可见性控制。"""
+    try:
+        session = _get_jira_session()
+        url = _jira_api_url(f"issue/{input.issueKey}/comment")
+        
+        # 构建评论内容，处理用户提及
+        comment_text = input.comment
+        if input.mentionUsers:
+            mention_text = " ".join([f"[~{user}]" for user in input.mentionUsers])
+            comment_text = f"{mention_text}\n\n{comment_text}"
+        
+        # 构建请求 payload
+        payload = {
+            "body": comment_text
+        }
+        
+        # 处理可见性设置
+        if input.visibility and input.visibility != "public":
+            if input.visibility == "internal":
+                # 内部可见性，通常限制给开发团队
+                payload["visibility"] = {
+                    "type": "role",
+                    "value": "Developers"
+                }
+            else:
+                # 指定用户组可见
+                payload["visibility"] = {
+                    "type": "group", 
+                    "value": input.visibility
+                }
+        
+        resp = session.post(url, json=payload)
+        if resp.status_code >= 400:
+            return JiraAddCommentOutput(
+                commentId=None, 
+                url=None, 
+                hint=f"Failed to add comment: {resp.status_code} {resp.text}"
+            )
+        
+        comment_data = resp.json()
+        comment_id = comment_data.get("id")
+        
+        # 构建评论链接
+        base_url = os.getenv("JIRA_BASE_URL", "").rstrip("/")
+        comment_url = f"{base_url}/browse/{input.issueKey}?focusedCommentId={comment_id}" if comment_id else None
+        
+        return JiraAddCommentOutput(
+            commentId=comment_id,
+            url=comment_url,
+            hint=f"Comment added successfully to {input.issueKey}"
+        )
+        
+    except Exception as exc:  # pragma: no cover
+        return JiraAddCommentOutput(
+            commentId=None, 
+            url=None, 
+            hint=f"Error adding comment: {exc}"
+        )
+
+
+@tool(threaded=True)
+def jira_update_status(input: JiraUpdateStatusInput) -> JiraUpdateStatusOutput:
+    """更新 Jira 工单状态，支持状态转换验证和评论添加。"""
+    try:
+        session = _get_jira_session()
+        issue_url = _jira_api_url(f"issue/{input.issueKey}")
+        transitions_url = _jira_api_url(f"issue/{input.issueKey}/transitions")
+        target_key = input.newStatus.lower()
+        use_cache = input.useTransitionCache
+
+        # 转换请求体与转换ID无关，提前构建
+        transition_payload: Dict[str, Any] = {}
+        # 添加转换评论
+        if input.transitionComment:
+            transition_payload["update"] = {
+                "comment": [{"add": {"body": input.transitionComment}}]
+            }
+        # 添加需要更新的字段
+        if input.fields:
+            transition_payload["fields"] = dict(input.fields)
+
+        # 快速路径：调用方给出当前状态和工单类型，且缓存命中时直接提交转换（1 次请求）
+        current_status = input.currentStatus or ""
+        transition_id: Optional[str] = None
+        cache_key: Optional[Tuple[str, str, str, str]] = None
+        from_cache = False
+        project_key = _get_project_key_from_ticket(input.issueKey.upper())
+        if use_cache and input.currentStatus and input.issueType and project_key:
+            cache_key = _transition_cache_key(project_key, input.issueType, input.currentStatus)
+            cached = _get_cached_transitions(cache_key)
+            if cached and target_key in cached:
+                transition_id = cached[target_key]
+                from_cache = True
+                with _JIRA_TRANSITION_CACHE_LOCK:
+                    _JIRA_TRANSITION_CACHE_STATS["fastPath"] += 1
+
+        for attempt in range(2):
+            if transition_id is None:
+                # 1. 获取当前工单状态（只取需要的字段）
+                issue_resp = session.get(issue_url, params={"fields": "status,issuetype,project"})
+                if issue_resp.status_code >= 400:
+                    return JiraUpdateStatusOutput(
+                        success=False,
+                        hint=f"Failed to fetch issue {input.issueKey}: {issue_resp.status_code}"
+                    )
+
+                issue_fields = issue_resp.json().get("fields", {}) or {}
+                current_status = (issue_fields.get("status") or {}).get("name", "")
+                issue_type = (issue_fields.get("issuetype") or {}).get("name", "")
+                issue_project = (issue_fields.get("project") or {}).get("key") or project_key or ""
+                cache_key = _transition_cache_key(issue_project, issue_type, current_status)
+
+                cached = _get_cached_transitions(cache_key) if use_cache and attempt == 0 else None
+                if cached and target_key in cached:
+                    transition_id = cached[target_key]
+                    from_cache = True
+                else:
+                    # 2. 获取可用的状态转换
+                    trans_resp = session.get(transitions_url)
+                    if trans_resp.status_code >= 400:
+                        return JiraUpdateStatusOutput(
+                            success=False,
+                            oldStatus=current_status,
+                            hint=f"Failed to get transitions: {trans_resp.status_code}"
+                        )
+
+                    transitions = trans_resp.json().get("transitions", [])
+                    if use_cache:
+                        _store_transitions(cache_key, transitions)
+
+                    # 3. 查找目标状态的转换ID
+                    target_transition = None
+                    for transition in transitions:
+                        if transition.get("to", {}).get("name", "").lower() == target_key:
+                            target_transition = transition
+                            break
+
+                    if not target_transition:
+                        available_statuses = [t.get("to", {}).get("name", "") for t in transitions]
+                        return JiraUpdateStatusOutput(
+                            success=False,
+                            oldStatus=current_status,
+                            hint=f"Status '{input.newStatus}' not available. Available: {available_statuses}"
+                        )
+                    transition_id = target_transition.get("id")
+                    from_cache = False
+
+            # 4. 执行状态转换
+            transition_payload["transition"] = {"id": transition_id}
+            transition_resp = session.post(transitions_url, json=transition_payload)
+            if transition_resp.status_code == 400 and from_cache:
+                # 缓存的转换对该工单无效（状态已变化或工作流被修改），失效后走完整查询重试一次
+                if cache_key is not None:
+                    _invalidate_transitions(cache_key)
+                transition_id = None
+                from_cache = False
+                continue
+            if transition_resp.status_code >= 400:
+                return JiraUpdateStatusOutput(
+                    success=False,
+                    oldStatus=current_status or None,
+                    transitionId=transition_id,
+                    hint=f"Status transition failed: {transition_resp.status_code} {transition_resp.text}"
+                )
+            break
+
+        cache_note = "（使用缓存的转换ID）" if from_cache else ""
+        return JiraUpdateStatusOutput(
+            success=True,
+            oldStatus=current_status or None,
+            newStatus=input.newStatus,
+            transitionId=transition_id,
+            hint=f"Status updated from '{current_status}' to '{input.newStatus}'{cache_note}"
+        )
+        
+    except Exception as exc:  # pragma: no cover
+        return JiraUpdateStatusOutput(
+            success=False,
+            hint=f"Error updating status: {exc}"
+        )
+
+
+def _run_jira_batch_item(index: int, update_item: Dict[str, Any], add_comment: bool) -> Tuple[str, Dict[str, Any]]:
+    """执行批量更新中的单个条目，返回 ("successful" | "failed", 结果记录)；异常向上抛出"""
+    # 验证必要参数
+    issue_key = update_item.get("issueKey")
+    new_status = update_item.get("newStatus")
+
+    if not issue_key or not new_status:
+        return "failed", {
+            "index": index,
+            "issueKey": issue_key or "unknown",
+            "error": "Missing issueKey or newStatus"
+        }
+
+    # 构建状态更新请求
+    status_input = JiraUpdateStatusInput(
+        issueKey=issue_key,
+        newStatus=new_status,
+        transitionComment=update_item.get("comment", f"Batch status update to {new_status}" if add_comment else None),
+        validateTransition=update_item.get("validateTransition", True),
+        fields=update_item.get("fields", {}),
+        currentStatus=update_item.get("currentStatus"),
+        issueType=update_item.get("issueType")
+    )
+
+    # 执行状态更新
+    result = jira_update_status(status_input)
+
+    if result.success:
+        return "successful", {
+            "index": index,
+            "issueKey": issue_key,
+            "oldStatus": result.oldStatus,
+            "newStatus": result.newStatus,
+            "transitionId": result.transitionId
+        }
+    return "failed", {
+        "index": index,
+        "issueKey": issue_key,
+        "error": result.hint
+    }
+
+
+@tool(threaded=True)
+def jira_batch_update_status(input: JiraBatchUpdateInput) -> JiraBatchUpdateOutput:
+    """批量更新多个 Jira 工单的状态。
+
+    maxConcurrency > 1 时使用线程池并发处理，结果仍按输入顺序返回；
+    continueOnError=False 时，出现异常后不再启动新的条目（已在执行中的条目会完成）。
+    """
+    batch_started = time.perf_counter()
+    abort = threading.Event()
+
+    def _execute(i: int, update_item: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        if abort.is_set():
+            return None
+        item_started = time.perf_counter()
+        try:
+            bucket, record = _run_jira_batch_item(i, update_item, input.addComment)
+        except Exception as e:
+            bucket, record = "failed", {
+                "index": i,
+                "issueKey": update_item.get("issueKey", "unknown"),
+                "error": str(e)
+            }
+            if not input.continueOnError:
+                abort.set()
+        record["latencyMs"] = round((time.perf_counter() - item_started) * 1000, 1)
+        return bucket, record
+
+    workers = min(input.maxConcurrency, len(input.updates))
+    if workers <= 1:
+        outcomes = []
+        for i, update_item in enumerate(input.updates):
+            outcome = _execute(i, update_item)
+            if outcome is None:
+                break
+            outcomes.append(outcome)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-batch") as executor:
+            outcomes = [o for o in executor.map(_execute, range(len(input.updates)), input.updates) if o is not None]
+
+    successful = [record for bucket, record in outcomes if bucket == "successful"]
+    failed = [record for bucket, record in outcomes if bucket == "failed"]
+    latencies = [record["latencyMs"] for _, record in outcomes]
+
+    summary = {
+        "total": len(input.updates),
+        "successful": len(successful),
+        "failed": len(failed),
+        "skipped": len(input.updates) - len(outcomes),
+        "concurrency": max(1, workers),
+        "wallClockMs": int((time.perf_counter() - batch_started) * 1000),
+        "avgLatencyMs": int(sum(latencies) / len(latencies)) if latencies else 0,
+        "maxLatencyMs": int(max(latencies)) if latencies else 0
+    }
+
+    return JiraBatchUpdateOutput(
+        successful=successful,
+        failed=failed,
+        summary=summary
+    )
+
+
+@tool(threaded=True)
+def jira_mark_progress(input: JiraMarkProgressInput) -> JiraMarkProgressOutput:
+    """标记任务进展到 Jira，自动生成包含任务状态、改动和下一步计划的评论。
+    
+    这个功能专门为 AI 设计，用于自动化地将开发进展、状态变更、功能实现等信息
+    以结构化的方式记录到 Jira 工单中，提供完整的项目追踪和沟通记录。
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    timestamp = _timestamp()
+    
+    try:
+        # 1. 自动检测 Jira 工单（如果未指定）
+        jira_issue_key = input.jiraIssueKey
+        if input.autoDetectFromBranch and not jira_issue_key:
+            # 这里会向工单写评论：提交信息中的 utf-8、sha-256 之类会被宽松正则误认为工单号，
+            # 只有配置了 JIRA_PROJECT_KEYS 才直接采用提交信息中的工单，否则只列出候选交给调用方确认
+            git_context = _auto_detect_jira_context(project_root)
+            jira_issue_key = git_context.get("ticket_key")
+            candidates: List[str] = []
+            if not jira_issue_key:
+                candidates = _collect_ticket_keys(project_root, git_context.get("branch_name"))
+                if candidates and _jira_project_keys():
+                    jira_issue_key, candidates = candidates[0], []
+            
+            if not jira_issue_key:
+                branch_name = git_context.get("branch_name", "unknown")
+                return JiraMarkProgressOutput(
+                    taskKey=input.taskKey,
+                    jiraIssueKey=None,
+                    commentId=None,
+                    commentUrl=None,
+                    markContent="",
+                    timestamp=timestamp,
+                    success=False,
+                    candidateIssueKeys=candidates,
+                    hint=(f"分支名中未找到 Jira 工单，最近提交信息中的候选工单：{', '.join(candidates)}；"
+                          f"请确认后通过 jiraIssueKey 指定（或配置 JIRA_PROJECT_KEYS），当前分支：{branch_name}"
+                          if candidates else
+                          f"无法自动检测 Jira 工单（分支名和最近提交信息中均未找到），当前分支：{branch_name}")
+                )
+        
+        if not jira_issue_key:
+            return JiraMarkProgressOutput(
+                taskKey=input.taskKey,
+                jiraIssueKey=None,
+                commentId=None,
+                commentUrl=None,
+                markContent="",
+                timestamp=timestamp,
+                success=False,
+                hint="必须指定 jiraIssueKey 或启用 autoDetectFromBranch"
+            )
+        
+        # 2. 生成任务进展报告
+        progress_report = _generate_task_progress_report(
+            project_root, 
+            input.taskKey, 
+            input.includeTaskStatus, 
+            input.includeChanges, 
+            input.includeNextSteps
+        )
+        
+        # 3. 根据markType构建评论内容
+        mark_icons = {
+            "progress": "🔄",
+            "milestone": "🎯", 
+            "completion": "✅",
+            "issue": "⚠️",
+            "solution": "💡"
+        }
+        
+        icon = mark_icons.get(input.markType, "📝")
+        
+        # 构建评论内容（使用普通文本格式）
+        comment_lines = [
+            f"{icon} {input.title}",
+            f"标记时间: {timestamp}",
+            f"标记类型: {input.markType}",
+            ""
+        ]
+        
+        # 添加描述
+        if input.description:
+            comment_lines.extend([
+                "详细说明:",
+                input.description,
+                ""
+            ])
+        
+        # 添加任务状态信息
+        if input.includeTaskStatus and progress_report.get("status"):
+            status_info = progress_report["status"]
+            comment_lines.extend([
+                "📊 任务状态:",
+                f"当前状态: {status_info.get('current', 'UNKNOWN')}",
+                f"任务标题: {status_info.get('title', 'N/A')}",
+                f"负责人: {status_info.get('owner', 'N/A')}",
+                f"最后更新: {status_info.get('updatedAt', 'N/A')}",
+                ""
+            ])
+            
+            # 添加最近的审核记录
+            reviews = status_info.get("reviews", [])
+            if reviews:
+                comment_lines.append("最近审核记录:")
+                for review in reviews[-2:]:  # 最近2次
+                    # 安全处理时间字段，可能是datetime对象或字符串
+                    review_time = review.get('time', '')
+                    if hasattr(review_time, 'strftime'):
+                        # 如果是datetime对象，转换为字符串
+                        time_str = review_time.strftime('%Y-%m-%d')
+                    elif isinstance(review_time, str):
+                        # 如果是字符串，取前10个字符
+                        time_str = review_time[:10]
+                    else:
+                        time_str = str(review_time)[:10] if review_time else 'N/A'
+                    
+                    comment_lines.append(f"  {review.get('from', '')} -> {review.get('to', '')} by {review.get('by', '')} ({time_str})")
+                comment_lines.append("")
+        
+        # 添加过程文档状态
+        if input.includeTaskStatus and progress_report.get("processDocuments"):
+            comment_lines.extend([
+                "📋 文档状态:",
+                ""
+            ])
+            
+            for doc in progress_report["processDocuments"]:
+                status_emoji = {
+                    "DRAFT": "📝",
+                    "APPROVED": "✅", 
+                    "COMPLETED": "✅",
+                    "MISSING": "❌",
+                    "ERROR": "⚠️"
+                }.get(doc["status"], "❓")
+                
+                # 安全处理更新时间字段
+                updated_at = doc.get("updatedAt", "")
+                if hasattr(updated_at, 'strftime'):
+                    # 如果是datetime对象，转换为字符串
+                    updated_time = updated_at.strftime('%Y-%m-%d')
+                elif isinstance(updated_at, str):
+                    # 如果是字符串，取前10个字符
+                    updated_time = updated_at[:10] if updated_at else "N/A"
+                else:
+                    updated_time = str(updated_at)[:10] if updated_at else "N/A"
+                comment_lines.append(f"  {doc['name']}: {status_emoji} {doc['status']} ({updated_time})")
+            
+            comment_lines.append("")
+        
+        # 添加最近改动
+        if input.includeChanges and progress_report.get("recentChanges"):
+            comment_lines.extend([
+                "🔧 最近改动:",
+            ])
+            
+            for commit in progress_report["recentChanges"][:3]:  # 最近3个提交
+                comment_lines.append(f"  {commit['hash']} {commit['message']} - {commit['author']} ({commit['time']})")
+            
+            comment_lines.append("")
+        
+        # 添加下一步计划
+        if input.includeNextSteps and progress_report.get("nextSteps"):
+            comment_lines.extend([
+                "🎯 下一步计划:",
+            ])
+            
+            for i, step in enumerate(progress_report["nextSteps"], 1):
+                comment_lines.append(f"{i}. {step}")
+            
+            comment_lines.append("")
+        
+        # 添加时间戳和签名
+        comment_lines.extend([
+            "---",
+            f"自动生成于 {timestamp} by DevFlow MCP"
+        ])
+        
+        comment_content = "\n".join(comment_lines)
+        
+        # 4. 添加评论到 Jira
+        comment_input = JiraAddCommentInput(
+            issueKey=jira_issue_key,
+            comment=comment_content,
+            visibility=input.visibility,
+            mentionUsers=input.mentionUsers
+        )
+        
+        comment_result = jira_add_comment(comment_input)
+        
+        return JiraMarkProgressOutput(
+            taskKey=input.taskKey,
+            jiraIssueKey=jira_issue_key,
+            commentId=comment_result.commentId,
+            commentUrl=comment_result.url,
+            markContent=comment_content,
+            timestamp=timestamp,
+            success=comment_result.commentId is not None,
+            hint=comment_result.hint
+        )
+        
+    except Exception as e:
+        return JiraMarkProgressOutput(
+            taskKey=input.taskKey,
+            jiraIssueKey=jira_issue_key,
+            commentId=None,
+            commentUrl=None,
+            markContent="",
+            timestamp=timestamp,
+            success=False,
+            hint=f"标记进展失败: {str(e)}"
+        )
+
+
+# ---------- Jira分析与测试对比工具函数 ----------
+
+@tool(threaded=True)
+def jira_fetch_issue_with_analysis(input: JiraFetchInput) -> JiraFetchOutput:
+    """拉取Jira工单及子任务信息，下载附件，为后续分析准备数据。
+    
+    功能特性：
+    - 完整的工单信息获取（主要字段和自定义字段）
+    - 子任务批量获取（JQL `key in (...)`，每批最多 100 个）
+    - 附件并发下载（受单文件上限与单次调用总预算约束）
+    - 变更历史追踪（可选）
+    """
+    try:
+        session = _get_jira_session()
+        
+        # 1. 获取主工单信息
+        issue_url = _jira_api_url(f"issue/{input.issueKey}")
+        issue_resp = session.get(issue_url, params={"expand": "changelog"} if input.includeHistory else {})
+        
+        if issue_resp.status_code >= 400:
+            raise Exception(f"Failed to fetch issue {input.issueKey}: {issue_resp.status_code}")
+            
+        issue_data = issue_resp.json()
+        fields = issue_data.get("fields", {})
+        
+        # 构建工单信息
+        issue_info = JiraIssueInfo(
+            key=issue_data.get("key", input.issueKey),
+            summary=fields.get("summary", ""),
+            description=fields.get("description", ""),
+            status=fields.get("status", {}).get("name", "Unknown"),
+            issueType=fields.get("issuetype", {}).get("name", "Unknown"),
+            priority=fields.get("priority", {}).get("name", "Medium"),
+            assignee=fields.get("assignee", {}).get("displayName") if fields.get("assignee") else None,
+            reporter=fields.get("reporter", {}).get("displayName") if fields.get("reporter") else None,
+            created=fields.get("created", ""),
+            updated=fields.get("updated", ""),
+            customFields={k: v for k, v in fields.items() if k.startswith("customfield_")}
+        )
+        
+        subtasks = []
+        attachments = []
+        downloaded_files = []
+        
+        # 2. 获取子任务（一次 JQL 搜索代替逐个 GET）
+        if input.includeSubtasks:
+            subtask_keys = [link.get("key") for link in fields.get("subtasks", []) if link.get("key")]
+            if subtask_keys:
+                subtasks = _fetch_jira_subtasks(session, subtask_keys)
+        
+        # 3. 处理附件
+        if input.includeAttachments:
+            attachment_list = fields.get("attachment", [])
+            
+            # 准备下载目录
+            project_root = Path(os.getcwd())  # 默认项目根目录
+            if input.attachmentPath:
+                download_dir = project_root / input.attachmentPath / input.issueKey
+            else:
+                download_dir = project_root / "downloads" / "jira_attachments" / input.issueKey
+
+            max_file_bytes = input.maxAttachmentBytes if input.maxAttachmentBytes is not None else _JIRA_ATTACHMENT_MAX_FILE_BYTES
+            budget_bytes = input.attachmentBudgetBytes if input.attachmentBudgetBytes is not None else _JIRA_ATTACHMENT_BUDGET_BYTES
+
+            # 按声明大小先行分配预算（顺序确定，结果可复现），再并发下载；实际字节超出预留的部分从共享预算中扣除
+            pending: List[Tuple[JiraAttachment, Dict[str, Any]]] = []
+            budget = _AttachmentBudget(budget_bytes)
+            reservations: Dict[str, int] = {}
+            local_names = _attachment_filenames(attachment_list)
+            for attachment_info in attachment_list:
+                try:
+                    attachment = JiraAttachment(
+                        id=str(attachment_info.get("id", "")),
+                        filename=attachment_info.get("filename", ""),
+                        size=attachment_info.get("size", 0) or 0,
+                        mimeType=attachment_info.get("mimeType", ""),
+                        author=(attachment_info.get("author") or {}).get("displayName", "Unknown"),
+                        created=attachment_info.get("created", ""),
+                        downloadUrl=attachment_info.get("content", "")
+                    )
+                except Exception:
+                    continue  # 跳过元数据异常的附件
+
+                cache_key = _attachment_cache_key("jira", attachment.id, attachment_info.get("size"), attachment.created)
+                if _attachment_cache_contains(cache_key):
+                    pending.append((attachment, attachment_info))  # 已缓存，不占用下载预算
+                elif attachment.size > max_file_bytes:
+                    attachment.skippedReason = f"exceeds per-file limit ({attachment.size} > {max_file_bytes} bytes)"
+                elif not budget.take(attachment.size):
+                    attachment.skippedReason = f"exceeds remaining download budget ({budget.remaining} bytes left)"
+                else:
+                    reservations[attachment.id] = attachment.size
+                    pending.append((attachment, attachment_info))
+                attachments.append(attachment)
+
+            def _download(item: Tuple[JiraAttachment, Dict[str, Any]]) -> None:
+                attachment, attachment_info = item
+                download_stats: Dict[str, Any] = {}
+                local_path = _download_jira_attachment(
+                    session, attachment_info, download_dir, max_bytes=max_file_bytes, stats=download_stats,
+                    filename=local_names.get(attachment.id), budget=budget, reserved=reservations.get(attachment.id, 0)
+                )
+                attachment.downloadRetries = download_stats.get("retries", 0)
+                if local_path:
+                    attachment.localPath = local_path
+                    attachment.fromCache = download_stats.get("cached", False)
+                    if not attachment.fromCache and download_stats.get("seconds"):
+                        attachment.bytesPerSecond = round(download_stats["bytes"] / download_stats["seconds"], 1)
+                elif download_stats.get("budgetExhausted"):
+                    attachment.skippedReason = "download budget exhausted"
+                else:
+                    attachment.skippedReason = "download failed"
+
+            workers = min(input.attachmentConcurrency, len(pending))
+            if workers <= 1:
+                for item in pending:
+                    _download(item)
+            elif pending:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-attach") as executor:
+                    list(executor.map(_download, pending))
+
+            downloaded_files = [a.localPath for a in attachments if a.localPath]
+        
+        return JiraFetchOutput(
+            issueInfo=issue_info,
+            subtasks=subtasks,
+            attachments=attachments,
+            downloadedFiles=downloaded_files
+        )
+        
+    except Exception as e:
+        # 返回基本信息，即使部分获取失败
+        return JiraFetchOutput(
+            issueInfo=JiraIssueInfo(
+                key=input.issueKey,
+                summary="Failed to fetch",
+                description=f"Error: {str(e)}",
+                status="Unknown",
+                issueType="Unknown",
+                priority="Medium",
+                created="",
+                updated=""
+            ),
+            subtasks=[],
+            attachments=[],
+            downloadedFiles=[]
+        )
+
+@tool(threaded=True)  
+def analyze_requirements_vs_tests(input: TestAnalysisInput) -> TestAnalysisOutput:
+    """分析Jira需求与现有测试用例的覆盖度，生成测试gap和推荐。
+    
+    分析维度：
+    - 需求解析：从Jira描述和子任务中提取结构化需求
+    - 测试匹配：将需求与现有测试用例进行匹配
+    - 覆盖度计算：计算每个需求的测试覆盖程度
+    - 缺失识别：识别测试覆盖不足的需求点
+    - 智能推荐：基于需求类型推荐合适的测试用例
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    
+    # 1. 首先获取Jira信息
+    jira_fetch_input = JiraFetchInput(
+        issueKey=input.jiraIssueKey,
+        includeSubtasks=True,
+        includeAttachments=input.includeAttachments,
+        attachmentPath="analysis_temp"
+    )
+    
+    jira_data = jira_fetch_issue_with_analysis(jira_fetch_input)
+    
+    # 2. 解析需求
+    requirements = []
+    
+    # 从主工单描述解析需求
+    main_requirements = _parse_requirements_from_text(jira_data.issueInfo.description, "main_issue")
+    requirements.extend(main_requirements)
+    
+    # 从子任务解析需求
+    for i, subtask in enumerate(jira_data.subtasks):
+        subtask_requirements = _parse_requirements_from_text(
+            f"{subtask.summary}\n{subtask.description}", 
+            f"subtask_{i+1}"
+        )
+        requirements.extend(subtask_requirements)
+    
+    # 从附件解析需求（如果是文本文件）
+    if input.includeAttachments:
+        for attachment in jira_data.attachments:
+            if attachment.localPath and attachment.mimeType.startswith("text/"):
+                try:
+                    attachment_path = Path(attachment.localPath)
+                    if attachment_path.exists():
+                        attachment_content = attachment_path.read_text(encoding="utf-8")
+                        attachment_requirements = _parse_requirements_from_text(
+                            attachment_content, 
+                            f"attachment_{attachment.filename}"
+                        )
+                        requirements.extend(attachment_requirements)
+                except Exception:
+                    continue
+    
+    # 3. 获取现有测试用例
+    test_cases = []
+    
+    # 从DevFlow任务文档中获取测试用例
+    process_dir = project_root / "Docs" / "ProcessDocuments" / f"task-{input.taskKey}"
+    if process_dir.exists():
+        # 查找测试相关文档
+        test_files = [
+            process_dir / f"{input.taskKey}_04-TestCurls.md",
+            process_dir / f"{input.taskKey}_05-MySQLVerificationPlan.md",
+            process_dir / f"{input.taskKey}_06-Integration.md",
+        ]
+        
+        for test_file in test_files:
+            if test_file.exists():
+                file_test_cases = _extract_test_cases_from_file(test_file)
+                test_cases.extend(file_test_cases)
+    
+    # 4. 计算覆盖度
+    test_matches = _calculate_coverage(requirements, test_cases)
+    
+    # 5. 生成推荐
+    recommended_tests = _generate_test_recommendations(requirements, test_matches)
+    
+    # 6. 计算整体覆盖度
+    if test_matches:
+        overall_coverage = sum(match.coverage for match in test_matches) / len(test_matches)
+    else:
+        overall_coverage = 0.0
+    
+    # 7. 识别缺失测试
+    missing_tests = []
+    for match in test_matches:
+        if match.coverage < 0.3:  # 覆盖度低于30%的需求
+            req = next((r for r in requirements if r.id == match.requirementId), None)
+            if req:
+                missing_tests.append(f"{req.id}: {req.title}")
+    
+    # 8. 生成分析报告
+    report_dir = project_root / "Docs" / "ProcessDocuments" / f"task-{input.taskKey}"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_path = report_dir / f"{input.taskKey}_TestAnalysisReport.md"
+    
+    report_content = f"""---
+status: DRAFT
+generatedAt: {_timestamp()}
+jiraIssue: {input.jiraIssueKey}
+analysisType: {input.analysisType}
+---
+
+# 测试覆盖度分析报告 - {input.taskKey}
+
+## 工单信息
+- **Jira工单**: {input.jiraIssueKey}
+- **标题**: {jira_data.issueInfo.summary}
+- **状态**: {jira_data.issueInfo.status}
+- **类型**: {jira_data.issueInfo.issueType}
+
+## 需求分析
+**总需求数**: {len(requirements)}
+
+{chr(10).join(f"- **{req.id}** ({req.category}): {req.title}" for req in requirements)}
+
+## 测试覆盖度
+**整体覆盖度**: {overall_coverage:.1%}
+
+### 详细覆盖情况
+{chr(10).join(f"- **{match.requirementId}**: {match.coverage:.1%} 覆盖 ({len(match.testCases)} 个相关测试)" for match in test_matches)}
+
+## 缺失分析
+**缺失测试数**: {len(missing_tests)}
+
+{chr(10).join(f"- {missing}" for missing in missing_tests)}
+
+## 推荐测试用例
+{chr(10).join(f"- {rec}" for rec in recommended_tests)}
+
+## 附件信息
+{chr(10).join(f"- **{att.filename}** ({att.mimeType}) - {att.size} bytes" for att in jira_data.attachments)}
+
+---
+*报告生成时间: {_timestamp()}*
+"""
+    
+    _write_doc(report_path, report_content)
+    
+    return TestAnalysisOutput(
+        taskKey=input.taskKey,
+        jiraIssueKey=input.jiraIssueKey,
+        requirements=requirements,
+        testMatches=test_matches,
+        overallCoverage=overall_coverage,
+        missingTests=missing_tests,
+        recommendedTests=recommended_tests,
+        analysisReport=str(report_path)
+    )
+
+@tool(threaded=True)
+def sync_jira_requirements(input: RequirementSyncInput) -> RequirementSyncOutput:
+    """将Jira需求同步到DevFlow任务，可选择自动生成测试用例。
+    
+    同步功能：
+    - 创建或更新DevFlow任务文档
+    - 同步需求描述和验收标准
+    - 更新子任务状态映射
+    - 可选的自动测试用例生成
+    - 建立需求追溯链接
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    
+    # 1. 获取Jira数据
+    jira_fetch_input = JiraFetchInput(
+        issueKey=input.jiraIssueKey,
+        includeSubtasks=True,
+        includeAttachments=True
+    )
+    
+    jira_data = jira_fetch_issue_with_analysis(jira_fetch_input)
+    
+    # 2. 确定目标任务Key
+    task_key = input.targetTaskKey
+    if not task_key:
+        # 自动生成任务Key
+        task_key = f"JIRA-{input.jiraIssueKey.replace('-', '')}"
+    
+    created_files = []
+    updated_files = []
+    generated_tests = []
+    synced_dirs: Set[Path] = set()  # 本次写入过的目录，最后各 fsync 一次
+    
+    # 3. 创建或更新主任务文档
+    if input.syncMode in ["create", "update", "merge"]:
+        task_input = PrepareDocsInput(
+            taskKey=task_key,
+            title=f"Jira同步: {jira_data.issueInfo.summary}",
+            owner="system",
+            reviewers=["qa", "dev"],
+            force=(input.syncMode == "create")
+        )
+        
+        task_result = task_prepare_docs(task_input)
+        if task_result:
+            created_files.append(task_result.mainDocPath)
+    
+    # 4. 更新任务内容
+    main_doc_path = project_root / "Docs" / ".tasks" / f"{task_key}.md"
+    if main_doc_path.exists():
+        try:
+            post = _load_frontmatter(main_doc_path, mutable=True)
+            metadata = dict(post.metadata or {})
+            
+            # 添加Jira关联信息
+            metadata["jiraIssue"] = input.jiraIssueKey
+            metadata["jiraStatus"] = jira_data.issueInfo.status
+            metadata["syncedAt"] = _timestamp()
+            
+            # 更新内容
+            content_lines = [
+                f"# {jira_data.issueInfo.summary}",
+                "",
+                "## 需求来源",
+                f"- **Jira工单**: {input.jiraIssueKey}",
+                f"- **状态**: {jira_data.issueInfo.status}",
+                f"- **类型**: {jira_data.issueInfo.issueType}",
+                f"- **优先级**: {jira_data.issueInfo.priority}",
+                "",
+                "## 需求描述",
+                jira_data.issueInfo.description or "无详细描述",
+                "",
+                "## 子任务",
+            ]
+            
+            for subtask in jira_data.subtasks:
+                content_lines.append(f"- **{subtask.key}**: {subtask.summary} ({subtask.status})")
+            
+            if jira_data.attachments:
+                content_lines.extend([
+                    "",
+                    "## 附件",
+                ])
+                for att in jira_data.attachments:
+                    content_lines.append(f"- **{att.filename}** ({att.mimeType})")
+            
+            post.content = "\n".join(content_lines)
+            post.metadata = metadata
+            
+            import frontmatter
+
+            content_str = frontmatter.dumps(post)
+            _write_doc(main_doc_path, content_str, sync_dir=False)
+            synced_dirs.add(main_doc_path.parent)
+            _update_task_index(project_root, task_key)
+            updated_files.append(str(main_doc_path))
+            
+        except Exception:
+            pass
+    
+    # 5. 自动生成测试用例（如果启用）
+    if input.autoGenerateTests:
+        analysis_input = TestAnalysisInput(
+            taskKey=task_key,
+            jiraIssueKey=input.jiraIssueKey,
+            analysisType="recommendation",
+            includeAttachments=True,
+            projectRoot=input.projectRoot
+        )
+        
+        analysis_result = analyze_requirements_vs_tests(analysis_input)
+        
+        # 生成测试用例文档
+        if analysis_result.recommendedTests:
+            test_doc_path = project_root / "Docs" / "ProcessDocuments" / f"task-{task_key}" / f"{task_key}_RecommendedTests.md"
+            test_doc_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            test_content = f"""---
+status: DRAFT
+generatedAt: {_timestamp()}
+source: jira_sync
+---
+
+# 推荐测试用例 - {task_key}
+
+## 基于需求分析的测试用例推荐
+
+{chr(10).join(f"### 测试用例 {i+1}: {test}" for i, test in enumerate(analysis_result.recommendedTests))}
+
+## 需求覆盖度分析
+- **整体覆盖度**: {analysis_result.overallCoverage:.1%}
+- **需求总数**: {len(analysis_result.requirements)}
+- **缺失测试**: {len(analysis_result.missingTests)}
+
+详细分析报告: [查看报告]({analysis_result.analysisReport})
+"""
+            
+            _write_doc(test_doc_path, test_content, sync_dir=False)
+            synced_dirs.add(test_doc_path.parent)
+            generated_tests.append(str(test_doc_path))
+    
+    # 6. 生成同步报告
+    sync_report_path = project_root / "Docs" / "ProcessDocuments" / f"task-{task_key}" / f"{task_key}_SyncReport.md"
+    sync_report_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    sync_report_content = f"""---
+status: COMPLETED
+syncedAt: {_timestamp()}
+---
+
+# Jira同步报告 - {task_key}
+
+## 同步信息
+- **源Jira工单**: {input.jiraIssueKey}
+- **目标任务**: {task_key}  
+- **同步模式**: {input.syncMode}
+- **自动生成测试**: {'是' if input.autoGenerateTests else '否'}
+
+## 同步结果
+- **创建文件**: {len(created_files)} 个
+- **更新文件**: {len(updated_files)} 个
+- **生成测试**: {len(generated_tests)} 个
+
+### 详细文件清单
+**创建的文件**:
+{chr(10).join(f"- {f}" for f in created_files)}
+
+**更新的文件**:
+{chr(10).join(f"- {f}" for f in updated_files)}
+
+**生成的测试**:
+{chr(10).join(f"- {f}" for f in generated_tests)}
+
+## Jira工单快照
+- **标题**: {jira_data.issueInfo.summary}
+- **状态**: {jira_data.issueInfo.status}
+- **子任务数**: {len(jira_data.subtasks)}
+- **附件数**: {len(jira_data.attachments)}
+
+---
+*同步完成时间: {_timestamp()}*
+"""
+    
+    _write_doc(sync_report_path, sync_report_content, sync_dir=False)
+    synced_dirs.add(sync_report_path.parent)
+    for directory in synced_dirs:
+        _fsync_dir(directory)
+    
+    return RequirementSyncOutput(
+        taskKey=task_key,
+        jiraIssueKey=input.jiraIssueKey,
+        createdFiles=created_files,
+        updatedFiles=updated_files,
+        generatedTests=generated_tests,
+        syncReport=str(sync_report_path)
+    )
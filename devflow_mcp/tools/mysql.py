@@ -0,0 +1,973 @@
+"""MySQL 工具：执行 SQL 语句、按计划校验数据（连接池、流式读取、事务与性能分析）。"""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Dict, Any, Optional, Union, Tuple
+from pathlib import Path
+import os
+import json
+from datetime import datetime
+import gzip
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from devflow_mcp.common import (
+    _ensure_dirs_for,
+    _json_safe,
+    _relpath,
+    _require_min_status,
+    _resolve_project_root,
+    _timestamp,
+    _write_doc,
+    tool,
+)
+
+class MySQLPlanInput(BaseModel):
+    """MySQL 验证计划的输入参数"""
+    model_config = ConfigDict(title="MySQLPlanInput", description="MySQL 验证计划的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    tables: List[str] = Field(default_factory=list, description="涉及的表（可选）")
+    preconditions: List[Union[str, Dict[str, Any]]] = Field(default_factory=list, description="前置 SQL 语句列表，如建表/准备数据；也可传 {\"sql\": \"INSERT ... VALUES (%s, %s)\", \"params\": [[...], ...]}，多组参数时使用 executemany 批量执行")
+    assertions: List[Dict[str, Any]] = Field(default_factory=list, description="断言 SQL 与期望描述")
+    cleanup: List[str] = Field(default_factory=list, description="清理 SQL 语句列表")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录")
+    transactional: bool = Field(False, description="事务模式：前置与断言在同一事务（含保存点）中执行，清理改为 ROLLBACK，不执行 cleanup 语句；前置中不要包含会隐式提交的 DDL")
+    profile: bool = Field(False, description="性能分析模式：记录每条语句的耗时、SHOW SESSION STATUS 增量（扫描行数等）与 EXPLAIN FORMAT=JSON，标记全表扫描与 filesort 并写入验证文档")
+    assertionConcurrency: int = Field(1, ge=1, le=16, description="非事务模式下并发执行只读断言（SELECT）的连接数上限，受 MYSQL_POOL_MAX 约束；断言可声明 expected（期望值/行）或 expectedRowCount")
+
+class MySQLStatementResult(BaseModel):
+    sql: str
+    success: bool
+    rowsAffected: Optional[int] = None
+    rows: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+    truncated: bool = False  # 结果超过 maxRows/maxBytes，rows 只包含前面的部分
+    rowsScanned: Optional[int] = None  # 从服务端读取的行数（未截断或已落盘时即结果总行数）
+    spillFile: Optional[str] = None  # 完整结果的 gzip JSONL 文件路径（spillToFile 时）
+    profile: Optional[Dict[str, Any]] = None  # 性能分析：wallMs/statusDelta/rowsExamined/explain/warnings（profile 模式）
+
+class MySQLPlanOutput(BaseModel):
+    verificationPlanDoc: str
+    verificationPlanDocRelative: Optional[str] = None
+    sqlPlan: Dict[str, Any]
+    executionResults: Optional[List[MySQLStatementResult]] = None
+    executed: bool = False
+    phaseTimings: Dict[str, float] = Field(default_factory=dict)  # 各阶段耗时（毫秒）
+    assertionResults: List[Dict[str, Any]] = Field(default_factory=list)  # 断言通过/失败矩阵：index/description/status/latencyMs/expected/actual
+    profiles: List[Dict[str, Any]] = Field(default_factory=list)  # profile 模式下逐条语句的性能分析摘要
+
+
+@tool(threaded=True)
+def verify_plan_with_mysql_mcp(input: MySQLPlanInput) -> MySQLPlanOutput:
+    """生成并执行 MySQL 验证计划（前置/断言/清理），直接返回执行结果。
+    
+    ⚠️ 前置条件：任务状态必须 >= APPROVED。
+    👤 AI 提醒：调用前请先确认任务的状态是否已通过人工审核(APPROVED)。
+    如当前状态不满足，请主动与用户确认是否需要先进行状态流转。
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    # 门禁：要求 APPROVED
+    _require_min_status(project_root, input.taskKey, "APPROVED")
+    dirs = _ensure_dirs_for(project_root, input.taskKey)
+    doc_path = dirs["process_dir"] / f"{input.taskKey}_05-MySQLVerificationPlan.md"
+    
+    plan = {
+        "preconditions": input.preconditions,
+        "assertions": input.assertions,
+        "cleanup": input.cleanup,
+        "execution_order": ["preconditions", "assertions", "cleanup"],
+        "transactional": input.transactional,
+    }
+    
+    # 执行MySQL验证计划：前置条件 -> 断言 -> 清理（事务模式下为 ROLLBACK）
+    execution_results: List[MySQLStatementResult] = []
+    phase_timings: Dict[str, float] = {}
+    assertion_matrix: List[Dict[str, Any]] = []
+    executed = False
+    
+    try:
+        if input.preconditions or input.assertions or input.cleanup:
+            execution_results, phase_timings, assertion_matrix = _run_mysql_verification(project_root, input)
+            executed = True
+            
+    except Exception as e:
+        # 如果执行失败，记录错误但继续生成文档
+        execution_results = [MySQLStatementResult(
+            sql="EXECUTION_ERROR",
+            success=False,
+            error=str(e)
+        )]
+    
+    phase_labels = {"preconditions": "前置条件", "assertions": "断言检查", "cleanup": "清理（ROLLBACK）" if input.transactional else "清理操作", "total": "合计"}
+    timing_rows = chr(10).join(f"| {phase_labels.get(phase, phase)} | {ms} |" for phase, ms in phase_timings.items())
+    timing_section = f"""
+## 阶段耗时
+执行模式：{"事务（SAVEPOINT + ROLLBACK）" if input.transactional else "逐条自动提交"}
+
+| 阶段 | 耗时 (ms) |
+|------|-----------|
+{timing_rows}
+""" if phase_timings else ""
+
+    profiles: List[Dict[str, Any]] = []
+    if input.profile:
+        for i, result in enumerate(execution_results):
+            if not result.profile:
+                continue
+            profiles.append({
+                "index": i + 1,
+                "sql": result.sql,
+                "wallMs": result.profile.get("wallMs"),
+                "rowsExamined": result.profile.get("rowsExamined"),
+                "rowsSent": result.profile.get("rowsSent"),
+                "statusDelta": result.profile.get("statusDelta", {}),
+                "warnings": result.profile.get("warnings", []),
+            })
+    slowest = sorted(profiles, key=lambda item: item["wallMs"] or 0, reverse=True)
+    profile_rows = chr(10).join(
+        f"| {item['index']} | `{item['sql'][:80].replace('|', '/')}` | {item['wallMs']} | "
+        f"{item['rowsExamined'] if item['rowsExamined'] is not None else '-'} | "
+        f"{item['rowsSent'] if item['rowsSent'] is not None else '-'} | "
+        f"{'⚠️ ' + '; '.join(item['warnings']) if item['warnings'] else ''} |"
+        for item in slowest
+    )
+    flagged_count = sum(1 for item in profiles if item["warnings"])
+    profile_section = f"""
+## 性能分析
+共分析 {len(profiles)} 条语句，{flagged_count} 条存在全表扫描/filesort/临时表告警（按耗时降序；扫描行数取 Handler_read_* 增量，为估算值）
+
+| # | 语句 | 耗时 (ms) | 扫描行(估) | 返回行 | 告警 |
+|---|------|-----------|------------|--------|------|
+{profile_rows}
+""" if profiles else ""
+
+    status_icons = {"passed": "✅ 通过", "failed": "❌ 不符", "error": "❌ 出错", "skipped": "⏭️ 跳过", "unchecked": "➖ 未声明期望"}
+    assertion_rows = chr(10).join(
+        f"| {item['index'] + 1} | {str(item['description']).replace('|', '/')} | {status_icons.get(item['status'], item['status'])} | {item['latencyMs']} |"
+        for item in assertion_matrix
+    )
+    passed_count = sum(1 for item in assertion_matrix if item["status"] == "passed")
+    assertion_section = f"""
+## 断言结果
+通过 {passed_count}/{len(assertion_matrix)}
+
+| # | 断言 | 结果 | 耗时 (ms) |
+|---|------|------|-----------|
+{assertion_rows}
+""" if assertion_matrix else ""
+
+    # 生成验证计划文档
+    doc_content = f"""---
+status: {"EXECUTED" if executed else "DRAFT"}
+updatedAt: {_timestamp()}
+executed: {executed}
+---
+
+# MySQL 验证计划
+
+## 验证目标
+验证任务 {input.taskKey} 的数据库相关功能
+
+## 涉及表
+{chr(10).join(f"- {table}" for table in input.tables)}
+
+## 执行计划
+
+### 1. 前置条件
+```sql
+{chr(10).join(_plan_entry_sql(entry) for entry in input.preconditions)}
+```
+
+### 2. 断言检查
+{chr(10).join(f"- {assertion.get('description', str(assertion)) if isinstance(assertion, dict) else assertion}" for assertion in input.assertions)}
+
+### 3. 清理操作
+```sql
+{f"ROLLBACK TO SAVEPOINT {_VERIFY_SAVEPOINT};{chr(10)}ROLLBACK;" if input.transactional else chr(10).join(input.cleanup)}
+```
+
+## 执行结果
+{'✅ 已执行' if executed else '❌ 未执行'}
+
+{chr(10).join(f"**{i+1}.** {result.sql} - {'✅ 成功' if result.success else '❌ 失败: ' + (result.error or '')}" for i, result in enumerate(execution_results)) if execution_results else '无执行记录'}
+{assertion_section}{timing_section}{profile_section}"""
+    
+    _write_doc(doc_path, doc_content)
+    
+    return MySQLPlanOutput(
+        verificationPlanDoc=str(doc_path),
+        verificationPlanDocRelative=_relpath(doc_path, project_root),
+        sqlPlan=plan,
+        executionResults=execution_results,
+        executed=executed,
+        phaseTimings=phase_timings,
+        assertionResults=assertion_matrix,
+        profiles=profiles
+    )
+
+
+# ---------- External MCP Features (Integrated Implementations) ----------
+
+# MySQL MCP parity: execute SQL statements sequentially
+class MySQLExecuteInput(BaseModel):
+    """直接执行 SQL 语句的输入参数"""
+    model_config = ConfigDict(title="MySQLExecuteInput", description="直接执行 SQL 语句的输入参数")
+    taskKey: Optional[str] = Field(None, description="任务唯一标识（可选，用于审计）")
+    statements: List[str] = Field(..., description="要顺序执行的 SQL 列表")
+    continueOnError: bool = Field(False, description="遇到错误是否继续执行后续语句")
+    projectRoot: Optional[str] = Field(None, description="项目根目录；优先读取该目录下的 .env 作为 MySQL 配置来源")
+    maxRows: Optional[int] = Field(None, ge=0, description="SELECT 内联返回的最大行数，超出即停止读取并标记 truncated；默认取 MYSQL_MAX_ROWS，0 表示不限制")
+    maxBytes: Optional[int] = Field(None, ge=0, description="SELECT 内联返回结果的最大字节数（按 JSON 估算）；默认取 MYSQL_MAX_RESULT_BYTES，0 表示不限制")
+    spillToFile: bool = Field(False, description="将 SELECT 的完整结果写入任务 ProcessDocuments 目录下的 gzip JSONL 文件，内联结果仍受 maxRows/maxBytes 限制")
+
+
+class MySQLExecuteOutput(BaseModel):
+    results: List[MySQLStatementResult]
+    hint: str
+
+
+def _parse_simple_dotenv(dotenv_path: Path) -> Dict[str, str]:
+    values: Dict[str, str] = {}
+    if not dotenv_path.exists():
+        return values
+
+    for raw_line in dotenv_path.read_text(encoding="utf-8").splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        value = value.strip()
+        if not key:
+            continue
+        if value and value[0] == value[-1] and value[0] in {"'", '"'}:
+            value = value[1:-1]
+        values[key] = value
+
+    return values
+
+
+_DOTENV_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+_DOTENV_CACHE_LOCK = threading.Lock()
+
+
+def _load_dotenv_cached(dotenv_path: Path) -> Dict[str, str]:
+    """按 (mtime_ns, size) 缓存 .env 解析结果，文件变化后自动重新解析"""
+    try:
+        stat = dotenv_path.stat()
+    except OSError:
+        return {}
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cache_key = str(dotenv_path)
+    with _DOTENV_CACHE_LOCK:
+        cached = _DOTENV_CACHE.get(cache_key)
+        if cached and cached[0] == signature:
+            return cached[1]
+    values = _parse_simple_dotenv(dotenv_path)
+    with _DOTENV_CACHE_LOCK:
+        _DOTENV_CACHE[cache_key] = (signature, values)
+    return values
+
+
+def _load_mysql_config(project_root: Optional[Path]) -> Dict[str, str]:
+    env_values: Dict[str, str] = {}
+    if project_root:
+        env_values = _load_dotenv_cached(project_root / ".env")
+
+    def pick(name: str, default: Optional[str] = None) -> Optional[str]:
+        dotenv_value = env_values.get(name)
+        if dotenv_value not in (None, ""):
+            return dotenv_value
+        system_value = os.getenv(name)
+        if system_value not in (None, ""):
+            return system_value
+        return default
+
+    return {
+        "MYSQL_HOST": pick("MYSQL_HOST"),
+        "MYSQL_USER": pick("MYSQL_USER"),
+        "MYSQL_PASSWORD": pick("MYSQL_PASSWORD"),
+        "MYSQL_DB": pick("MYSQL_DB"),
+        "MYSQL_PORT": pick("MYSQL_PORT", "3306"),
+        "MYSQL_CHARSET": pick("MYSQL_CHARSET", "utf8mb4"),
+    }
+
+
+def _mysql_connect_kwargs(project_root: Optional[Path] = None) -> Dict[str, Any]:
+    config = _load_mysql_config(project_root)
+    host = config["MYSQL_HOST"]
+    user = config["MYSQL_USER"]
+    password = config["MYSQL_PASSWORD"]
+    database = config["MYSQL_DB"]
+    port = int(config["MYSQL_PORT"] or "3306")
+    charset = config["MYSQL_CHARSET"] or "utf8mb4"
+    if not all([host, user, password, database]):
+        missing = [n for n, v in [("MYSQL_HOST", host), ("MYSQL_USER", user), ("MYSQL_PASSWORD", password), ("MYSQL_DB", database)] if not v]
+        source_hint = f"{project_root / '.env'} and process env" if project_root else "process env"
+        raise ValueError(f"Missing MySQL config in {source_hint}: {', '.join(missing)}")
+    return dict(host=host, port=port, user=user, password=password, database=database, charset=charset)
+
+
+# ---------- MySQL 连接池 ----------
+# 按 (projectRoot, 配置哈希) 维护连接池，避免每次调用都重新建连和认证。
+# 取出连接时若空闲超过 MYSQL_POOL_PING_INTERVAL 秒则先 ping，失效连接直接丢弃并重建。
+
+_MYSQL_POOL_MIN = max(0, int(os.getenv("MYSQL_POOL_MIN", "1")))
+_MYSQL_POOL_MAX = max(1, int(os.getenv("MYSQL_POOL_MAX", "5")))
+_MYSQL_POOL_IDLE_TIMEOUT = float(os.getenv("MYSQL_POOL_IDLE_TIMEOUT", "300"))
+_MYSQL_POOL_WAIT_TIMEOUT = float(os.getenv("MYSQL_POOL_WAIT_TIMEOUT", "30"))
+_MYSQL_POOL_PING_INTERVAL = float(os.getenv("MYSQL_POOL_PING_INTERVAL", "5"))
+# pymysql.constants.COMMAND 未定义该命令（MySQL 5.7.3+ / MariaDB 10.2.4+ 支持）
+_COM_RESET_CONNECTION = 0x1F
+
+
+class _MySQLPool:
+    """线程安全的 MySQL 连接池：空闲连接后进先出复用，超过 idle timeout 的连接在保留 min 个后关闭"""
+
+    def __init__(self, project_root: Optional[Path], connect_kwargs: Dict[str, Any],
+                 min_size: int = _MYSQL_POOL_MIN, max_size: int = _MYSQL_POOL_MAX,
+                 idle_timeout: float = _MYSQL_POOL_IDLE_TIMEOUT):
+        self.project_root = project_root
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle: List[Tuple[Any, float]] = []  # (connection, 最近归还时间)
+        self._total = 0
+        self._closed = False  # 已退役：归还的连接直接关闭，不再回到空闲队列
+        self._cond = threading.Condition()
+        self.stats: Dict[str, float] = {
+            "created": 0, "closed": 0, "checkouts": 0, "reused": 0,
+            "waits": 0, "pingFailures": 0, "checkoutMsTotal": 0.0,
+        }
+
+    def _connect(self):
+        import pymysql
+
+        return pymysql.connect(**self.connect_kwargs, cursorclass=pymysql.cursors.DictCursor, autocommit=True)
+
+    @staticmethod
+    def _close_quietly(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _prune_idle(self) -> List[Any]:
+        """移出超时的空闲连接（调用方需持有 _cond），返回待关闭的连接"""
+        now = time.monotonic()
+        expired = []
+        keep = []
+        for connection, last_used in self._idle:
+            if now - last_used > self.idle_timeout and self._total - len(expired) > self.min_size:
+                expired.append(connection)
+            else:
+                keep.append((connection, last_used))
+        self._idle = keep
+        self._total -= len(expired)
+        self.stats["closed"] += len(expired)
+        return expired
+
+    def acquire(self, timeout: float = _MYSQL_POOL_WAIT_TIMEOUT):
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            candidate = None
+            create = False
+            with self._cond:
+                for expired in self._prune_idle():
+                    self._close_quietly(expired)
+                if self._idle:
+                    candidate = self._idle.pop()
+                elif self._total < self.max_size:
+                    self._total += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"MySQL pool exhausted ({self.max_size} connections in use)")
+                    self.stats["waits"] += 1
+                    self._cond.wait(remaining)
+                    continue
+
+            if create:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self.stats["created"] += 1
+                    self.stats["checkouts"] += 1
+                    self.stats["checkoutMsTotal"] += (time.monotonic() - started) * 1000
+                return connection
+
+            connection, last_used = candidate
+            if time.monotonic() - last_used >= _MYSQL_POOL_PING_INTERVAL:
+                try:
+                    connection.ping(reconnect=False)
+                except Exception:
+                    self._close_quietly(connection)
+                    with self._cond:
+                        self._total -= 1
+                        self.stats["pingFailures"] += 1
+                        self.stats["closed"] += 1
+                    continue
+            with self._cond:
+                self.stats["checkouts"] += 1
+                self.stats["reused"] += 1
+                self.stats["checkoutMsTotal"] += (time.monotonic() - started) * 1000
+            return connection
+
+    def _reset_session(self, connection) -> None:
+        """归还前清理调用方留下的会话状态，失败时抛出由调用方丢弃连接。
+
+        COM_RESET_CONNECTION 会回滚事务（包括 autocommit 下显式 START TRANSACTION 开启的）、释放表锁，
+        并清掉临时表、用户变量和 SET SESSION 修改；服务端不支持时退化为显式回滚。
+        之后切回配置的库、字符集和自动提交，USE 切走的库也一并复原。
+        """
+        import pymysql
+
+        try:
+            connection._execute_command(_COM_RESET_CONNECTION, b"")
+            connection._read_ok_packet()
+            connection.set_character_set(self.connect_kwargs.get("charset") or "utf8mb4")
+        except pymysql.err.MySQLError:
+            connection.rollback()
+        connection.autocommit(True)
+        if self.connect_kwargs.get("database"):
+            connection.select_db(self.connect_kwargs["database"])
+
+    def release(self, connection, discard: bool = False) -> None:
+        with self._cond:
+            discard = discard or self._closed
+        if not discard:
+            try:
+                self._reset_session(connection)
+            except Exception:
+                discard = True
+        if discard:
+            self._close_quietly(connection)
+        with self._cond:
+            if discard:
+                self._total -= 1
+                self.stats["closed"] += 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    def health_check(self) -> int:
+        """ping 所有空闲连接，关闭失效的连接，返回关闭数量"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        healthy = []
+        broken = 0
+        for connection, last_used in idle:
+            try:
+                connection.ping(reconnect=False)
+                healthy.append((connection, last_used))
+            except Exception:
+                self._close_quietly(connection)
+                broken += 1
+        with self._cond:
+            self._idle.extend(healthy)
+            self._total -= broken
+            self.stats["pingFailures"] += broken
+            self.stats["closed"] += broken
+            self._cond.notify_all()
+        return broken
+
+    def close(self) -> None:
+        """退役连接池：立即关闭空闲连接，借出中的连接在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self.stats["closed"] += len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats.update(
+                projectRoot=str(self.project_root) if self.project_root else None,
+                host=f"{self.connect_kwargs['host']}:{self.connect_kwargs['port']}/{self.connect_kwargs['database']}",
+                idle=len(self._idle),
+                inUse=self._total - len(self._idle),
+                total=self._total,
+                minSize=self.min_size,
+                maxSize=self.max_size,
+            )
+        checkout_total = stats.pop("checkoutMsTotal")
+        stats["avgCheckoutMs"] = round(checkout_total / stats["checkouts"], 2) if stats["checkouts"] else 0.0
+        return stats
+
+
+_MYSQL_POOLS: Dict[Tuple[str, str], _MySQLPool] = {}
+_MYSQL_POOLS_LOCK = threading.Lock()
+
+
+def _get_mysql_pool(project_root: Optional[Path] = None) -> _MySQLPool:
+    """返回 (projectRoot, 配置哈希) 对应的连接池；同一项目配置变化后退役旧池（借出中的连接归还时关闭）"""
+    connect_kwargs = _mysql_connect_kwargs(project_root)
+    config_hash = hashlib.sha256(json.dumps(connect_kwargs, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    root_key = str(project_root) if project_root else ""
+    pool_key = (root_key, config_hash)
+    with _MYSQL_POOLS_LOCK:
+        pool = _MYSQL_POOLS.get(pool_key)
+        if pool is None:
+            for stale_key in [k for k in _MYSQL_POOLS if k[0] == root_key]:
+                _MYSQL_POOLS.pop(stale_key).close()
+            pool = _MySQLPool(project_root, connect_kwargs)
+            _MYSQL_POOLS[pool_key] = pool
+        return pool
+
+
+def _mysql_pool_stats(health_check: bool = False) -> List[Dict[str, Any]]:
+    with _MYSQL_POOLS_LOCK:
+        pools = list(_MYSQL_POOLS.values())
+    snapshots = []
+    for pool in pools:
+        broken = pool.health_check() if health_check else None
+        snapshot = pool.snapshot()
+        if broken is not None:
+            snapshot["healthCheckClosed"] = broken
+        snapshots.append(snapshot)
+    return snapshots
+
+
+_MYSQL_MAX_ROWS = int(os.getenv("MYSQL_MAX_ROWS", "1000"))
+_MYSQL_MAX_RESULT_BYTES = int(os.getenv("MYSQL_MAX_RESULT_BYTES", str(1024 * 1024)))
+
+
+def _stream_select(connection, sql: str, max_rows: int, max_bytes: int,
+                   spill_path: Optional[Path] = None, params: Any = None,
+                   keep_connection: bool = False) -> Tuple[MySQLStatementResult, bool]:
+    """用 SSDictCursor 流式读取 SELECT 结果，超过 max_rows/max_bytes（0 为不限）后停止内联。
+
+    不落盘时达到上限即停止读取，返回的第二个值为 True 表示结果集未读完、连接需丢弃；
+    落盘时读取全部行写入 gzip JSONL，内联部分仍按上限截断。
+    keep_connection=True（如处于事务中）时改为读完剩余行，保证连接可继续使用。
+    """
+    import pymysql
+
+    rows: List[Dict[str, Any]] = []
+    scanned = 0
+    inline_bytes = 0
+    truncated = False
+    abandoned = False
+    cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+    writer = None
+    completed = False
+    try:
+        cursor.execute(sql, params)
+        if spill_path is not None:
+            spill_path.parent.mkdir(parents=True, exist_ok=True)
+            writer = gzip.open(spill_path, "wt", encoding="utf-8")
+        while True:
+            row = cursor.fetchone()
+            if row is None:
+                break
+            scanned += 1
+            if truncated and writer is None:
+                continue  # keep_connection：只计数，不再编码
+            encoded = json.dumps(row, ensure_ascii=False, default=str)
+            if writer is not None:
+                writer.write(encoded + "\n")
+            if truncated:
+                continue
+            if (max_rows and len(rows) >= max_rows) or (max_bytes and inline_bytes + len(encoded) > max_bytes):
+                truncated = True
+                if writer is None and not keep_connection:
+                    abandoned = True
+                    break
+                continue
+            rows.append(row)
+            inline_bytes += len(encoded)
+        completed = True
+    finally:
+        if writer is not None:
+            writer.close()
+        if completed and not abandoned:
+            cursor.close()
+
+    return MySQLStatementResult(
+        sql=sql,
+        success=True,
+        rows=rows,
+        rowsAffected=None,
+        truncated=truncated,
+        rowsScanned=scanned,
+        spillFile=str(spill_path) if spill_path is not None else None,
+    ), abandoned
+
+
+_VERIFY_SAVEPOINT = "devflow_verify"
+
+
+def _plan_entry_sql(entry: Union[str, Dict[str, Any]]) -> str:
+    """验证计划条目的展示文本；批量参数的条目标注执行次数"""
+    if isinstance(entry, dict):
+        sql = str(entry.get("sql", ""))
+        params = entry.get("params")
+        if _is_param_batch(params):
+            return f"{sql} -- executemany × {len(params)}"
+        return sql
+    return str(entry)
+
+
+def _is_param_batch(params: Any) -> bool:
+    return isinstance(params, list) and bool(params) and all(isinstance(p, (list, tuple, dict)) for p in params)
+
+
+def _execute_plan_entry(connection, entry: Union[str, Dict[str, Any]], keep_connection: bool) -> MySQLStatementResult:
+    """执行一条验证计划语句；SELECT 流式读取并受 MYSQL_MAX_ROWS/MYSQL_MAX_RESULT_BYTES 限制，异常记录到结果中"""
+    sql = str(entry.get("sql", "")) if isinstance(entry, dict) else str(entry)
+    params = entry.get("params") if isinstance(entry, dict) else None
+    label = _plan_entry_sql(entry)
+    try:
+        if _is_param_batch(params):
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, params)
+                return MySQLStatementResult(sql=label, success=True, rowsAffected=cursor.rowcount)
+        if sql.strip().lower().startswith("select"):
+            result, _ = _stream_select(
+                connection, sql, _MYSQL_MAX_ROWS, _MYSQL_MAX_RESULT_BYTES,
+                params=params or None, keep_connection=keep_connection
+            )
+            result.sql = label
+            return result
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params or None)
+            return MySQLStatementResult(sql=label, success=True, rowsAffected=cursor.rowcount)
+    except Exception as exc:
+        return MySQLStatementResult(sql=label, success=False, error=str(exc))
+
+
+_PROFILE_STATUS_SQL = (
+    "SHOW SESSION STATUS WHERE Variable_name LIKE 'Handler_read%' OR Variable_name IN "
+    "('Select_scan', 'Select_full_join', 'Sort_rows', 'Sort_scan', 'Sort_merge_passes', "
+    "'Created_tmp_tables', 'Created_tmp_disk_tables')"
+)
+_EXPLAINABLE_PREFIXES = ("select", "update", "delete", "insert", "replace")
+
+
+def _session_status(connection) -> Dict[str, int]:
+    with connection.cursor() as cursor:
+        cursor.execute(_PROFILE_STATUS_SQL)
+        rows = cursor.fetchall()
+    status: Dict[str, int] = {}
+    for row in rows:
+        try:
+            status[row["Variable_name"]] = int(row["Value"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return status
+
+
+def _explain_flags(plan: Any) -> Dict[str, Any]:
+    """遍历 EXPLAIN FORMAT=JSON 结果，找出全表扫描（access_type=ALL）的表以及 filesort/临时表"""
+    flags: Dict[str, Any] = {"fullScans": [], "filesort": False, "temporaryTable": False}
+
+    def _walk(node: Any) -> None:
+        if isinstance(node, dict):
+            if node.get("access_type") == "ALL":
+                flags["fullScans"].append(node.get("table_name", "?"))
+            if node.get("using_filesort") is True:
+                flags["filesort"] = True
+            if node.get("using_temporary_table") is True:
+                flags["temporaryTable"] = True
+            for value in node.values():
+                _walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                _walk(value)
+
+    _walk(plan)
+    return flags
+
+
+def _profile_plan_entry(connection, entry: Union[str, Dict[str, Any]], keep_connection: bool) -> MySQLStatementResult:
+    """执行语句并记录耗时、SHOW SESSION STATUS 增量与 EXPLAIN FORMAT=JSON 计划（写入 result.profile）。
+
+    SHOW STATUS 本身也会改变部分计数器，先连续读取两次得到这部分开销并从增量中扣除。
+    """
+    sql = str(entry.get("sql", "")) if isinstance(entry, dict) else str(entry)
+    params = entry.get("params") if isinstance(entry, dict) else None
+    profile: Dict[str, Any] = {}
+
+    if sql.strip().lower().startswith(_EXPLAINABLE_PREFIXES) and not _is_param_batch(params):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", params or None)
+                explain_row = cursor.fetchone() or {}
+            plan = json.loads(next(iter(explain_row.values()), "{}") or "{}")
+            profile["explain"] = plan
+            profile.update(_explain_flags(plan))
+        except Exception as exc:
+            profile["explainError"] = str(exc)
+
+    try:
+        baseline = _session_status(connection)
+        before = _session_status(connection)
+    except Exception as exc:
+        baseline = before = {}
+        profile["statusError"] = str(exc)
+
+    started = time.perf_counter()
+    result = _execute_plan_entry(connection, entry, keep_connection)
+    profile["wallMs"] = round((time.perf_counter() - started) * 1000, 2)
+
+    if before:
+        try:
+            after = _session_status(connection)
+            deltas = {}
+            for name, value in after.items():
+                overhead = before.get(name, 0) - baseline.get(name, 0)
+                deltas[name] = max(0, value - before.get(name, 0) - overhead)
+            profile["statusDelta"] = {name: value for name, value in deltas.items() if value}
+            profile["rowsExamined"] = sum(value for name, value in deltas.items() if name.startswith("Handler_read"))
+        except Exception as exc:
+            profile["statusError"] = str(exc)
+    if result.rowsScanned is not None:
+        profile["rowsSent"] = result.rowsScanned
+
+    warnings = []
+    if profile.get("fullScans"):
+        warnings.append(f"全表扫描: {', '.join(profile['fullScans'])}")
+    if profile.get("filesort"):
+        warnings.append("filesort")
+    if profile.get("temporaryTable"):
+        warnings.append("临时表")
+    profile["warnings"] = warnings
+    result.profile = profile
+    return result
+
+
+def _evaluate_assertion(index: int, assertion: Union[str, Dict[str, Any]], result: MySQLStatementResult,
+                        latency_ms: float) -> Dict[str, Any]:
+    """按断言声明的 expectedRowCount / expected 判定结果。
+
+    expected 为列表时与全部行比较，为字典时与第一行比较，其他值与第一行第一列比较；
+    未声明期望时只要语句执行成功即记为 unchecked。
+    """
+    spec = assertion if isinstance(assertion, dict) else {"sql": assertion}
+    outcome: Dict[str, Any] = {
+        "index": index,
+        "description": spec.get("description") or spec.get("sql", ""),
+        "sql": result.sql,
+        "latencyMs": round(latency_ms, 2),
+    }
+    if not result.success:
+        outcome.update(status="error", error=result.error)
+        return outcome
+
+    rows = result.rows or []
+    checks: List[bool] = []
+    if "expectedRowCount" in spec:
+        actual_count = result.rowsScanned if result.rowsScanned is not None else result.rowsAffected
+        outcome["expectedRowCount"] = spec["expectedRowCount"]
+        outcome["actualRowCount"] = actual_count
+        checks.append(actual_count == spec["expectedRowCount"])
+    if "expected" in spec:
+        expected = spec["expected"]
+        if isinstance(expected, list):
+            actual: Any = rows
+        elif isinstance(expected, dict):
+            actual = rows[0] if rows else None
+        else:
+            actual = next(iter(rows[0].values()), None) if rows else None
+        outcome["expected"] = _json_safe(expected)
+        outcome["actual"] = _json_safe(actual)
+        normalize = lambda value: json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+        checks.append(actual == expected or normalize(actual) == normalize(expected))
+
+    if not checks:
+        outcome["status"] = "unchecked"
+    else:
+        outcome["status"] = "passed" if all(checks) else "failed"
+    if result.truncated:
+        outcome["truncated"] = True
+    return outcome
+
+
+def _run_mysql_verification(project_root: Path, input: MySQLPlanInput) -> Tuple[List[MySQLStatementResult], Dict[str, float], List[Dict[str, Any]]]:
+    """在一个连接池连接上按 前置 -> 断言 -> 清理 执行验证计划，返回结果、各阶段耗时（毫秒）与断言矩阵。
+
+    transactional=True 时以 BEGIN + SAVEPOINT 包裹前置与断言，前置失败后跳过剩余语句，
+    清理阶段以 ROLLBACK 撤销全部数据变更。
+    非事务模式且断言全部为 SELECT 时，按 assertionConcurrency 从连接池借用多个连接并发执行断言。
+    """
+    results: List[MySQLStatementResult] = []
+    timings: Dict[str, float] = {}
+    assertion_matrix: List[Dict[str, Any]] = []
+    run_entry = _profile_plan_entry if input.profile else _execute_plan_entry
+    pool = _get_mysql_pool(project_root)
+    connection = pool.acquire()
+    discard = False
+    started = time.perf_counter()
+    try:
+        if input.transactional:
+            connection.begin()
+            with connection.cursor() as cursor:
+                cursor.execute(f"SAVEPOINT {_VERIFY_SAVEPOINT}")
+
+        phase_started = time.perf_counter()
+        precondition_failed = False
+        for entry in input.preconditions:
+            if precondition_failed:
+                results.append(MySQLStatementResult(sql=_plan_entry_sql(entry), success=False, error="skipped: previous precondition failed"))
+                continue
+            result = run_entry(connection, entry, keep_connection=True)
+            results.append(result)
+            precondition_failed = input.transactional and not result.success
+        timings["preconditions"] = round((time.perf_counter() - phase_started) * 1000, 2)
+
+        phase_started = time.perf_counter()
+        assertion_items: List[Tuple[int, Union[str, Dict[str, Any]], Union[str, Dict[str, Any]]]] = []
+        for index, assertion in enumerate(input.assertions):
+            if isinstance(assertion, dict) and 'sql' in assertion:
+                entry: Union[str, Dict[str, Any]] = {"sql": assertion["sql"], "params": assertion.get("params")}
+            elif isinstance(assertion, str):
+                entry = assertion
+            else:
+                continue
+            assertion_items.append((index, assertion, entry))
+
+        def _run_assertion(item, assertion_connection) -> Tuple[MySQLStatementResult, Dict[str, Any]]:
+            index, assertion, entry = item
+            assertion_started = time.perf_counter()
+            result = run_entry(assertion_connection, entry, keep_connection=True)
+            # 性能分析模式下只计语句本身的耗时，不含 EXPLAIN/SHOW STATUS 开销
+            latency_ms = result.profile["wallMs"] if result.profile else (time.perf_counter() - assertion_started) * 1000
+            return result, _evaluate_assertion(index, assertion, result, latency_ms)
+
+        def _run_assertion_pooled(item) -> Tuple[MySQLStatementResult, Dict[str, Any]]:
+            try:
+                assertion_connection = pool.acquire()
+            except Exception as exc:
+                result = MySQLStatementResult(sql=_plan_entry_sql(item[2]), success=False, error=f"ConnectionError: {exc}")
+                return result, _evaluate_assertion(item[0], item[1], result, 0.0)
+            try:
+                return _run_assertion(item, assertion_connection)
+            finally:
+                pool.release(assertion_connection, discard=not assertion_connection.open)
+
+        read_only = all(_plan_entry_sql(entry).strip().lower().startswith("select") for _, _, entry in assertion_items)
+        # 主连接仍被占用，并发度不超过连接池剩余容量
+        workers = min(input.assertionConcurrency, len(assertion_items), max(1, pool.max_size - 1))
+        if precondition_failed:
+            outcomes = []
+            for index, assertion, entry in assertion_items:
+                result = MySQLStatementResult(sql=_plan_entry_sql(entry), success=False, error="skipped: precondition failed")
+                outcome = _evaluate_assertion(index, assertion, result, 0.0)
+                outcome["status"] = "skipped"
+                outcomes.append((result, outcome))
+        elif workers > 1 and read_only and not input.transactional:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mysql-assert") as executor:
+                outcomes = list(executor.map(_run_assertion_pooled, assertion_items))
+        else:
+            outcomes = [_run_assertion(item, connection) for item in assertion_items]
+        for result, outcome in outcomes:
+            results.append(result)
+            assertion_matrix.append(outcome)
+        timings["assertions"] = round((time.perf_counter() - phase_started) * 1000, 2)
+
+        phase_started = time.perf_counter()
+        if input.transactional:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {_VERIFY_SAVEPOINT}")
+                connection.rollback()
+                results.append(MySQLStatementResult(sql="ROLLBACK", success=True))
+            except Exception as exc:
+                discard = True  # 断开连接时服务端会回滚未提交的事务
+                results.append(MySQLStatementResult(sql="ROLLBACK", success=False, error=str(exc)))
+        else:
+            for entry in input.cleanup:
+                results.append(run_entry(connection, entry, keep_connection=True))
+        timings["cleanup"] = round((time.perf_counter() - phase_started) * 1000, 2)
+    except Exception:
+        discard = True
+        raise
+    finally:
+        timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+        pool.release(connection, discard=discard or not connection.open)
+
+    return results, timings, assertion_matrix
+
+
+@tool(threaded=True)
+def mysql_execute_statements(input: MySQLExecuteInput) -> MySQLExecuteOutput:
+    """执行一组 SQL 语句。
+    优先读取项目根目录 .env（若传入 projectRoot 或可解析到当前项目根目录），
+    若未命中则回退到进程环境变量：
+    MYSQL_HOST, MYSQL_PORT(可选), MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB, MYSQL_CHARSET(可选)
+
+    SELECT 使用流式游标读取，内联结果受 maxRows/maxBytes 限制（超出时 truncated=True），
+    spillToFile=True 时完整结果写入 Docs/ProcessDocuments/task-<taskKey>/mysql-results/。
+    """
+    results: List[MySQLStatementResult] = []
+    project_root = _resolve_project_root(input.projectRoot)
+    try:
+        pool = _get_mysql_pool(project_root)
+        connection = pool.acquire()
+    except Exception as exc:  # pragma: no cover
+        for sql in input.statements:
+            results.append(MySQLStatementResult(sql=sql, success=False, error=f"ConnectionError: {exc}"))
+        return MySQLExecuteOutput(results=results, hint=f"Ensure MySQL config exists in {project_root / '.env'} or process env, and the database is reachable")
+
+    max_rows = input.maxRows if input.maxRows is not None else _MYSQL_MAX_ROWS
+    max_bytes = input.maxBytes if input.maxBytes is not None else _MYSQL_MAX_RESULT_BYTES
+    spill_dir: Optional[Path] = None
+    if input.spillToFile:
+        spill_dir = project_root / "Docs" / "ProcessDocuments"
+        if input.taskKey:
+            spill_dir = spill_dir / f"task-{input.taskKey}"
+        spill_dir = spill_dir / "mysql-results"
+    spill_prefix = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    try:
+        for index, sql in enumerate(input.statements):
+            is_select = False
+            try:
+                if connection is None:
+                    connection = pool.acquire()
+                is_select = sql.strip().lower().startswith("select")
+                if is_select:
+                    spill_path = spill_dir / f"{spill_prefix}-{index + 1}.jsonl.gz" if spill_dir else None
+                    result, abandoned = _stream_select(connection, sql, max_rows, max_bytes, spill_path)
+                    results.append(result)
+                    if abandoned:
+                        # 未读完的流式结果集无法复用连接，直接丢弃比读完剩余行更快
+                        pool.release(connection, discard=True)
+                        connection = None
+                else:
+                    with connection.cursor() as cursor:
+                        cursor.execute(sql)
+                        rows_affected = cursor.rowcount
+                    results.append(MySQLStatementResult(sql=sql, success=True, rows=None, rowsAffected=rows_affected))
+            except Exception as stmt_exc:  # pragma: no cover
+                results.append(MySQLStatementResult(sql=sql, success=False, error=str(stmt_exc)))
+                if is_select and connection is not None:
+                    # 流式读取中途失败时连接上可能残留未读完的结果集
+                    pool.release(connection, discard=True)
+                    connection = None
+                if not input.continueOnError:
+                    break
+    finally:
+        if connection is not None:
+            pool.release(connection, discard=not connection.open)
+
+    truncated_count = sum(1 for r in results if r.truncated)
+    hint = "Executed using pooled MySQL connection from devflow-mcp"
+    if truncated_count:
+        hint += f"; {truncated_count} result(s) truncated by maxRows={max_rows}/maxBytes={max_bytes}"
+    return MySQLExecuteOutput(results=results, hint=hint)
@@ -0,0 +1,87 @@
+"""运行时统计工具（始终加载）：汇总已加载插件的缓存与连接池指标。"""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Dict, Any, Optional
+from types import ModuleType
+import sys
+
+from devflow_mcp.common import (
+    _FRONTMATTER_CACHE_LOCK,
+    _FRONTMATTER_CACHE_STATS,
+    _frontmatter_cache_stats,
+    _GIT_CONTEXT_LOCK,
+    _GIT_CONTEXT_STATS,
+    _git_context_stats,
+    _http_metrics_stats,
+    tool,
+)
+
+class RuntimeStatsInput(BaseModel):
+    """运行时缓存统计的输入参数"""
+    model_config = ConfigDict(title="RuntimeStatsInput", description="运行时缓存统计的输入参数")
+    resetCounters: bool = Field(False, description="读取后是否清零命中/未命中等计数器")
+    mysqlHealthCheck: bool = Field(False, description="是否对 MySQL 连接池中的空闲连接执行 ping 健康检查并关闭失效连接")
+
+class RuntimeStatsOutput(BaseModel):
+    plugins: List[str] = Field(default_factory=list, description="当前进程已导入的工具插件")
+    frontmatterCache: Dict[str, Any]
+    gitContext: Dict[str, Any] = Field(default_factory=dict)
+    httpClients: Dict[str, Any] = Field(default_factory=dict, description="各 HTTP 客户端（JIRA/WIKI）的请求数、状态码、重试与延迟直方图")
+    jiraTransitionCache: Dict[str, Any] = Field(default_factory=dict)
+    attachmentCache: Dict[str, Any] = Field(default_factory=dict)
+    wikiPageCache: Dict[str, Any] = Field(default_factory=dict, description="Wiki 页面缓存的命中、304、重新获取与淘汰统计")
+    mysqlPools: List[Dict[str, Any]] = Field(default_factory=list)
+    hint: str
+
+
+def _loaded_plugin(name: str) -> Optional[ModuleType]:
+    """只统计已导入的插件，避免为了读取统计而加载未启用的插件"""
+    return sys.modules.get(f"{__package__}.{name}")
+
+
+def _reset_counters(lock: Any, stats: Dict[str, int]) -> None:
+    with lock:
+        for counter in stats:
+            stats[counter] = 0
+
+
+@tool()
+def runtime_stats(input: RuntimeStatsInput) -> RuntimeStatsOutput:
+    """查看 MCP 进程内缓存与连接池的运行统计（命中/未命中、容量、淘汰次数、MySQL 连接复用等），用于排查性能问题。"""
+    jira = _loaded_plugin("jira")
+    mysql = _loaded_plugin("mysql")
+    wiki = _loaded_plugin("wiki")
+    frontmatter_stats = _frontmatter_cache_stats()
+    git_stats = _git_context_stats()
+    http_stats = _http_metrics_stats(reset=input.resetCounters)
+    transition_stats = jira._transition_cache_stats() if jira else {}
+    attachment_stats = jira._attachment_cache_stats() if jira else {}
+    wiki_page_stats = wiki._wiki_page_cache_stats() if wiki else {}
+    mysql_pool_stats = mysql._mysql_pool_stats(health_check=input.mysqlHealthCheck) if mysql else []
+    if input.resetCounters:
+        _reset_counters(_FRONTMATTER_CACHE_LOCK, _FRONTMATTER_CACHE_STATS)
+        _reset_counters(_GIT_CONTEXT_LOCK, _GIT_CONTEXT_STATS)
+        if jira:
+            _reset_counters(jira._JIRA_TRANSITION_CACHE_LOCK, jira._JIRA_TRANSITION_CACHE_STATS)
+            _reset_counters(jira._ATTACHMENT_CACHE_LOCK, jira._ATTACHMENT_CACHE_STATS)
+        if wiki:
+            _reset_counters(wiki._WIKI_PAGE_CACHE_LOCK, wiki._WIKI_PAGE_CACHE_STATS)
+        if mysql:
+            with mysql._MYSQL_POOLS_LOCK:
+                pools = list(mysql._MYSQL_POOLS.values())
+            for pool in pools:
+                _reset_counters(pool._cond, pool.stats)
+
+    return RuntimeStatsOutput(
+        plugins=sorted(name.rsplit(".", 1)[-1] for name in list(sys.modules) if name.startswith(f"{__package__}.")),
+        frontmatterCache=frontmatter_stats,
+        gitContext=git_stats,
+        httpClients=http_stats,
+        jiraTransitionCache=transition_stats,
+        attachmentCache=attachment_stats,
+        wikiPageCache=wiki_page_stats,
+        mysqlPools=mysql_pool_stats,
+        hint=f"Front Matter 缓存命中率 {frontmatter_stats['hitRate']:.1%}（{frontmatter_stats['size']}/{frontmatter_stats['maxSize']}）"
+    )
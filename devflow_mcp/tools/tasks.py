@@ -0,0 +1,1079 @@
+"""任务文档、代码生成请求、curl 测试、集成文档、评审与状态管理工具。"""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Dict, Any, Optional, Literal, Set, TYPE_CHECKING
+from pathlib import Path
+import os
+import json
+
+from devflow_mcp.common import (
+    PROJECT_ROOT,
+    StatusValidationError,
+    _STATUS_TRANSITIONS,
+    _ensure_dirs_for,
+    _fsync_dir,
+    _get_task_metadata,
+    _load_frontmatter,
+    _read_task_status,
+    _refresh_task_index,
+    _relpath,
+    _require_min_status,
+    _resolve_project_root,
+    _timestamp,
+    _update_task_index,
+    _validate_status_transition,
+    _write_doc,
+    tool,
+)
+
+if TYPE_CHECKING:
+    import frontmatter
+
+# ---------- Models (Inputs/Outputs) ----------
+class PrepareDocsInput(BaseModel):
+    """准备任务主文档与过程文档的输入参数"""
+    model_config = ConfigDict(title="PrepareDocsInput", description="准备任务主文档与过程文档的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识，例如 PROJ-123")
+    title: str = Field(..., description="任务标题")
+    owner: str = Field(..., description="责任人")
+    reviewers: List[str] = Field(default_factory=list, description="审核人列表")
+    force: bool = Field(False, description="若已存在文档，是否强制覆盖骨架（谨慎）")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录，默认使用 DOCS_PROJECT_ROOT 或当前工作目录")
+
+class PrepareDocsOutput(BaseModel):
+    taskKey: str
+    mainDocPath: str
+    mainDocPathRelative: Optional[str] = None
+    processDir: str
+    processDirRelative: Optional[str] = None
+    status: str
+
+class CodeGenInput(BaseModel):
+    """代码生成计划的输入参数"""
+    model_config = ConfigDict(title="CodeGenInput", description="代码生成计划的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    requirements: str = Field(..., description="需求/目标的文字说明")
+    constraints: List[str] = Field(default_factory=list, description="实现约束（路径/规范/安全等）")
+    targetModules: List[str] = Field(default_factory=list, description="目标模块列表，例如 devflow_mcp")
+    acceptanceCriteria: List[str] = Field(default_factory=list, description="验收标准列表")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录")
+
+class CodeGenOutput(BaseModel):
+    codePlanDoc: str
+    codePlanDocRelative: Optional[str] = None
+    statusHint: str
+
+class CurlGenInput(BaseModel):
+    """curl 测试用例生成的输入参数"""
+    model_config = ConfigDict(title="CurlGenInput", description="curl 测试用例生成的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    baseUrl: Optional[str] = Field(None, description="接口基础地址，例如 https://api.example.com；若从 OpenAPI servers 推断可省略")
+    endpoints: List[Dict[str, Any]] = Field(default_factory=list, description="要生成的接口清单（method/path/headers/payload），若留空将尝试从 OpenAPI 推断")
+    envVars: Dict[str, str] = Field(default_factory=dict, description="env 变量示例，如 API_TOKEN")
+    openapiUrl: Optional[str] = Field(None, description="OpenAPI 文档的 URL（json/yaml）")
+    openapiPath: Optional[str] = Field(None, description="OpenAPI 文档的本地路径（json/yaml）")
+    maxEndpoints: int = Field(20, description="从 OpenAPI 提取的最大接口数量上限")
+    authMode: Literal['none', 'authorization_bearer', 'header_token', 'query_token'] = Field('none', description="鉴权方式：无/Authorization Bearer/自定义请求头/Query 参数")
+    tokenEnvVar: str = Field('API_TOKEN', description="用于 curl 的令牌环境变量名，例如 API_TOKEN，将以 $API_TOKEN 引用")
+    headerName: str = Field('accessToken', description="当 authMode=header_token 时使用的请求头名称（默认 accessToken）")
+    queryParamName: str = Field('accessToken', description="当 authMode=query_token 时使用的查询参数名（默认 accessToken）")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录")
+
+class CurlGenOutput(BaseModel):
+    curlDoc: str
+    curlDocRelative: Optional[str] = None
+    snippets: List[str]
+
+class IntegrationDocInput(BaseModel):
+    """对接文档生成的输入参数"""
+    model_config = ConfigDict(title="IntegrationDocInput", description="对接文档生成的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    audience: str = Field(..., description="目标读者：internal|external")
+    systems: List[str] = Field(default_factory=list, description="涉及系统列表")
+    interfaces: List[Dict[str, Any]] = Field(default_factory=list, description="接口定义列表（name/method/path/schemas）")
+    notes: Optional[str] = Field(None, description="补充说明（可选）")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录")
+
+class IntegrationDocOutput(BaseModel):
+    integrationDoc: str
+    integrationDocRelative: Optional[str] = None
+    toc: List[str]
+
+class ReviewStatusInput(BaseModel):
+    """文档状态流转的输入参数"""
+    model_config = ConfigDict(title="ReviewStatusInput", description="文档状态流转的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    newStatus: str = Field(..., description="目标状态：PENDING_REVIEW/APPROVED/CHANGES_REQUESTED/PUBLISHED")
+    by: str = Field(..., description="操作者")
+    notes: Optional[str] = Field(None, description="备注（可选）")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录，默认使用 DOCS_PROJECT_ROOT 或当前工作目录")
+
+class ReviewStatusOutput(BaseModel):
+    taskKey: str
+    oldStatus: str
+    newStatus: str
+
+class ReviewChecklistInput(BaseModel):
+    """一致性检查的输入参数"""
+    model_config = ConfigDict(title="ReviewChecklistInput", description="一致性检查的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    checks: List[str] = Field(..., description="需要执行的检查项标识列表")
+
+class ReviewChecklistOutput(BaseModel):
+    passed: bool
+    failedItems: List[Dict[str, str]]
+
+# 新增：状态管理相关模型
+class StatusQueryInput(BaseModel):
+    """查询状态信息的输入参数"""
+    model_config = ConfigDict(title="StatusQueryInput", description="查询状态信息的输入参数")
+    taskKey: str = Field(..., description="任务唯一标识")
+    includeHistory: bool = Field(True, description="是否包含历史记录")
+    includeStats: bool = Field(True, description="是否包含统计信息")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录")
+
+class StatusQueryOutput(BaseModel):
+    taskKey: str
+    currentStatus: str
+    allowedTransitions: List[str]
+    history: Optional[List[Dict[str, Any]]] = None
+    stats: Optional[Dict[str, Any]] = None
+
+class StatusBatchInput(BaseModel):
+    """批量状态操作的输入参数"""
+    model_config = ConfigDict(title="StatusBatchInput", description="批量状态操作的输入参数") 
+    operations: List[Dict[str, Any]] = Field(..., description="批量操作列表，每项包含taskKey、newStatus、by、notes等")
+    continueOnError: bool = Field(False, description="遇到错误时是否继续执行")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录")
+
+class StatusBatchOutput(BaseModel):
+    successful: List[Dict[str, Any]]
+    failed: List[Dict[str, Any]]
+    summary: Dict[str, int]
+
+class StatusReportInput(BaseModel):
+    """状态报告的输入参数"""
+    model_config = ConfigDict(title="StatusReportInput", description="状态报告的输入参数")
+    includeAll: bool = Field(True, description="是否包含所有任务")
+    statusFilter: Optional[List[str]] = Field(None, description="状态过滤器")
+    userFilter: Optional[str] = Field(None, description="用户过滤器")
+    projectRoot: Optional[str] = Field(None, description="（可选）项目根目录")
+
+class StatusReportOutput(BaseModel):
+    totalTasks: int
+    statusBreakdown: Dict[str, int]
+    recentActivity: List[Dict[str, Any]]
+    blockedTasks: List[Dict[str, Any]]
+    summary: Dict[str, Any]
+
+
+# ---------- Tool Stubs (no-op implementations) ----------
+
+@tool()
+def task_prepare_docs(input: PrepareDocsInput) -> PrepareDocsOutput:
+    """准备任务主文档与分步骤文档的骨架，直接生成文档文件。"""
+    project_root = _resolve_project_root(input.projectRoot)
+    dirs = _ensure_dirs_for(project_root, input.taskKey)
+    main_doc = dirs["tasks_dir"] / f"{input.taskKey}.md"
+    process_dir = dirs["process_dir"]
+    synced_dirs: Set[Path] = set()
+    
+    # 创建主任务文档
+    if not main_doc.exists() or input.force:
+        main_content = f"""---
+status: DRAFT
+taskKey: {input.taskKey}
+title: {input.title}
+owner: {input.owner}
+reviewers: {input.reviewers}
+updatedAt: {_timestamp()}
+---
+
+# 任务概述
+{input.title}
+
+# 责任人
+- 负责人：{input.owner}
+- 审核人：{", ".join(input.reviewers)}
+
+# 状态机
+DRAFT → PENDING_REVIEW → (APPROVED | CHANGES_REQUESTED) → PUBLISHED
+
+# 过程文档
+- 上下文：01-Context.md
+- 设计：02-Design.md  
+- 代码计划：03-CodePlan.md
+- 测试用例：04-TestCurls.md
+- MySQL验证：05-MySQLVerificationPlan.md
+- 集成文档：06-Integration.md
+- Jira发布：07-JiraPublishPlan.md
+"""
+        _write_doc(main_doc, main_content, sync_dir=False)
+        synced_dirs.add(main_doc.parent)
+        _update_task_index(project_root, input.taskKey)
+    
+    # 创建过程文档骨架
+    process_docs = [
+        ("01-Context.md", "背景与目标"),
+        ("02-Design.md", "设计方案"),
+        ("03-CodePlan.md", "代码生成计划"),
+        ("04-TestCurls.md", "测试用例"),
+        ("05-MySQLVerificationPlan.md", "MySQL验证计划"),
+        ("06-Integration.md", "集成文档"),
+        ("07-JiraPublishPlan.md", "Jira发布计划")
+    ]
+    
+    for doc_name, doc_title in process_docs:
+        doc_path = process_dir / f"{input.taskKey}_{doc_name}"
+        if not doc_path.exists() or input.force:
+            doc_content = f"""---
+status: DRAFT
+updatedAt: {_timestamp()}
+---
+
+# {doc_title}
+
+待补充内容...
+"""
+            _write_doc(doc_path, doc_content, sync_dir=False)
+            synced_dirs.add(doc_path.parent)
+    
+    # 目录项在全部文档写完后每个目录只 fsync 一次
+    for directory in synced_dirs:
+        _fsync_dir(directory)
+    
+    return PrepareDocsOutput(
+        taskKey=input.taskKey,
+        mainDocPath=str(main_doc),
+        mainDocPathRelative=_relpath(main_doc, project_root),
+        processDir=str(process_dir),
+        processDirRelative=_relpath(process_dir, project_root),
+        status="DRAFT",
+    )
+
+
+@tool()
+def task_request_code_generation(input: CodeGenInput) -> CodeGenOutput:
+    """生成面向 AI 的代码编写计划文档，包含详细的实现指导。"""
+    project_root = _resolve_project_root(input.projectRoot)
+    dirs = _ensure_dirs_for(project_root, input.taskKey)
+    code_doc = dirs["process_dir"] / f"{input.taskKey}_03-CodePlan.md"
+    
+    # 生成详细的代码计划文档
+    code_content = f"""---
+status: DRAFT
+updatedAt: {_timestamp()}
+---
+
+# 代码生成计划（面向 AI）
+
+## 需求描述
+{input.requirements}
+
+## 目标模块
+{chr(10).join(f"- {module}" for module in input.targetModules)}
+
+## 实现约束
+{chr(10).join(f"- {constraint}" for constraint in input.constraints)}
+
+## 验收标准
+{chr(10).join(f"- {criteria}" for criteria in input.acceptanceCriteria)}
+
+## 开发指导
+
+### 架构要求
+- 语言：Python 3.10+
+- 框架：FastMCP
+- 模块结构：遵循现有 devflow_mcp 包结构
+
+### 实现步骤
+1. **模型定义**：定义输入输出 Pydantic 模型
+2. **工具函数**：实现核心业务逻辑
+3. **文档生成**：生成实际文档内容，非仅路径
+4. **状态管理**：实现状态流转和权限控制
+5. **错误处理**：添加完善的异常处理
+
+### 质量要求
+- 所有函数必须有完整的文档字符串
+- 输入参数必须进行验证
+- 错误信息必须用户友好
+- 支持相对和绝对路径
+
+## AI 执行清单
+- [ ] 补全工具实现逻辑
+- [ ] 生成实际文档内容
+- [ ] 添加输入验证
+- [ ] 完善错误处理
+- [ ] 更新状态为 PENDING_REVIEW
+"""
+    
+    _write_doc(code_doc, code_content)
+    
+    return CodeGenOutput(
+        codePlanDoc=str(code_doc),
+        codePlanDocRelative=_relpath(code_doc, project_root),
+        statusHint="Document created, ready for PENDING_REVIEW",
+    )
+
+
+@tool()
+def test_generate_curl_calls(input: CurlGenInput) -> CurlGenOutput:
+    """生成可执行的 curl 测试文档路径与片段列表，覆盖正/反用例（返回计划）。
+    
+    ⚠️ 前置条件：任务状态必须 >= APPROVED。
+    👤 AI 提醒：调用前请先确认任务的状态是否已通过人工审核(APPROVED)。
+    如当前状态为 DRAFT/PENDING_REVIEW，请先与用户确认是否需要：
+    1. 使用 review_set_status 将状态改为 APPROVED，或
+    2. 用户手动审核通过后再调用此工具
+    
+    支持两种来源：
+    - 直接传入 endpoints（method/path/...）
+    - 通过 openapiUrl/openapiPath 解析 OpenAPI，自动提取 endpoints
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    dirs = _ensure_dirs_for(project_root, input.taskKey)
+    doc_path = dirs["process_dir"] / f"{input.taskKey}_04-TestCurls.md"
+
+    def _load_openapi() -> Optional[Dict[str, Any]]:
+        spec_text: Optional[str] = None
+        if input.openapiUrl:
+            import requests
+
+            resp = requests.get(input.openapiUrl, timeout=30)
+            if resp.status_code >= 400:
+                raise ValueError(f"OpenAPI url fetch failed: {resp.status_code}")
+            spec_text = resp.text
+        elif input.openapiPath:
+            p = Path(input.openapiPath)
+            if not p.is_absolute():
+                p = (PROJECT_ROOT / p).resolve()
+            if not p.is_file():
+                raise ValueError(f"OpenAPI file not found: {p}")
+            spec_text = p.read_text(encoding="utf-8")
+        if not spec_text:
+            return None
+        try:
+            return json.loads(spec_text)
+        except Exception:
+            import yaml
+
+            return yaml.safe_load(spec_text)
+
+    def _extract_endpoints_from_openapi(spec: Dict[str, Any]) -> tuple[List[Dict[str, Any]], Optional[str]]:
+        endpoints: List[Dict[str, Any]] = []
+        derived_base: Optional[str] = None
+        # derive baseUrl from servers (OpenAPI v3)
+        servers = spec.get("servers")
+        if isinstance(servers, list) and servers:
+            srv = servers[0]
+            if isinstance(srv, dict):
+                derived_base = srv.get("url")
+        # paths
+        paths = spec.get("paths", {})
+        for path, ops in paths.items():
+            if not isinstance(ops, dict):
+                continue
+            for method in ["get", "post", "put", "delete", "patch", "head", "options"]:
+                if method in ops:
+                    op = ops[method]
+                    desc = op.get("summary") or op.get("operationId") or ""
+                    endpoints.append({
+                        "method": method.upper(),
+                        "path": path,
+                        "description": desc,
+                    })
+                    if len(endpoints) >= max(1, input.maxEndpoints):
+                        return endpoints, derived_base
+        return endpoints, derived_base
+
+    # 门禁：只有在 APPROVED 之后才允许生成 curl
+    _require_min_status(project_root, input.taskKey, "APPROVED")
+
+    endpoints = list(input.endpoints or [])
+    derived_base = None
+    if not endpoints:
+        spec = _load_openapi()
+        if spec:
+            endpoints, derived_base = _extract_endpoints_from_openapi(spec)
+    if not endpoints:
+        raise ValueError("需要提供 endpoints 或 openapiUrl/openapiPath 以生成 curl 用例")
+
+    base_url = input.baseUrl or derived_base or ""
+    snippets: List[str] = []
+    default_auth_mode = input.authMode or 'none'
+    default_header_name = input.headerName or 'accessToken'
+    default_query_name = input.queryParamName or 'accessToken'
+    token_shell = f"${input.tokenEnvVar}" if input.tokenEnvVar else "$API_TOKEN"
+    for ep in endpoints:
+        method = (ep.get("method") or "GET").upper()
+        path = ep.get("path") or "/"
+        headers = ep.get("headers") or {}
+        payload = ep.get("samplePayload")
+        # 计算鉴权策略（端点可覆盖全局）
+        auth_mode = (ep.get("authMode") or default_auth_mode) if isinstance(ep, dict) else default_auth_mode
+        header_name = ep.get("headerName") if isinstance(ep, dict) else None
+        query_name = ep.get("queryParamName") if isinstance(ep, dict) else None
+        eff_header_name = header_name or default_header_name
+        eff_query_name = query_name or default_query_name
+        parts = ["curl -sS -X", method]
+        # 注入鉴权
+        if auth_mode == 'authorization_bearer':
+            headers = {**headers, "Authorization": f"Bearer {token_shell}"}
+        elif auth_mode == 'header_token':
+            headers = {**headers, eff_header_name: token_shell}
+        # 写入头部
+        for k, v in headers.items():
+            parts += ["-H", f"\"{k}: {v}\""]
+        # 构造 URL 并注入 query token（如需要）
+        url = (base_url.rstrip("/") + path) if base_url else path
+        if auth_mode == 'query_token':
+            sep = '&' if ('?' in url) else '?'
+            url = f"{url}{sep}{eff_query_name}={token_shell}"
+        if payload is not None:
+            parts += ["-H", "\"Content-Type: application/json\"", "--data", json.dumps(payload)]
+        parts += [f"\"{url}\""]
+        snippets.append(" ".join(parts))
+
+    # 将生成的 curl 用例写入文档文件
+    try:
+        doc_path.parent.mkdir(parents=True, exist_ok=True)
+        lines: List[str] = []
+        lines.append("---")
+        lines.append("status: DRAFT")
+        lines.append(f"generatedAt: {_timestamp()}")
+        if base_url:
+            lines.append(f"baseUrl: {base_url}")
+        lines.append("---\n")
+        lines.append("## 运行前")
+        lines.append(f"- 导出令牌: export {input.tokenEnvVar or 'API_TOKEN'}=\"<token>\"\n")
+        lines.append("## 用例")
+        for idx, snip in enumerate(snippets, start=1):
+            lines.append(f"\n### 用例 {idx}")
+            lines.append("```bash")
+            lines.append(snip)
+            lines.append("```")
+        content = "\n".join(lines) + "\n"
+        _write_doc(doc_path, content)
+    except Exception:
+        # 写入失败不阻塞返回
+        pass
+
+    return CurlGenOutput(curlDoc=str(doc_path), curlDocRelative=_relpath(doc_path, project_root), snippets=snippets)
+
+
+@tool()
+def docs_generate_integration(input: IntegrationDocInput) -> IntegrationDocOutput:
+    """生成完整的集成对接文档，包含概览、鉴权、接口、Schema、错误码和样例。
+    
+    ⚠️ 前置条件：任务状态必须 >= APPROVED。
+    👤 AI 提醒：调用前请先确认任务的状态是否已通过人工审核(APPROVED)。
+    如当前状态不满足，请主动与用户确认是否需要先进行状态流转。
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    # 门禁：要求 APPROVED
+    _require_min_status(project_root, input.taskKey, "APPROVED")
+    dirs = _ensure_dirs_for(project_root, input.taskKey)
+    doc_path = dirs["process_dir"] / f"{input.taskKey}_06-Integration.md"
+    
+    # 生成完整的集成文档内容
+    doc_content = f"""---
+status: DRAFT
+updatedAt: {_timestamp()}
+audience: {input.audience}
+---
+
+# 集成对接文档 - {input.taskKey}
+
+## 1. 概览 (Overview)
+
+### 系统简介
+任务 {input.taskKey} 的系统集成文档，面向 {input.audience} 用户。
+
+### 涉及系统
+{chr(10).join(f"- {system}" for system in input.systems)}
+
+## 2. 鉴权 (Authentication)
+
+### 鉴权方式
+- **类型**: Bearer Token / API Key
+- **请求头**: `Authorization: Bearer <token>`
+- **获取方式**: 联系系统管理员
+
+### 示例
+```bash
+curl -H "Authorization: Bearer your-api-token" \\
+     https://api.example.com/endpoint
+```
+
+## 3. 接口 (Endpoints)
+
+{chr(10).join(f'''### {interface.get("name", "Unknown")}
+**方法**: {interface.get("method", "GET")}  
+**路径**: {interface.get("path", "/")}  
+**描述**: {interface.get("description", "暂无描述")}
+
+**请求示例**:
+```json
+{{"example": "request"}}
+```
+
+**响应示例**:
+```json
+{{"status": "success", "data": {{}}}}
+```
+''' for interface in input.interfaces)}
+
+## 4. 数据结构 (Schemas)
+
+### 通用响应格式
+```json
+{{
+  "status": "success|error",
+  "message": "操作结果描述",
+  "data": {{}},
+  "timestamp": "2024-01-01T00:00:00Z"
+}}
+```
+
+### 业务数据结构
+```json
+{{
+  "id": "string",
+  "name": "string", 
+  "status": "active|inactive",
+  "createdAt": "2024-01-01T00:00:00Z",
+  "updatedAt": "2024-01-01T00:00:00Z"
+}}
+```
+
+## 5. 错误码 (Error Codes)
+
+| 错误码 | 描述 | 解决方案 |
+|--------|------|----------|
+| 400 | 请求参数错误 | 检查请求参数格式和必填字段 |
+| 401 | 未授权 | 检查 API Token 是否正确 |
+| 403 | 禁止访问 | 检查账号权限 |
+| 404 | 资源不存在 | 检查请求的资源ID是否正确 |
+| 500 | 服务器内部错误 | 联系技术支持 |
+
+## 6. 集成样例 (Samples)
+
+### Python 示例
+```python
+import requests
+
+def call_api(endpoint, data=None):
+    headers = {{
+        'Authorization': 'Bearer your-api-token',
+        'Content-Type': 'application/json'
+    }}
+    
+    response = requests.post(
+        f'https://api.example.com{{endpoint}}',
+        headers=headers,
+        json=data
+    )
+    
+    return response.json()
+
+# 使用示例
+result = call_api('/api/v1/resource', {{'name': 'test'}})
+```
+
+### curl 示例
+```bash
+# GET 请求
+curl -H "Authorization: Bearer your-api-token" \\
+     https://api.example.com/api/v1/resource
+
+# POST 请求  
+curl -X POST \\
+     -H "Authorization: Bearer your-api-token" \\
+     -H "Content-Type: application/json" \\
+     -d '{{"name": "test"}}' \\
+     https://api.example.com/api/v1/resource
+```
+
+## 7. 技术支持
+
+### 联系方式
+- **技术支持**: tech-support@example.com
+- **文档问题**: docs@example.com
+- **紧急联系**: emergency@example.com
+
+### 更新日志
+- {_timestamp()[:10]}: 初始版本创建
+
+## 8. 补充说明
+{input.notes or "暂无补充说明"}
+"""
+    
+    _write_doc(doc_path, doc_content)
+    toc = ["Overview", "Authentication", "Endpoints", "Schemas", "Error Codes", "Samples", "Support", "Notes"]
+    
+    return IntegrationDocOutput(
+        integrationDoc=str(doc_path), 
+        integrationDocRelative=_relpath(doc_path, project_root), 
+        toc=toc
+    )
+
+
+# 这些转换必须说明原因
+_CRITICAL_TRANSITIONS = {
+    ("PENDING_REVIEW", "CHANGES_REQUESTED"),
+    ("APPROVED", "CHANGES_REQUESTED"),
+    ("APPROVED", "PUBLISHED"),
+}
+
+
+def _load_task_post(main_doc: Path) -> frontmatter.Post:
+    """读取任务主文档的可修改副本；文档不存在时返回空文档"""
+    import frontmatter
+
+    if main_doc.exists():
+        return _load_frontmatter(main_doc, mutable=True)
+    return frontmatter.Post("")
+
+
+def _apply_status_transition(post: frontmatter.Post, new_status: str, by: str, notes: Optional[str]) -> str:
+    """在内存中的任务文档上执行一次状态转换（校验、更新状态、记录历史与统计），返回转换前的状态"""
+    metadata = dict(post.metadata or {})
+    old_status = str(metadata.get("status", "DRAFT")).strip().upper() or "DRAFT"
+
+    # 1. 验证状态转换是否合法
+    if not _validate_status_transition(old_status, new_status):
+        valid_transitions = _STATUS_TRANSITIONS.get(old_status, [])
+        raise StatusValidationError(
+            f"非法状态转换: {old_status} -> {new_status}. "
+            f"允许的转换: {valid_transitions}"
+        )
+
+    # 2. 验证必需的原因说明（对某些关键转换）
+    if (old_status, new_status) in _CRITICAL_TRANSITIONS and not notes:
+        raise StatusValidationError(
+            f"关键状态转换 {old_status} -> {new_status} 必须提供原因说明"
+        )
+
+    # 3. 更新状态和时间戳
+    metadata["status"] = new_status
+    metadata["updatedAt"] = _timestamp()
+
+    # 4. 记录状态变更历史
+    reviews = list(metadata.get("reviews", []))
+    reviews.append({
+        "by": by,
+        "from": old_status,
+        "to": new_status,
+        "notes": notes or "",
+        "time": _timestamp(),
+        "valid": True  # 标记为经过验证的转换
+    })
+    metadata["reviews"] = reviews
+
+    # 5. 更新统计信息
+    stats = dict(metadata.get("statusStats", {}))
+    stats[new_status] = stats.get(new_status, 0) + 1
+    stats["totalTransitions"] = stats.get("totalTransitions", 0) + 1
+    metadata["statusStats"] = stats
+
+    post.metadata = metadata
+    return old_status
+
+
+def _save_task_post(project_root: Path, task_key: str, post: frontmatter.Post, sync_dir: bool = True) -> None:
+    """原子写回任务主文档；批量写入时传 sync_dir=False 并在最后统一 fsync 目录"""
+    import frontmatter
+
+    main_doc = project_root / "Docs" / ".tasks" / f"{task_key}.md"
+    try:
+        main_doc.parent.mkdir(parents=True, exist_ok=True)
+        _write_doc(main_doc, frontmatter.dumps(post), sync_dir=sync_dir)
+    except Exception as e:
+        raise StatusValidationError(f"状态更新失败: {str(e)}")
+
+
+@tool()
+def review_set_status(input: ReviewStatusInput) -> ReviewStatusOutput:
+    """切换主任务文档状态，包含状态转换路径验证和历史记录。
+    
+    ⚠️ 状态验证：
+    1. 验证状态转换路径是否合法
+    2. 记录状态变更历史和原因
+    3. 支持事务性状态更新
+    
+    👤 AI 提醒：状态流转通常需要人工审核决策。建议调用前：
+    1. 向用户说明当前状态和拟变更的目标状态
+    2. 确认变更原因和后续影响
+    3. 获得用户明确同意后再执行状态切换
+    """
+    project_root = _resolve_project_root(input.projectRoot)
+    dirs = _ensure_dirs_for(project_root, None)
+
+    post = _load_task_post(dirs["tasks_dir"] / f"{input.taskKey}.md")
+    old_status = _apply_status_transition(post, input.newStatus, input.by, input.notes)
+    # 原子 rename 保证文件要么是旧内容要么是完整的新内容，无需写后回读校验
+    _save_task_post(project_root, input.taskKey, post)
+    _update_task_index(project_root, input.taskKey)
+
+    return ReviewStatusOutput(taskKey=input.taskKey, oldStatus=old_status, newStatus=input.newStatus)
+
+
+@tool()
+def review_validate_checklist(input: ReviewChecklistInput) -> ReviewChecklistOutput:
+    """执行一致性校验（文档存在性、状态门禁、配置完整性等），返回通过与失败项。"""
+    failed: List[Dict[str, str]] = []
+    project_root = PROJECT_ROOT
+    
+    # 可用的检查项
+    available_checks = {
+        "task_doc_exists": "检查主任务文档是否存在",
+        "process_docs_exist": "检查过程文档是否存在", 
+        "status_valid": "检查任务状态是否有效",
+        "front_matter_valid": "检查 Front Matter 格式",
+        "mysql_config": "检查 MySQL 配置",
+        "jira_config": "检查 Jira 配置",
+        "file_permissions": "检查文件权限",
+        "directory_structure": "检查目录结构"
+    }
+    
+    for check_id in input.checks:
+        if check_id not in available_checks:
+            failed.append({
+                "check": check_id,
+                "reason": f"未知的检查项: {check_id}"
+            })
+            continue
+            
+        try:
+            if check_id == "task_doc_exists":
+                main_doc = project_root / "Docs" / ".tasks" / f"{input.taskKey}.md"
+                if not main_doc.exists():
+                    failed.append({
+                        "check": check_id,
+                        "reason": f"主任务文档不存在: {main_doc}"
+                    })
+                    
+            elif check_id == "process_docs_exist":
+                process_dir = project_root / "Docs" / "ProcessDocuments" / f"task-{input.taskKey}"
+                if not process_dir.exists():
+                    failed.append({
+                        "check": check_id,
+                        "reason": f"过程文档目录不存在: {process_dir}"
+                    })
+                else:
+                    required_docs = [
+                        "01-Context.md", "02-Design.md", "03-CodePlan.md",
+                        "04-TestCurls.md", "05-MySQLVerificationPlan.md", 
+                        "06-Integration.md", "07-JiraPublishPlan.md"
+                    ]
+                    for doc in required_docs:
+                        doc_path = process_dir / f"{input.taskKey}_{doc}"
+                        if not doc_path.exists():
+                            failed.append({
+                                "check": check_id,
+                                "reason": f"缺失过程文档: {doc_path.name}"
+                            })
+                            
+            elif check_id == "status_valid":
+                try:
+                    current_status = _read_task_status(project_root, input.taskKey)
+                    valid_statuses = ["DRAFT", "PENDING_REVIEW", "APPROVED", "CHANGES_REQUESTED", "PUBLISHED"]
+                    if current_status not in valid_statuses:
+                        failed.append({
+                            "check": check_id,
+                            "reason": f"无效状态: {current_status}"
+                        })
+                except Exception as e:
+                    failed.append({
+                        "check": check_id,
+                        "reason": f"无法读取状态: {str(e)}"
+                    })
+                    
+            elif check_id == "front_matter_valid":
+                main_doc = project_root / "Docs" / ".tasks" / f"{input.taskKey}.md"
+                if main_doc.exists():
+                    try:
+                        post = _load_frontmatter(main_doc)
+                        required_fields = ["status", "taskKey", "title", "owner"]
+                        for field in required_fields:
+                            if field not in post.metadata:
+                                failed.append({
+                                    "check": check_id,
+                                    "reason": f"缺失 Front Matter 字段: {field}"
+                                })
+                    except Exception as e:
+                        failed.append({
+                            "check": check_id,
+                            "reason": f"Front Matter 格式错误: {str(e)}"
+                        })
+                        
+            elif check_id == "mysql_config":
+                required_env = ["MYSQL_HOST", "MYSQL_USER", "MYSQL_PASSWORD", "MYSQL_DB"]
+                missing_env = [env for env in required_env if not os.getenv(env)]
+                if missing_env:
+                    failed.append({
+                        "check": check_id,
+                        "reason": f"缺失 MySQL 环境变量: {', '.join(missing_env)}"
+                    })
+                    
+            elif check_id == "jira_config":
+                base_url = os.getenv("JIRA_BASE_URL")
+                user = os.getenv("JIRA_USER")
+                password = os.getenv("JIRA_USER_PASSWORD")
+                bearer = os.getenv("JIRA_BEARER_TOKEN")
+                token = os.getenv("JIRA_API_TOKEN")
+                
+                if not base_url:
+                    failed.append({
+                        "check": check_id,
+                        "reason": "缺失 JIRA_BASE_URL 环境变量"
+                    })
+                    
+                if not (user and password) and not bearer and not (user and token):
+                    failed.append({
+                        "check": check_id,
+                        "reason": "缺失 Jira 认证配置（需要用户名密码、Bearer Token 或 API Token）"
+                    })
+                    
+            elif check_id == "directory_structure":
+                required_dirs = [
+                    project_root / "Docs",
+                    project_root / "Docs" / ".tasks",
+                    project_root / "Docs" / "ProcessDocuments"
+                ]
+                for dir_path in required_dirs:
+                    if not dir_path.exists():
+                        failed.append({
+                            "check": check_id,
+                            "reason": f"目录不存在: {dir_path}"
+                        })
+                        
+            elif check_id == "file_permissions":
+                docs_dir = project_root / "Docs"
+                if docs_dir.exists() and not os.access(docs_dir, os.W_OK):
+                    failed.append({
+                        "check": check_id,
+                        "reason": f"没有写权限: {docs_dir}"
+                    })
+                    
+        except Exception as e:
+            failed.append({
+                "check": check_id,
+                "reason": f"检查执行异常: {str(e)}"
+            })
+    
+    return ReviewChecklistOutput(passed=len(failed) == 0, failedItems=failed)
+
+# ---------- 状态管理工具函数 ----------
+
+@tool()
+def status_query(input: StatusQueryInput) -> StatusQueryOutput:
+    """查询任务的状态信息，包括当前状态、允许的转换、历史记录和统计信息。"""
+    project_root = _resolve_project_root(input.projectRoot)
+    # 当前状态与统计直接取自任务索引，只有需要完整历史时才解析主文档
+    index_entry = _refresh_task_index(project_root).get(input.taskKey)
+    if index_entry and not index_entry.get("error"):
+        current_status = str(index_entry.get("status", "DRAFT")).strip().upper() or "DRAFT"
+        task_metadata = {"statusStats": dict(index_entry.get("statusStats") or {})}
+    else:
+        current_status = _read_task_status(project_root, input.taskKey)
+        task_metadata = _get_task_metadata(project_root, input.taskKey)
+
+    # 获取允许的状态转换
+    allowed_transitions = _STATUS_TRANSITIONS.get(current_status, [])
+
+    # 获取历史记录
+    history = None
+    if input.includeHistory:
+        if "reviews" not in task_metadata:
+            task_metadata = _get_task_metadata(project_root, input.taskKey)
+        history = task_metadata.get("reviews", [])
+        # 按时间倒序排列
+        history = sorted(history, key=lambda x: x.get("time", ""), reverse=True)
+
+    # 获取统计信息
+    stats = None
+    if input.includeStats:
+        stats = task_metadata.get("statusStats", {})
+        # 添加一些派生统计
+        if history:
+            stats["historyCount"] = len(history)
+            stats["averageTimeInStatus"] = {}  # 可以后续计算
+    
+    return StatusQueryOutput(
+        taskKey=input.taskKey,
+        currentStatus=current_status,
+        allowedTransitions=allowed_transitions,
+        history=history,
+        stats=stats
+    )
+
+@tool()
+def status_batch_operation(input: StatusBatchInput) -> StatusBatchOutput:
+    """批量执行状态转换操作。"""
+    project_root = _resolve_project_root(input.projectRoot)
+    dirs = _ensure_dirs_for(project_root, None)
+    successful = []
+    failed = []
+    # 同一任务的多个操作在内存中依次生效，最后每个任务只写一次
+    posts: Dict[str, Any] = {}
+    changed: Dict[str, None] = {}
+    
+    for i, op in enumerate(input.operations):
+        try:
+            # 验证操作参数
+            task_key = op.get("taskKey")
+            new_status = op.get("newStatus") 
+            by = op.get("by")
+            notes = op.get("notes", "")
+            
+            if not all([task_key, new_status, by]):
+                raise ValueError("缺少必要参数: taskKey, newStatus, by")
+            
+            # 执行状态转换
+            status_input = ReviewStatusInput(
+                taskKey=task_key,
+                newStatus=new_status,
+                by=by,
+                notes=notes,
+                projectRoot=input.projectRoot
+            )
+            if task_key not in posts:
+                posts[task_key] = _load_task_post(dirs["tasks_dir"] / f"{task_key}.md")
+            old_status = _apply_status_transition(posts[task_key], status_input.newStatus, status_input.by, status_input.notes)
+            changed[task_key] = None
+            successful.append({
+                "operation": i,
+                "taskKey": task_key,
+                "from": old_status,
+                "to": status_input.newStatus,
+                "by": by
+            })
+            
+        except Exception as e:
+            failed.append({
+                "operation": i,
+                "taskKey": op.get("taskKey", "unknown"),
+                "error": str(e),
+                "operation_data": op
+            })
+            
+            if not input.continueOnError:
+                break
+
+    written = []
+    for task_key in changed:
+        try:
+            _save_task_post(project_root, task_key, posts[task_key], sync_dir=False)
+            written.append(task_key)
+        except StatusValidationError as e:
+            # 写入失败时该任务的所有操作都未生效
+            for entry in [entry for entry in successful if entry["taskKey"] == task_key]:
+                successful.remove(entry)
+                failed.append({"operation": entry["operation"], "taskKey": task_key, "error": str(e),
+                               "operation_data": input.operations[entry["operation"]]})
+    if written:
+        _fsync_dir(dirs["tasks_dir"])
+        _update_task_index(project_root, *written)
+    failed.sort(key=lambda entry: entry["operation"])
+    
+    summary = {
+        "total": len(input.operations),
+        "successful": len(successful),
+        "failed": len(failed),
+        "filesWritten": len(written)
+    }
+    
+    return StatusBatchOutput(
+        successful=successful,
+        failed=failed,
+        summary=summary
+    )
+
+@tool()
+def status_report(input: StatusReportInput) -> StatusReportOutput:
+    """生成状态报告，包括所有任务的状态统计和活动摘要。"""
+    project_root = _resolve_project_root(input.projectRoot)
+    tasks_dir = project_root / "Docs" / ".tasks"
+    
+    if not tasks_dir.exists():
+        return StatusReportOutput(
+            totalTasks=0,
+            statusBreakdown={},
+            recentActivity=[],
+            blockedTasks=[],
+            summary={"message": "没有找到任务目录"}
+        )
+    
+    # 从任务索引读取元数据摘要（仅重新解析有变化的文件）
+    task_index = _refresh_task_index(project_root)
+    total_tasks = 0
+    status_breakdown = {}
+    recent_activity = []
+    blocked_tasks = []
+
+    for task_key, metadata in sorted(task_index.items()):
+        try:
+            # 跳过无法解析的文件
+            if metadata.get("error"):
+                continue
+            current_status = metadata.get("status", "DRAFT")
+
+            # 应用过滤器
+            if input.statusFilter and current_status not in input.statusFilter:
+                continue
+
+            if input.userFilter:
+                owner = metadata.get("owner", "")
+                reviewers = metadata.get("reviewers", [])
+                if input.userFilter not in [owner] + list(reviewers):
+                    continue
+
+            total_tasks += 1
+            status_breakdown[current_status] = status_breakdown.get(current_status, 0) + 1
+
+            # 收集最近活动
+            latest_review = metadata.get("latestReview")
+            if latest_review:
+                recent_activity.append({
+                    "taskKey": task_key,
+                    "action": f"{latest_review.get('from', 'UNKNOWN')} -> {latest_review.get('to', 'UNKNOWN')}",
+                    "by": latest_review.get("by", "unknown"),
+                    "time": latest_review.get("time", ""),
+                    "notes": latest_review.get("notes", "")
+                })
+            
+            # 识别阻塞的任务
+            if current_status == "CHANGES_REQUESTED":
+                blocked_tasks.append({
+                    "taskKey": task_key,
+                    "status": current_status,
+                    "owner": metadata.get("owner", "unknown"),
+                    "lastUpdate": metadata.get("updatedAt", "unknown")
+                })
+                
+        except Exception as e:
+            # 跳过无法解析的文件
+            continue
+    
+    # 按时间排序最近活动
+    recent_activity.sort(key=lambda x: x.get("time", ""), reverse=True)
+    recent_activity = recent_activity[:20]  # 只取最近20条
+    
+    summary = {
+        "totalFiles": len(task_index),
+        "validTasks": total_tasks,
+        "mostCommonStatus": max(status_breakdown.items(), key=lambda x: x[1])[0] if status_breakdown else "N/A",
+        "blockedCount": len(blocked_tasks),
+        "recentActivityCount": len(recent_activity)
+    }
+    
+    return StatusReportOutput(
+        totalTasks=total_tasks,
+        statusBreakdown=status_breakdown,
+        recentActivity=recent_activity,
+        blockedTasks=blocked_tasks,
+        summary=summary
+    )